@@ -15,10 +15,12 @@
 
 import logging
 import time
+from typing import Optional
 
 from configs import dify_config
 from contexts.wrapper import RecyclableContextVar
 from dify_app import DifyApp
+from libs.import_report import ImportReport
 
 
 # ----------------------------
@@ -67,18 +69,22 @@ def create_app() -> DifyApp:
     :return: 完全初始化的应用实例
     """
     start_time = time.perf_counter()
+    # 记录各启动步骤的导入开销（可选）
+    import_report = ImportReport(enabled=dify_config.STARTUP_IMPORT_REPORT_ENABLED)
     # 创建基础应用
-    app = create_flask_app_with_configs()
+    with import_report.measure("create_flask_app_with_configs"):
+        app = create_flask_app_with_configs()
     # 初始化所有扩展
-    initialize_extensions(app)
+    initialize_extensions(app, import_report)
     end_time = time.perf_counter()
     # 在调试模式下记录应用创建耗时
     if dify_config.DEBUG:
         logging.info(f"Finished create_app ({round((end_time - start_time) * 1000, 2)} ms)")
+    import_report.log()
     return app
 
 
-def initialize_extensions(app: DifyApp):
+def initialize_extensions(app: DifyApp, import_report: Optional[ImportReport] = None):
     """
     初始化所有应用扩展
     
@@ -93,32 +99,36 @@ def initialize_extensions(app: DifyApp):
     5. 监控相关扩展最终（确保能够监控到其他所有组件）
     
     :param app: 待初始化扩展的应用实例
+    :param import_report: 记录各扩展导入开销的报告，可选
     """
-    from extensions import (
-        ext_app_metrics,  # 应用指标监控
-        ext_blueprints,  # 蓝图/路由注册
-        ext_celery,  # Celery异步任务
-        ext_code_based_extension,  # 基于代码的扩展
-        ext_commands,  # Flask命令行
-        ext_compress,  # 响应压缩
-        ext_database,  # 数据库连接
-        ext_hosting_provider,  # 托管服务提供商
-        ext_import_modules,  # 模块导入
-        ext_logging,  # 日志配置
-        ext_login,  # 用户登录
-        ext_mail,  # 电子邮件
-        ext_migrate,  # 数据库迁移
-        ext_otel,  # OpenTelemetry监控
-        ext_otel_patch,  # OpenTelemetry补丁
-        ext_proxy_fix,  # 代理修复
-        ext_redis,  # Redis缓存
-        ext_repositories,  # 数据仓库
-        ext_sentry,  # Sentry错误跟踪
-        ext_set_secretkey,  # 密钥设置
-        ext_storage,  # 文件存储
-        ext_timezone,  # 时区设置
-        ext_warnings,  # 警告处理
-    )
+    import_report = import_report or ImportReport(enabled=False)
+    # 扩展模块在导入时加载其依赖，单独计入报告
+    with import_report.measure("import extensions"):
+        from extensions import (
+            ext_app_metrics,  # 应用指标监控
+            ext_blueprints,  # 蓝图/路由注册
+            ext_celery,  # Celery异步任务
+            ext_code_based_extension,  # 基于代码的扩展
+            ext_commands,  # Flask命令行
+            ext_compress,  # 响应压缩
+            ext_database,  # 数据库连接
+            ext_hosting_provider,  # 托管服务提供商
+            ext_import_modules,  # 模块导入
+            ext_logging,  # 日志配置
+            ext_login,  # 用户登录
+            ext_mail,  # 电子邮件
+            ext_migrate,  # 数据库迁移
+            ext_otel,  # OpenTelemetry监控
+            ext_otel_patch,  # OpenTelemetry补丁
+            ext_proxy_fix,  # 代理修复
+            ext_redis,  # Redis缓存
+            ext_repositories,  # 数据仓库
+            ext_sentry,  # Sentry错误跟踪
+            ext_set_secretkey,  # 密钥设置
+            ext_storage,  # 文件存储
+            ext_timezone,  # 时区设置
+            ext_warnings,  # 警告处理
+        )
 
     # 扩展初始化顺序，确保依赖正确
     extensions = [
@@ -159,7 +169,8 @@ def initialize_extensions(app: DifyApp):
 
         # 计时并初始化扩展
         start_time = time.perf_counter()
-        ext.init_app(app)
+        with import_report.measure(short_name):
+            ext.init_app(app)
         end_time = time.perf_counter()
         if dify_config.DEBUG:
             logging.info(f"Loaded {short_name} ({round((end_time - start_time) * 1000, 2)} ms)")
@@ -47,6 +47,33 @@ class SecurityConfig(BaseSettings):
         default=None,
     )
 
+    DECRYPT_DECODING_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds a process keeps parsed tenant private keys and decrypted credential values,"
+        " 0 to disable the caches",
+        default=120,
+    )
+
+    DECRYPT_DECODING_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of parsed tenant private keys kept per process",
+        default=256,
+    )
+
+    DECRYPTED_VALUE_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of decrypted credential values kept per process",
+        default=4096,
+    )
+
+    CREDENTIALS_CACHE_LOCAL_TTL: NonNegativeInt = Field(
+        description="Time in seconds a process keeps provider and tool credentials in its local cache tier,"
+        " 0 to only use the sealed Redis tier",
+        default=300,
+    )
+
+    CREDENTIALS_CACHE_LOCAL_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of provider and tool credentials kept in the local cache tier of a process",
+        default=2048,
+    )
+
 
 class AppExecutionConfig(BaseSettings):
     """
@@ -65,6 +92,11 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of requests per app per day",
         default=5000,
     )
+    APP_STREAM_COALESCE_WINDOW_MS: NonNegativeInt = Field(
+        description="Window in milliseconds within which streamed message tokens are merged into one SSE frame"
+        " (0 to send every token as its own frame)",
+        default=0,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -175,6 +207,23 @@ class PluginConfig(BaseSettings):
         default=15728640 * 12,
     )
 
+    PLUGIN_MODEL_PROVIDERS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds a process keeps the model providers of a tenant fetched from the plugin daemon,"
+        " plugin installs, upgrades and uninstalls invalidate them earlier, 0 to disable the cache",
+        default=60,
+    )
+
+    PLUGIN_MODEL_SCHEMA_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds a process keeps the model schemas fetched from the plugin daemon,"
+        " 0 to disable the cache",
+        default=600,
+    )
+
+    PLUGIN_MODEL_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of tenant model provider lists and of model schemas kept per process",
+        default=2048,
+    )
+
 
 class MarketplaceConfig(BaseSettings):
     """
@@ -439,6 +488,12 @@ class LoggingConfig(BaseSettings):
         default="UTC",
     )
 
+    STARTUP_IMPORT_REPORT_ENABLED: bool = Field(
+        description="Log the time, imported modules and heaviest packages of each startup step,"
+        " to find the dependencies slowing down the startup of API and worker processes",
+        default=False,
+    )
+
 
 class ModelLoadBalanceConfig(BaseSettings):
     """
@@ -455,6 +510,40 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    MODEL_LB_LOCAL_STATE_ENABLED: bool = Field(
+        description="Keep the load balancing cursor and cooldown state in worker memory"
+        " instead of querying Redis before every model invocation",
+        default=False,
+    )
+
+    MODEL_LB_STRATEGY: Literal["weighted_round_robin", "least_in_flight"] = Field(
+        description="Selection strategy used when MODEL_LB_LOCAL_STATE_ENABLED is true",
+        default="weighted_round_robin",
+    )
+
+    MODEL_LB_COOLDOWN_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds a worker trusts its local view of a load balancing config's cooldown state"
+        " before checking Redis again",
+        default=5.0,
+    )
+
+
+class ProviderConfigurationsCacheConfig(BaseSettings):
+    """
+    Configuration for the process cache of tenant model provider configurations
+    """
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds a process keeps the model provider configurations of a tenant,"
+        " provider, model and credential changes invalidate them earlier, 0 to disable the cache",
+        default=60,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of tenants whose model provider configurations are kept per process",
+        default=512,
+    )
+
 
 class BillingConfig(BaseSettings):
     """
@@ -508,6 +597,22 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_GRAPH_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs cached per process, 0 to disable the cache",
+        default=128,
+    )
+
+    WORKFLOW_NODE_RESULT_CACHE_BACKEND: Literal["redis", "memory"] = Field(
+        description="Storage for cached results of nodes with result caching enabled,"
+        " 'redis' is shared by all workers and 'memory' is a per-process LRU",
+        default="redis",
+    )
+
+    WORKFLOW_NODE_RESULT_CACHE_MAX_ENTRIES: PositiveInt = Field(
+        description="Maximum number of node results kept by the 'memory' node result cache backend",
+        default=1024,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -519,6 +624,17 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         default=100,
     )
 
+    WORKFLOW_WORKER_POOL_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of parallel branches running at a time in the worker pool shared by"
+        " all workflow runs of a process",
+        default=100,
+    )
+
+    WORKFLOW_WORKER_POOL_MAX_WORKERS_PER_RUN: PositiveInt = Field(
+        description="Maximum number of parallel branches of a single workflow run running at a time",
+        default=10,
+    )
+
     WORKFLOW_NODE_EXECUTION_STORAGE: str = Field(
         default="rdbms",
         description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid'",
@@ -727,6 +843,16 @@ class DataSetConfig(BaseSettings):
         default=30,
     )
 
+    CLEAN_MESSAGES_BATCH_SIZE: PositiveInt = Field(
+        description="Number of messages checked and deleted per transaction by the message cleanup task",
+        default=500,
+    )
+
+    CLEAN_EMBEDDING_CACHE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of cached embeddings deleted per transaction by the embedding cache cleanup task",
+        default=1000,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -749,11 +875,108 @@ class IndexingConfig(BaseSettings):
         default=4000,
     )
 
+    INDEXING_SEGMENTATION_LENGTH_IN_TOKENS: bool = Field(
+        description="Measure the length of segments in GPT-2 tokens instead of characters. Switching it changes the"
+        " chunk boundaries of the documents indexed afterwards, re-index the existing documents for consistent chunks",
+        default=False,
+    )
+
     CHILD_CHUNKS_PREVIEW_NUMBER: PositiveInt = Field(
         description="Maximum number of child chunks to preview",
         default=50,
     )
 
+    INDEXING_PIPELINE_ENABLED: bool = Field(
+        description="Index documents with the split, persist and embedding stages running concurrently,"
+        " connected by bounded queues",
+        default=False,
+    )
+
+    INDEXING_PIPELINE_QUEUE_SIZE: PositiveInt = Field(
+        description="Maximum number of items waiting in the queue of each indexing pipeline stage",
+        default=4,
+    )
+
+    INDEXING_PIPELINE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks embedded and upserted to the vector store in one indexing pipeline batch",
+        default=100,
+    )
+
+    INDEXING_PIPELINE_INDEX_WORKERS: PositiveInt = Field(
+        description="Number of indexing pipeline workers embedding and upserting chunks concurrently",
+        default=10,
+    )
+
+    INDEXING_INCREMENTAL_REINDEX_ENABLED: bool = Field(
+        description="Re-index synced Notion and website documents by the diff of their chunk hashes,"
+        " keeping the segments of unchanged chunks instead of re-embedding the whole document",
+        default=False,
+    )
+
+    QA_GENERATION_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of concurrent LLM calls generating the Q&A pairs of a document",
+        default=10,
+    )
+
+    QA_GENERATION_RATE_LIMIT_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of LLM calls generating Q&A pairs per minute for a workspace, 0 for no limit",
+        default=0,
+    )
+
+    QA_GENERATION_MAX_RETRIES: NonNegativeInt = Field(
+        description="Maximum number of retries of an LLM call generating Q&A pairs when rate limited by the provider",
+        default=3,
+    )
+
+
+class AppStatisticConfig(BaseSettings):
+    """
+    Configuration for pre-aggregated app statistics
+    """
+
+    APP_STATISTIC_ROLLUP_ENABLED: bool = Field(
+        description="Serve console statistics from hourly rollup tables maintained by a scheduled task",
+        default=False,
+    )
+
+    APP_STATISTIC_ROLLUP_SETTLE_MINUTES: NonNegativeInt = Field(
+        description="Minutes to wait after an hour ends before rolling it up,"
+        " so that tokens and latency of in-progress messages are final",
+        default=60,
+    )
+
+    APP_STATISTIC_ROLLUP_BATCH_HOURS: PositiveInt = Field(
+        description="Number of hours aggregated per transaction by the rollup task",
+        default=24,
+    )
+
+
+class SemanticAnswerCacheConfig(BaseSettings):
+    """
+    Configuration for serving near-duplicate chat queries from previous answers
+    """
+
+    SEMANTIC_ANSWER_CACHE_ENABLED: bool = Field(
+        description="Serve answers of chat apps with annotation reply enabled from previous answers"
+        " to semantically similar queries, without invoking the LLM",
+        default=False,
+    )
+
+    SEMANTIC_ANSWER_CACHE_SCORE_THRESHOLD: PositiveFloat = Field(
+        description="Minimum similarity score between a query and a cached query to serve the cached answer",
+        default=0.95,
+    )
+
+    SEMANTIC_ANSWER_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a cached answer can be served",
+        default=86400,
+    )
+
+    SEMANTIC_ANSWER_CACHE_MAX_ENTRIES: PositiveInt = Field(
+        description="Maximum number of cached answers per app, the least recently served ones are evicted first",
+        default=1000,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -867,6 +1090,7 @@ class AccountConfig(BaseSettings):
 class FeatureConfig(
     # place the configs in alphabet order
     AppExecutionConfig,
+    AppStatisticConfig,
     AuthConfig,  # Changed from OAuthConfig to AuthConfig
     BillingConfig,
     CodeExecutionSandboxConfig,
@@ -885,8 +1109,10 @@ class FeatureConfig(
     ModerationConfig,
     MultiModalTransferConfig,
     PositionConfig,
+    ProviderConfigurationsCacheConfig,
     RagEtlConfig,
     SecurityConfig,
+    SemanticAnswerCacheConfig,
     ToolConfig,
     UpdateConfig,
     WorkflowConfig,
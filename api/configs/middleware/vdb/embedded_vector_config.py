@@ -0,0 +1,14 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class EmbeddedVectorConfig(BaseSettings):
+    """
+    Configuration settings for the embedded vector store, kept on the local disk and searched in process
+    """
+
+    EMBEDDED_VECTOR_STORE_PATH: str = Field(
+        description="Directory of the collections of the embedded vector store, it must be shared by the API"
+        " and worker processes (e.g., the same host or a shared volume)",
+        default="storage/embedded_vector_store",
+    )
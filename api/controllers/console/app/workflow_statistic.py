@@ -14,6 +14,7 @@ from libs.helper import DatetimeString
 from libs.login import login_required
 from models.enums import WorkflowRunTriggeredFrom
 from models.model import AppMode
+from services.app_statistic_service import AppStatisticService
 
 
 class WorkflowDailyRunsStatistic(Resource):
@@ -29,23 +30,10 @@ class WorkflowDailyRunsStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    COUNT(id) AS runs
-FROM
-    workflow_runs
-WHERE
-    app_id = :app_id
-    AND triggered_from = :triggered_from"""
-        arg_dict = {
-            "tz": account.timezone,
-            "app_id": app_model.id,
-            "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value,
-        }
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -53,9 +41,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -63,17 +49,10 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
-
-        sql_query += " GROUP BY date ORDER BY date"
-
-        response_data = []
-
-        with db.engine.begin() as conn:
-            rs = conn.execute(db.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "runs": i.runs})
+        statistics = AppStatisticService.get_daily_workflow_run_statistics(
+            app_id=app_model.id, timezone=account.timezone, start=start_datetime_utc, end=end_datetime_utc
+        )
+        response_data = [{"date": i["date"], "runs": i["workflow_run_count"]} for i in statistics]
 
         return jsonify({"data": response_data})
 
@@ -153,23 +132,10 @@ class WorkflowDailyTokenCostStatistic(Resource):
         parser.add_argument("end", type=DatetimeString("%Y-%m-%d %H:%M"), location="args")
         args = parser.parse_args()
 
-        sql_query = """SELECT
-    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
-    SUM(workflow_runs.total_tokens) AS token_count
-FROM
-    workflow_runs
-WHERE
-    app_id = :app_id
-    AND triggered_from = :triggered_from"""
-        arg_dict = {
-            "tz": account.timezone,
-            "app_id": app_model.id,
-            "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value,
-        }
-
         timezone = pytz.timezone(account.timezone)
         utc_timezone = pytz.utc
 
+        start_datetime_utc = None
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
             start_datetime = start_datetime.replace(second=0)
@@ -177,9 +143,7 @@ WHERE
             start_datetime_timezone = timezone.localize(start_datetime)
             start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at >= :start"
-            arg_dict["start"] = start_datetime_utc
-
+        end_datetime_utc = None
         if args["end"]:
             end_datetime = datetime.strptime(args["end"], "%Y-%m-%d %H:%M")
             end_datetime = end_datetime.replace(second=0)
@@ -187,22 +151,10 @@ WHERE
             end_datetime_timezone = timezone.localize(end_datetime)
             end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
 
-            sql_query += " AND created_at < :end"
-            arg_dict["end"] = end_datetime_utc
-
-        sql_query += " GROUP BY date ORDER BY date"
-
-        response_data = []
-
-        with db.engine.begin() as conn:
-            rs = conn.execute(db.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {
-                        "date": str(i.date),
-                        "token_count": i.token_count,
-                    }
-                )
+        statistics = AppStatisticService.get_daily_workflow_run_statistics(
+            app_id=app_model.id, timezone=account.timezone, start=start_datetime_utc, end=end_datetime_utc
+        )
+        response_data = [{"date": i["date"], "token_count": i["workflow_total_tokens"]} for i in statistics]
 
         return jsonify({"data": response_data})
 
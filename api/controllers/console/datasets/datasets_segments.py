@@ -1,6 +1,5 @@
 import uuid
 
-import pandas as pd
 from flask import request
 from flask_login import current_user  # type: ignore
 from flask_restful import Resource, marshal, reqparse  # type: ignore
@@ -366,6 +365,8 @@ class DatasetDocumentSegmentBatchImportApi(Resource):
         if not file.filename.endswith(".csv"):
             raise ValueError("Invalid file type. Only CSV files are allowed")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
@@ -2,6 +2,7 @@ from collections.abc import Generator
 from typing import Any, cast
 
 from core.app.apps.base_app_generate_response_converter import AppGenerateResponseConverter
+from core.app.apps.stream_event_encoder import MessageChunkEncoder
 from core.app.entities.task_entities import (
     AppBlockingResponse,
     AppStreamResponse,
@@ -9,6 +10,7 @@ from core.app.entities.task_entities import (
     ChatbotAppStreamResponse,
     ErrorStreamResponse,
     MessageEndStreamResponse,
+    MessageStreamResponse,
     NodeFinishStreamResponse,
     NodeStartStreamResponse,
     PingStreamResponse,
@@ -63,6 +65,7 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_chunk_encoder = MessageChunkEncoder()
         for chunk in stream_response:
             chunk = cast(ChatbotAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -81,6 +84,8 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
+            elif isinstance(sub_stream_response, MessageStreamResponse):
+                response_chunk = message_chunk_encoder.chunk(response_chunk, sub_stream_response)
             else:
                 response_chunk.update(sub_stream_response.to_dict())
             yield response_chunk
@@ -94,6 +99,7 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_chunk_encoder = MessageChunkEncoder()
         for chunk in stream_response:
             chunk = cast(ChatbotAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -117,6 +123,8 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
+            elif isinstance(sub_stream_response, MessageStreamResponse):
+                response_chunk = message_chunk_encoder.chunk(response_chunk, sub_stream_response)
             elif isinstance(sub_stream_response, NodeStartStreamResponse | NodeFinishStreamResponse):
                 response_chunk.update(sub_stream_response.to_ignore_detail_dict())
             else:
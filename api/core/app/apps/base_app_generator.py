@@ -1,8 +1,15 @@
+import contextvars
 import json
+import queue
+import threading
+import time
 from collections.abc import Generator, Mapping, Sequence
-from typing import TYPE_CHECKING, Any, Optional, Union
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
 
+from configs import dify_config
 from core.app.app_config.entities import VariableEntityType
+from core.app.apps.stream_event_encoder import MessageChunk
 from core.file import File, FileUploadConfig
 from factories import file_factory
 
@@ -10,6 +17,15 @@ if TYPE_CHECKING:
     from core.app.app_config.entities import VariableEntity
 
 
+# seconds a closed event stream waits for the reader of its source to stop
+_EVENT_STREAM_READER_JOIN_TIMEOUT = 1.0
+
+
+@dataclass
+class _EventStreamSourceEnd:
+    error: Optional[Exception] = None
+
+
 class BaseAppGenerator:
     def _prepare_user_inputs(
         self,
@@ -150,12 +166,93 @@ class BaseAppGenerator:
         if isinstance(generator, dict):
             return generator
         else:
+            coalesce_window = dify_config.APP_STREAM_COALESCE_WINDOW_MS / 1000
+
+            def encode(message: Mapping | str) -> str:
+                if isinstance(message, MessageChunk):
+                    return message.to_event_stream()
+                elif isinstance(message, Mapping | dict):
+                    return f"data: {json.dumps(message)}\n\n"
+                else:
+                    return f"event: {message}\n\n"
 
             def gen():
-                for message in generator:
-                    if isinstance(message, Mapping | dict):
-                        yield f"data: {json.dumps(message)}\n\n"
-                    else:
-                        yield f"event: {message}\n\n"
+                if coalesce_window <= 0:
+                    for message in generator:
+                        yield encode(message)
+                    return
+
+                # message chunks received within the coalesce window are sent as one frame. The source is
+                # read in a thread, so pending chunks are flushed when the window ends even if the source
+                # stalls, e.g. while the LLM is thinking
+                messages: queue.Queue = queue.Queue()
+                stopped = threading.Event()
+                reader = threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(cls._read_event_stream_source, generator, messages, stopped),
+                    daemon=True,
+                )
+                reader.start()
+
+                pending: Optional[MessageChunk] = None
+                flush_at = 0.0
+                try:
+                    while True:
+                        try:
+                            if pending is None:
+                                item = messages.get()
+                            else:
+                                item = messages.get(timeout=max(flush_at - time.perf_counter(), 0))
+                        except queue.Empty:
+                            yield encode(cast(MessageChunk, pending))
+                            pending = None
+                            continue
+
+                        if isinstance(item, _EventStreamSourceEnd):
+                            if item.error is not None:
+                                raise item.error
+                            break
+
+                        if isinstance(item, MessageChunk):
+                            if pending is not None:
+                                if time.perf_counter() < flush_at and pending.merge(item):
+                                    continue
+
+                                yield encode(pending)
+
+                            pending = item
+                            flush_at = time.perf_counter() + coalesce_window
+                            continue
+
+                        if pending is not None:
+                            yield encode(pending)
+                            pending = None
+
+                        yield encode(item)
+
+                    if pending is not None:
+                        yield encode(pending)
+                finally:
+                    # the source shares the contexts of this request, give it a moment to finish before they are
+                    # torn down. A source still waiting for its next message is not waited for, the reader closes
+                    # it once that message comes
+                    stopped.set()
+                    reader.join(timeout=_EVENT_STREAM_READER_JOIN_TIMEOUT)
 
             return gen()
+
+    @staticmethod
+    def _read_event_stream_source(
+        generator: Generator[Mapping | str, None, None], messages: queue.Queue, stopped: threading.Event
+    ) -> None:
+        try:
+            for message in generator:
+                if stopped.is_set():
+                    generator.close()
+                    break
+
+                messages.put(message)
+        except Exception as e:
+            messages.put(_EventStreamSourceEnd(error=e))
+        else:
+            messages.put(_EventStreamSourceEnd())
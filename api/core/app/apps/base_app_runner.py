@@ -13,6 +13,7 @@ from core.app.entities.app_invoke_entities import (
 from core.app.entities.queue_entities import QueueAgentMessageEvent, QueueLLMChunkEvent, QueueMessageEndEvent
 from core.app.features.annotation_reply.annotation_reply import AnnotationReplyFeature
 from core.app.features.hosting_moderation.hosting_moderation import HostingModerationFeature
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
 from core.external_data_tool.external_data_fetch import ExternalDataFetch
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance
@@ -29,6 +30,7 @@ from core.prompt.advanced_prompt_transform import AdvancedPromptTransform
 from core.prompt.entities.advanced_prompt_entities import ChatModelMessage, CompletionModelPromptTemplate, MemoryConfig
 from core.prompt.simple_prompt_transform import ModelMode, SimplePromptTransform
 from models.model import App, AppMode, Message, MessageAnnotation
+from tasks.add_semantic_answer_cache_task import add_semantic_answer_cache_task
 
 if TYPE_CHECKING:
     from core.file.models import File
@@ -264,25 +266,29 @@ class AppRunner:
         queue_manager: AppQueueManager,
         stream: bool,
         agent: bool = False,
-    ) -> None:
+    ) -> LLMResult:
         """
         Handle invoke result
         :param invoke_result: invoke result
         :param queue_manager: application queue manager
         :param stream: stream
         :param agent: agent
-        :return:
+        :return: the complete llm result
         """
         if not stream and isinstance(invoke_result, LLMResult):
-            self._handle_invoke_result_direct(invoke_result=invoke_result, queue_manager=queue_manager, agent=agent)
+            return self._handle_invoke_result_direct(
+                invoke_result=invoke_result, queue_manager=queue_manager, agent=agent
+            )
         elif stream and isinstance(invoke_result, Generator):
-            self._handle_invoke_result_stream(invoke_result=invoke_result, queue_manager=queue_manager, agent=agent)
+            return self._handle_invoke_result_stream(
+                invoke_result=invoke_result, queue_manager=queue_manager, agent=agent
+            )
         else:
             raise NotImplementedError(f"unsupported invoke result type: {type(invoke_result)}")
 
     def _handle_invoke_result_direct(
         self, invoke_result: LLMResult, queue_manager: AppQueueManager, agent: bool
-    ) -> None:
+    ) -> LLMResult:
         """
         Handle invoke result direct
         :param invoke_result: invoke result
@@ -297,9 +303,11 @@ class AppRunner:
             PublishFrom.APPLICATION_MANAGER,
         )
 
+        return invoke_result
+
     def _handle_invoke_result_stream(
         self, invoke_result: Generator, queue_manager: AppQueueManager, agent: bool
-    ) -> None:
+    ) -> LLMResult:
         """
         Handle invoke result
         :param invoke_result: invoke result
@@ -342,6 +350,8 @@ class AppRunner:
             PublishFrom.APPLICATION_MANAGER,
         )
 
+        return llm_result
+
     def moderation_for_inputs(
         self,
         *,
@@ -441,3 +451,25 @@ class AppRunner:
         return annotation_reply_feature.query(
             app_record=app_record, message=message, query=query, user_id=user_id, invoke_from=invoke_from
         )
+
+    def query_semantic_answer_cache(self, app_record: App, config_hash: str, query: str) -> Optional[str]:
+        """
+        Query cached answer of a semantically similar query
+        :param app_record: app record
+        :param config_hash: hash of the app config and inputs
+        :param query: query
+        :return: cached answer
+        """
+        semantic_answer_cache_feature = SemanticAnswerCacheFeature()
+        return semantic_answer_cache_feature.query(app_record=app_record, config_hash=config_hash, query=query)
+
+    def add_semantic_answer_cache(self, app_record: App, config_hash: str, query: str, answer: str) -> None:
+        """
+        Add answer to the semantic answer cache asynchronously
+        :param app_record: app record
+        :param config_hash: hash of the app config and inputs
+        :param query: query
+        :param answer: answer
+        :return:
+        """
+        add_semantic_answer_cache_task.delay(app_record.id, app_record.tenant_id, config_hash, query, answer)
@@ -1,13 +1,16 @@
 import logging
 from typing import cast
 
+from configs import dify_config
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.apps.base_app_runner import AppRunner
 from core.app.apps.chat.app_config_manager import ChatAppConfig
 from core.app.entities.app_invoke_entities import (
     ChatAppGenerateEntity,
+    InvokeFrom,
 )
 from core.app.entities.queue_entities import QueueAnnotationReplyEvent
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
 from core.callback_handler.index_tool_callback_handler import DatasetIndexToolCallbackHandler
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance
@@ -131,6 +134,35 @@ class ChatAppRunner(AppRunner):
                 )
                 return
 
+        # semantic answer cache, only for the first query of a conversation without files,
+        # since history, files and external data are not part of the cache key
+        semantic_cache_config_hash = None
+        if (
+            dify_config.SEMANTIC_ANSWER_CACHE_ENABLED
+            and query
+            and not memory
+            and not files
+            and not app_config.external_data_variables
+            and not app_config.sensitive_word_avoidance
+            and application_generate_entity.invoke_from != InvokeFrom.DEBUGGER
+        ):
+            semantic_cache_config_hash = SemanticAnswerCacheFeature.get_config_hash(
+                app_model_config_dict=app_config.app_model_config_dict, inputs=inputs
+            )
+            cached_answer = self.query_semantic_answer_cache(
+                app_record=app_record, config_hash=semantic_cache_config_hash, query=query
+            )
+
+            if cached_answer:
+                self.direct_output(
+                    queue_manager=queue_manager,
+                    app_generate_entity=application_generate_entity,
+                    prompt_messages=prompt_messages,
+                    text=cached_answer,
+                    stream=application_generate_entity.stream,
+                )
+                return
+
         # fill in variable inputs from external data tools if exists
         external_data_tools = app_config.external_data_variables
         if external_data_tools:
@@ -214,6 +246,12 @@ class ChatAppRunner(AppRunner):
         )
 
         # handle invoke result
-        self._handle_invoke_result(
+        llm_result = self._handle_invoke_result(
             invoke_result=invoke_result, queue_manager=queue_manager, stream=application_generate_entity.stream
         )
+
+        answer = llm_result.message.content
+        if semantic_cache_config_hash and query and answer and isinstance(answer, str):
+            self.add_semantic_answer_cache(
+                app_record=app_record, config_hash=semantic_cache_config_hash, query=query, answer=answer
+            )
@@ -2,12 +2,14 @@ from collections.abc import Generator
 from typing import cast
 
 from core.app.apps.base_app_generate_response_converter import AppGenerateResponseConverter
+from core.app.apps.stream_event_encoder import MessageChunkEncoder
 from core.app.entities.task_entities import (
     AppStreamResponse,
     CompletionAppBlockingResponse,
     CompletionAppStreamResponse,
     ErrorStreamResponse,
     MessageEndStreamResponse,
+    MessageStreamResponse,
     PingStreamResponse,
 )
 
@@ -58,6 +60,7 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_chunk_encoder = MessageChunkEncoder()
         for chunk in stream_response:
             chunk = cast(CompletionAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -75,6 +78,8 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
+            elif isinstance(sub_stream_response, MessageStreamResponse):
+                response_chunk = message_chunk_encoder.chunk(response_chunk, sub_stream_response)
             else:
                 response_chunk.update(sub_stream_response.to_dict())
             yield response_chunk
@@ -88,6 +93,7 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_chunk_encoder = MessageChunkEncoder()
         for chunk in stream_response:
             chunk = cast(CompletionAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -110,6 +116,8 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
+            elif isinstance(sub_stream_response, MessageStreamResponse):
+                response_chunk = message_chunk_encoder.chunk(response_chunk, sub_stream_response)
             else:
                 response_chunk.update(sub_stream_response.to_dict())
 
@@ -0,0 +1,106 @@
+import json
+from collections.abc import Hashable, Mapping
+from typing import Any, Optional
+
+from core.app.entities.task_entities import MessageStreamResponse
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj)
+
+
+class MessageChunk(dict):
+    """
+    A converted `message` event whose SSE frame reuses the envelope encoded by its MessageChunkEncoder,
+    so that only the answer delta is serialized per token
+    """
+
+    __slots__ = ("_encoder", "_envelope_key")
+
+    _encoder: "MessageChunkEncoder"
+    _envelope_key: Hashable
+
+    def merge(self, other: "MessageChunk") -> bool:
+        """
+        Append the answer of a following chunk if both share the same envelope
+        :param other: following chunk
+        :return: whether the chunk was merged
+        """
+        if other._encoder is not self._encoder or other._envelope_key != self._envelope_key:
+            return False
+
+        self["answer"] += other["answer"]
+        return True
+
+    def to_event_stream(self) -> str:
+        return self._encoder.encode(self)
+
+
+class MessageChunkEncoder:
+    """
+    Per-stream encoder caching the JSON of every field of a `message` event except the answer
+    """
+
+    def __init__(self) -> None:
+        self._envelopes: dict[Hashable, tuple[str, str]] = {}
+
+    def chunk(self, response_chunk: Mapping[str, Any], stream_response: MessageStreamResponse) -> MessageChunk:
+        """
+        Build the converted chunk without dumping the pydantic model
+        :param response_chunk: envelope built by the converter
+        :param stream_response: message stream response
+        :return:
+        """
+        from_variable_selector = stream_response.from_variable_selector
+
+        chunk = MessageChunk(response_chunk)
+        chunk["event"] = stream_response.event.value
+        chunk["task_id"] = stream_response.task_id
+        chunk["id"] = stream_response.id
+        chunk["answer"] = stream_response.answer
+        chunk["from_variable_selector"] = from_variable_selector
+        chunk._encoder = self
+        chunk._envelope_key = (
+            tuple(response_chunk.values()),
+            stream_response.task_id,
+            stream_response.id,
+            tuple(from_variable_selector) if from_variable_selector is not None else None,
+        )
+        return chunk
+
+    def encode(self, chunk: MessageChunk) -> str:
+        """
+        Encode the chunk as an SSE frame, keeping the key order of json.dumps(chunk)
+        :param chunk: message chunk
+        :return:
+        """
+        envelope = self._envelopes.get(chunk._envelope_key)
+        if envelope is None:
+            envelope = self._encode_envelope(chunk)
+            self._envelopes[chunk._envelope_key] = envelope
+
+        prefix, suffix = envelope
+        return f"{prefix}{_dumps(chunk['answer'])}{suffix}"
+
+    @staticmethod
+    def _encode_envelope(chunk: MessageChunk) -> tuple[str, str]:
+        head: dict[str, Any] = {}
+        tail: Optional[dict[str, Any]] = None
+        for key, value in chunk.items():
+            if key == "answer":
+                tail = {}
+            elif tail is None:
+                head[key] = value
+            else:
+                tail[key] = value
+
+        prefix = "data: " + json.dumps(head)[:-1] + ', "answer": '
+        suffix = (", " + json.dumps(tail)[1:] if tail else "}") + "\n\n"
+        return prefix, suffix
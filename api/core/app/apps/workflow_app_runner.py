@@ -85,7 +85,7 @@ class WorkflowBasedAppRunner(AppRunner):
         if not isinstance(graph_config.get("edges"), list):
             raise ValueError("edges in workflow graph must be a list")
         # init graph
-        graph = Graph.init(graph_config=graph_config)
+        graph = Graph.get_or_init(graph_config=graph_config)
 
         if not graph:
             raise ValueError("graph not found in workflow")
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from configs import dify_config
+from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import Dataset
+from models.model import App, AppAnnotationSetting
+from services.dataset_service import DatasetCollectionBindingService
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCacheFeature:
+    """
+    Answers of previous queries, looked up by query similarity in the vector collection of the
+    app's annotation reply embedding model. Answers and their last hit time are kept in Redis,
+    so expired, evicted or outdated entries are never served even if their vectors remain.
+    """
+
+    # number of similar queries checked for an entry of the current app config
+    _TOP_K = 3
+
+    def query(self, app_record: App, config_hash: str, query: str) -> Optional[str]:
+        """
+        Query cached answer of a similar query
+        :param app_record: app record
+        :param config_hash: hash of the app config and inputs, see `get_config_hash`
+        :param query: query
+        :return: cached answer
+        """
+        try:
+            # skip the query embedding for apps without cached answers
+            if not redis_client.zcard(self._entries_key(app_record.id)):
+                return None
+
+            annotation_setting = self._get_annotation_setting(app_record.id)
+            if not annotation_setting:
+                return None
+
+            dataset = self._get_dataset(app_record.id, app_record.tenant_id, annotation_setting.collection_binding_id)
+            vector = Vector(dataset, attributes=["doc_id", "app_id"])
+            documents = vector.search_by_vector(
+                query=query,
+                top_k=self._TOP_K,
+                score_threshold=dify_config.SEMANTIC_ANSWER_CACHE_SCORE_THRESHOLD,
+                filter={"group_id": [dataset.id]},
+            )
+
+            stale_entry_ids = []
+            answer = None
+            for document in documents:
+                entry_id = (document.metadata or {}).get("doc_id")
+                if not entry_id:
+                    continue
+
+                entry = redis_client.get(self._entry_key(app_record.id, entry_id))
+                if entry is None:
+                    stale_entry_ids.append(entry_id)
+                    continue
+
+                entry = json.loads(entry)
+                if entry["config_hash"] == config_hash:
+                    redis_client.zadd(self._entries_key(app_record.id), {entry_id: time.time()})
+                    answer = entry["answer"]
+                    break
+
+            if stale_entry_ids:
+                self._delete_entries(vector, app_record.id, stale_entry_ids)
+
+            return answer
+        except Exception as e:
+            logger.warning(f"Query semantic answer cache failed, exception: {str(e)}.")
+            return None
+
+    def add(self, app_id: str, tenant_id: str, config_hash: str, query: str, answer: str) -> None:
+        """
+        Add answer of a query, evicting the least recently served answers over the per app limit
+        :param app_id: app id
+        :param tenant_id: tenant id
+        :param config_hash: hash of the app config and inputs, see `get_config_hash`
+        :param query: query
+        :param answer: answer
+        :return:
+        """
+        annotation_setting = self._get_annotation_setting(app_id)
+        if not annotation_setting:
+            return
+
+        dataset = self._get_dataset(app_id, tenant_id, annotation_setting.collection_binding_id)
+        vector = Vector(dataset, attributes=["doc_id", "app_id"])
+
+        entry_id = str(uuid.uuid4())
+        vector.create([Document(page_content=query, metadata={"doc_id": entry_id, "app_id": app_id})])
+        redis_client.setex(
+            self._entry_key(app_id, entry_id),
+            dify_config.SEMANTIC_ANSWER_CACHE_TTL,
+            json.dumps({"config_hash": config_hash, "answer": answer}),
+        )
+
+        entries_key = self._entries_key(app_id)
+        redis_client.zadd(entries_key, {entry_id: time.time()})
+        overflow = redis_client.zcard(entries_key) - dify_config.SEMANTIC_ANSWER_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [entry_id.decode() for entry_id, _ in redis_client.zpopmin(entries_key, overflow)]
+            self._delete_entries(vector, app_id, evicted)
+
+    def clear(self, app_id: str, tenant_id: str, collection_binding_id: str) -> None:
+        """
+        Delete all cached answers of an app
+        :param app_id: app id
+        :param tenant_id: tenant id
+        :param collection_binding_id: collection binding id of the annotation setting
+        :return:
+        """
+        entries_key = self._entries_key(app_id)
+        entry_ids = [entry_id.decode() for entry_id in redis_client.zrange(entries_key, 0, -1)]
+        if entry_ids:
+            dataset = self._get_dataset(app_id, tenant_id, collection_binding_id)
+            self._delete_entries(Vector(dataset, attributes=["doc_id", "app_id"]), app_id, entry_ids)
+
+        redis_client.delete(entries_key)
+
+    @staticmethod
+    def get_config_hash(app_model_config_dict: Mapping[str, Any], inputs: Mapping[str, Any]) -> str:
+        """
+        Hash everything besides the query that the answer depends on,
+        entries of a previous app config are never served
+        :param app_model_config_dict: app model config dict
+        :param inputs: inputs
+        :return:
+        """
+        payload = json.dumps({"config": app_model_config_dict, "inputs": inputs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _delete_entries(self, vector: Vector, app_id: str, entry_ids: list[str]) -> None:
+        vector.delete_by_ids(entry_ids)
+        redis_client.delete(*[self._entry_key(app_id, entry_id) for entry_id in entry_ids])
+        redis_client.zrem(self._entries_key(app_id), *entry_ids)
+
+    @staticmethod
+    def _get_annotation_setting(app_id: str) -> Optional[AppAnnotationSetting]:
+        return db.session.query(AppAnnotationSetting).filter(AppAnnotationSetting.app_id == app_id).first()
+
+    @staticmethod
+    def _get_dataset(app_id: str, tenant_id: str, collection_binding_id: str) -> Dataset:
+        """
+        Pseudo dataset sharing the collection binding of the annotations, with its own group id
+        """
+        dataset_collection_binding = DatasetCollectionBindingService.get_dataset_collection_binding_by_id_and_type(
+            collection_binding_id, "annotation"
+        )
+        return Dataset(
+            id=str(uuid.uuid5(uuid.NAMESPACE_OID, f"semantic_answer_cache:{app_id}")),
+            tenant_id=tenant_id,
+            indexing_technique="high_quality",
+            embedding_model_provider=dataset_collection_binding.provider_name,
+            embedding_model=dataset_collection_binding.model_name,
+            collection_binding_id=dataset_collection_binding.id,
+        )
+
+    @staticmethod
+    def _entry_key(app_id: str, entry_id: str) -> str:
+        return f"semantic_answer_cache:{app_id}:{entry_id}"
+
+    @staticmethod
+    def _entries_key(app_id: str) -> str:
+        return f"semantic_answer_cache_entries:{app_id}"
@@ -197,11 +197,13 @@ class ModelLoadBalancingConfiguration(BaseModel):
     - id: 配置ID
     - name: 配置名称
     - credentials: 凭证信息
+    - weight: 权重，仅在进程内加权负载均衡策略下生效
     """
 
     id: str
     name: str
     credentials: dict
+    weight: int = 1
 
 
 class ModelSettings(BaseModel):
@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+from Crypto.Cipher import AES
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class CredentialsCache:
+    """
+    Two tier cache of decrypted credentials.
+
+    Values are kept in a process-local LRU and in Redis, sealed with AES-GCM under a key derived
+    from SECRET_KEY so no plaintext credentials are stored in Redis. Sealed values live under the
+    `sealed:` key namespace, so workers of earlier versions reading the plain cache keys never see
+    them. Deletes are broadcast over Redis pub/sub to drop the local copies of every process, the
+    local tier is only used while the process is subscribed.
+    """
+
+    _EXPIRE_SECONDS = 86400
+    _INVALIDATION_CHANNEL = "credentials_cache_invalidation"
+    _SEALED_KEY_PREFIX = "sealed:"
+
+    _local_cache: TTLCache = TTLCache(
+        maxsize=dify_config.CREDENTIALS_CACHE_LOCAL_MAX_SIZE, ttl=dify_config.CREDENTIALS_CACHE_LOCAL_TTL
+    )
+    _local_cache_lock = threading.Lock()
+    _subscriber_pid: Optional[int] = None
+    _subscribed = False
+    # bumped on every invalidation, so a value read from Redis before it is not cached locally
+    _invalidations = 0
+
+    def __init__(self, cache_key: str):
+        self.cache_key = cache_key
+        self.sealed_cache_key = f"{self._SEALED_KEY_PREFIX}{cache_key}"
+
+    def get(self) -> Optional[dict]:
+        """
+        Get cached credentials.
+
+        :return:
+        """
+        if CredentialsCache._subscribed:
+            with self._local_cache_lock:
+                credentials = self._local_cache.get(self.cache_key)
+            if credentials is not None:
+                return dict(credentials)
+
+        invalidations = CredentialsCache._invalidations
+        sealed_credentials = redis_client.get(self.sealed_cache_key)
+        if not sealed_credentials:
+            return None
+
+        try:
+            credentials = json.loads(self._unseal(sealed_credentials))
+        except ValueError:
+            # sealed with another secret key
+            return None
+
+        self._set_local(credentials, invalidations)
+        return dict(credentials)
+
+    def set(self, credentials: dict) -> None:
+        """
+        Cache credentials.
+
+        :param credentials: credentials
+        :return:
+        """
+        invalidations = CredentialsCache._invalidations
+        redis_client.setex(self.sealed_cache_key, self._EXPIRE_SECONDS, self._seal(json.dumps(credentials)))
+        self._set_local(credentials, invalidations)
+
+    def delete(self) -> None:
+        """
+        Delete cached credentials in Redis and in every process.
+
+        :return:
+        """
+        # the plaintext value may have been cached by a worker of an earlier version
+        redis_client.delete(self.sealed_cache_key, self.cache_key)
+        self._invalidate_local(self.cache_key)
+
+        redis_client.publish(self._INVALIDATION_CHANNEL, self.cache_key)
+
+    def _set_local(self, credentials: dict, invalidations: int) -> None:
+        if not dify_config.CREDENTIALS_CACHE_LOCAL_TTL:
+            return
+
+        self._ensure_subscribed()
+        with self._local_cache_lock:
+            if CredentialsCache._invalidations == invalidations:
+                self._local_cache[self.cache_key] = dict(credentials)
+
+    @classmethod
+    def _invalidate_local(cls, cache_key: Optional[str] = None) -> None:
+        with cls._local_cache_lock:
+            CredentialsCache._invalidations += 1
+            if cache_key is None:
+                cls._local_cache.clear()
+            else:
+                cls._local_cache.pop(cache_key, None)
+
+    def _seal(self, data: str) -> bytes:
+        cipher = AES.new(_get_sealing_key(), AES.MODE_GCM)
+        cipher.update(self.cache_key.encode())
+        ciphertext, tag = cipher.encrypt_and_digest(data.encode())
+        return cipher.nonce + tag + ciphertext
+
+    def _unseal(self, data: bytes) -> str:
+        cipher = AES.new(_get_sealing_key(), AES.MODE_GCM, nonce=data[:16])
+        cipher.update(self.cache_key.encode())
+        return cipher.decrypt_and_verify(data[32:], data[16:32]).decode()
+
+    @classmethod
+    def _ensure_subscribed(cls) -> None:
+        pid = os.getpid()
+        if CredentialsCache._subscriber_pid == pid:
+            return
+
+        with cls._local_cache_lock:
+            if CredentialsCache._subscriber_pid == pid:
+                return
+
+            # the subscriber thread of a parent process does not survive a fork
+            CredentialsCache._subscriber_pid = pid
+            CredentialsCache._subscribed = False
+            CredentialsCache._invalidations += 1
+            cls._local_cache.clear()
+
+        threading.Thread(target=cls._listen_invalidations, name="CredentialsCacheInvalidation", daemon=True).start()
+
+    @classmethod
+    def _listen_invalidations(cls) -> None:
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(cls._INVALIDATION_CHANNEL)
+                # invalidations may have been missed while not subscribed
+                cls._invalidate_local()
+                CredentialsCache._subscribed = True
+
+                cls._receive_invalidations(pubsub)
+            except Exception:
+                logger.warning("Credentials cache invalidation subscriber disconnected, retrying", exc_info=True)
+            finally:
+                CredentialsCache._subscribed = False
+
+            time.sleep(5)
+
+    @classmethod
+    def _receive_invalidations(cls, pubsub) -> None:
+        """
+        Drop the local copies of the cache keys deleted by any process, until the subscription ends.
+
+        :param pubsub: pub/sub subscribed to the invalidation channel
+        :return:
+        """
+        for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+
+            cache_key = message["data"]
+            if isinstance(cache_key, bytes):
+                cache_key = cache_key.decode()
+            cls._invalidate_local(cache_key)
+
+
+@functools.cache
+def _get_sealing_key() -> bytes:
+    return hashlib.sha256(f"credentials_cache:{dify_config.SECRET_KEY}".encode()).digest()
@@ -1,10 +1,24 @@
+import hashlib
 import json
+import threading
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import Future
 from enum import Enum
-from json import JSONDecodeError
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, TypeVar
 
+from cachetools import TTLCache
+
+from configs import dify_config
+from core.helper.credentials_cache import CredentialsCache
 from extensions.ext_redis import redis_client
 
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+    from core.model_runtime.entities.model_entities import AIModelEntity
+    from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+
+T = TypeVar("T")
+
 
 class ProviderCredentialsCacheType(Enum):
     PROVIDER = "provider"
@@ -12,41 +26,211 @@ class ProviderCredentialsCacheType(Enum):
     LOAD_BALANCING_MODEL = "load_balancing_provider_model"
 
 
-class ProviderCredentialsCache:
+class ProviderCredentialsCache(CredentialsCache):
     def __init__(self, tenant_id: str, identity_id: str, cache_type: ProviderCredentialsCacheType):
-        self.cache_key = f"{cache_type.value}_credentials:tenant_id:{tenant_id}:id:{identity_id}"
+        super().__init__(f"{cache_type.value}_credentials:tenant_id:{tenant_id}:id:{identity_id}")
+
+
+class ProviderConfigurationsCache:
+    """
+    Process cache of the provider configurations of a tenant.
+
+    Configurations are cached with the configurations version of the tenant, kept in Redis and
+    bumped by `delete` on every provider, model and credential change, so the processes rebuild
+    them on their next get. Entries also expire after PROVIDER_CONFIGURATIONS_CACHE_TTL for the
+    changes not tracked by the version, like hosting configurations and plugin provider schemas.
+    """
+
+    # outlives the local entries, an expired version can't match a cached one
+    _VERSION_EXPIRE_SECONDS = 86400
+
+    _local_cache: TTLCache = TTLCache(
+        maxsize=dify_config.PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE,
+        ttl=dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL or 1,
+    )
+    _local_cache_lock = threading.Lock()
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.version_key = f"provider_configurations_version:tenant_id:{tenant_id}"
+
+    def get_version(self) -> int:
+        """
+        Get the configurations version of the tenant.
+
+        :return:
+        """
+        version = redis_client.get(self.version_key)
+        return int(version) if version else 0
 
-    def get(self) -> Optional[dict]:
+    def get(self, version: int) -> Optional["ProviderConfigurations"]:
         """
-        Get cached model provider credentials.
+        Get cached configurations of the version.
 
+        :param version: configurations version of the tenant
         :return:
         """
-        cached_provider_credentials = redis_client.get(self.cache_key)
-        if cached_provider_credentials:
-            try:
-                cached_provider_credentials = cached_provider_credentials.decode("utf-8")
-                cached_provider_credentials = json.loads(cached_provider_credentials)
-            except JSONDecodeError:
-                return None
+        if not dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL:
+            return None
 
-            return dict(cached_provider_credentials)
-        else:
+        with self._local_cache_lock:
+            cached = self._local_cache.get(self.tenant_id)
+        if cached is None or cached[0] != version:
             return None
 
-    def set(self, credentials: dict) -> None:
+        return cached[1]
+
+    def set(self, version: int, configurations: "ProviderConfigurations") -> None:
+        """
+        Cache configurations.
+
+        :param version: configurations version of the tenant read before the configurations were built
+        :param configurations: provider configurations
+        :return:
+        """
+        if not dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL:
+            return
+
+        with self._local_cache_lock:
+            self._local_cache[self.tenant_id] = (version, configurations)
+
+    def delete(self) -> None:
         """
-        Cache model provider credentials.
+        Invalidate the cached configurations of the tenant in every process.
 
-        :param credentials: provider credentials
         :return:
         """
-        redis_client.setex(self.cache_key, 86400, json.dumps(credentials))
+        redis_client.incr(self.version_key)
+        redis_client.expire(self.version_key, self._VERSION_EXPIRE_SECONDS)
+        with self._local_cache_lock:
+            self._local_cache.pop(self.tenant_id, None)
+
+
+class PluginModelCache:
+    """
+    Process cache of the model providers and model schemas fetched from the plugin daemon.
+
+    Provider lists are cached with the plugin version of the tenant, kept in Redis and bumped by
+    `delete` when plugins are installed, upgraded or uninstalled. Schemas are keyed by the plugin
+    unique identifier, which changes with every plugin version, and by a hash of the credentials.
+    Concurrent misses of the same entry share a single request to the plugin daemon.
+    """
+
+    _VERSION_EXPIRE_SECONDS = 86400
+
+    _providers_cache: TTLCache = TTLCache(
+        maxsize=dify_config.PLUGIN_MODEL_CACHE_MAX_SIZE,
+        ttl=dify_config.PLUGIN_MODEL_PROVIDERS_CACHE_TTL or 1,
+    )
+    _schemas_cache: TTLCache = TTLCache(
+        maxsize=dify_config.PLUGIN_MODEL_CACHE_MAX_SIZE,
+        ttl=dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL or 1,
+    )
+    _lock = threading.Lock()
+    # entries being fetched, waited on by the concurrent misses
+    _fetching: dict[Hashable, Future] = {}
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.version_key = f"plugin_model_cache_version:tenant_id:{tenant_id}"
+
+    def get_providers(
+        self, fetch: Callable[[], Sequence["PluginModelProviderEntity"]]
+    ) -> Sequence["PluginModelProviderEntity"]:
+        """
+        Get the model providers of the tenant, fetched on a miss.
+
+        :param fetch: fetch the model providers from the plugin daemon
+        :return: model providers, shared by the callers and must not be modified
+        """
+        if not dify_config.PLUGIN_MODEL_PROVIDERS_CACHE_TTL:
+            return fetch()
+
+        version = redis_client.get(self.version_key)
+        key = ("providers", self.tenant_id, int(version) if version else 0)
+        return self._get_or_fetch(self._providers_cache, key, fetch)
+
+    def get_model_schema(
+        self,
+        *,
+        plugin_unique_identifier: str,
+        provider: str,
+        model_type: str,
+        model: str,
+        credentials: Optional[dict],
+        fetch: Callable[[], Optional["AIModelEntity"]],
+    ) -> Optional["AIModelEntity"]:
+        """
+        Get a model schema, fetched on a miss. Missing schemas are not cached.
+
+        :param plugin_unique_identifier: unique identifier of the plugin providing the model
+        :param provider: provider name
+        :param model_type: model type
+        :param model: model name
+        :param credentials: model credentials
+        :param fetch: fetch the model schema from the plugin daemon
+        :return: model schema, shared by the callers and must not be modified
+        """
+        if not dify_config.PLUGIN_MODEL_SCHEMA_CACHE_TTL:
+            return fetch()
+
+        key = (
+            "schema",
+            self.tenant_id,
+            plugin_unique_identifier,
+            provider,
+            model_type,
+            model,
+            self.hash_credentials(credentials),
+        )
+        return self._get_or_fetch(self._schemas_cache, key, fetch)
+
+    @staticmethod
+    def hash_credentials(credentials: Optional[dict]) -> str:
+        """
+        Hash credentials for cache keys.
+
+        :param credentials: credentials
+        :return: hex digest
+        """
+        return hashlib.sha256(json.dumps(credentials or {}, sort_keys=True, default=str).encode()).hexdigest()
 
     def delete(self) -> None:
         """
-        Delete cached model provider credentials.
+        Invalidate the cached model providers of the tenant in every process, with the provider
+        configurations built from them.
 
         :return:
         """
-        redis_client.delete(self.cache_key)
+        redis_client.incr(self.version_key)
+        redis_client.expire(self.version_key, self._VERSION_EXPIRE_SECONDS)
+        ProviderConfigurationsCache(self.tenant_id).delete()
+
+    @classmethod
+    def _get_or_fetch(cls, cache: TTLCache, key: Hashable, fetch: Callable[[], T]) -> T:
+        with cls._lock:
+            if key in cache:
+                return cache[key]
+
+            future = cls._fetching.get(key)
+            leader = future is None
+            if future is None:
+                future = cls._fetching[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with cls._lock:
+                del cls._fetching[key]
+            future.set_exception(e)
+            raise
+
+        with cls._lock:
+            if value is not None:
+                cache[key] = value
+            del cls._fetching[key]
+        future.set_result(value)
+        return value
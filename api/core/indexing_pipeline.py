@@ -0,0 +1,221 @@
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from flask import Flask
+from opentelemetry.metrics import get_meter
+
+_meter = get_meter("indexing_pipeline")
+_stage_duration_histogram = _meter.create_histogram(
+    "indexing.pipeline.stage.duration",
+    description="Time an indexing pipeline stage spent on an item",
+    unit="s",
+)
+_stage_blocked_histogram = _meter.create_histogram(
+    "indexing.pipeline.stage.blocked",
+    description="Time an indexing pipeline stage waited for room in the queue of the next stage",
+    unit="s",
+)
+
+# end of the input of a stage worker
+_END = object()
+# interval of the checks for a stopped pipeline while waiting on a queue
+_POLL_INTERVAL = 0.1
+
+
+class _PipelineStoppedError(Exception):
+    pass
+
+
+@dataclass
+class PipelineStage:
+    """
+    Stage of an indexing pipeline.
+
+    `process(item, emit)` handles an item of the input of the stage and passes its results to
+    the next stages with `emit(stage_name, item, partition=None)`. Items emitted with a partition
+    are always handled by the same worker of the stage, the other ones by any worker. `finish(emit)`
+    runs once after all workers of the stage handled their input.
+    """
+
+    name: str
+    process: Callable[[Any, Callable[..., None]], None]
+    outputs: tuple[str, ...] = ()
+    workers: int = 1
+    partitioned: bool = False
+    finish: Optional[Callable[[Callable[..., None]], None]] = None
+
+
+@dataclass
+class StageStats:
+    items: int = 0
+    # time spent on items, including the time blocked
+    busy_seconds: float = 0
+    # time waiting for room in the queues of the next stages
+    blocked_seconds: float = 0
+    # time waiting for input
+    idle_seconds: float = 0
+
+
+class IndexingPipeline:
+    """
+    Stages connected by bounded queues, every worker of a stage runs in its own thread.
+
+    A stage blocks while the queue of a next stage is full, so the items in flight and the memory
+    they hold are bounded by the queue sizes whatever the size of the input. The first error of a
+    stage stops all stages and is raised by `run`.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage], queue_size: int):
+        self._stages = list(stages)
+        self._queues: dict[str, list[queue.Queue]] = {
+            stage.name: [queue.Queue(maxsize=queue_size) for _ in range(stage.workers if stage.partitioned else 1)]
+            for stage in self._stages
+        }
+        # stages still sending items to each stage, the input of the first stage comes from `run`
+        self._producers = {stage.name: 0 for stage in self._stages}
+        self._producers[self._stages[0].name] = 1
+        for stage in self._stages:
+            for output in stage.outputs:
+                self._producers[output] += 1
+        self._workers = {stage.name: stage.workers for stage in self._stages}
+        self._running_workers = dict(self._workers)
+        self.stats = {stage.name: StageStats() for stage in self._stages}
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._local = threading.local()
+
+    def run(self, flask_app: Flask, source: Iterable[Any]) -> dict[str, StageStats]:
+        """
+        Feed the items of the source to the first stage and wait for all stages to finish.
+
+        :param flask_app: app whose context the stage workers run in
+        :param source: input of the first stage
+        :return: stats of the stages
+        """
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(flask_app, stage, worker_index),
+                name=f"IndexingPipeline-{stage.name}-{worker_index}",
+                daemon=True,
+            )
+            for stage in self._stages
+            for worker_index in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        first_stage = self._stages[0].name
+        try:
+            for item in source:
+                self.emit(first_stage, item)
+            self._close_input(first_stage)
+        except _PipelineStoppedError:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return self.stats
+
+    def emit(self, stage_name: str, item: Any, partition: Optional[int] = None) -> None:
+        """
+        Send an item to a stage, blocks while the queue of the stage is full.
+
+        :param stage_name: name of the stage
+        :param item: item
+        :param partition: partition of the item, for partitioned stages
+        """
+        queues = self._queues[stage_name]
+        self._put(queues[partition % len(queues) if partition is not None else 0], item)
+
+    def _work(self, flask_app: Flask, stage: PipelineStage, worker_index: int) -> None:
+        stats = self.stats[stage.name]
+        input_queue = self._queues[stage.name][worker_index % len(self._queues[stage.name])]
+        self._local.stage_name = stage.name
+        with flask_app.app_context():
+            try:
+                while True:
+                    waited_at = time.perf_counter()
+                    item = self._get(input_queue)
+                    started_at = time.perf_counter()
+                    with self._lock:
+                        stats.idle_seconds += started_at - waited_at
+                    if item is _END:
+                        break
+
+                    stage.process(item, self.emit)
+
+                    duration = time.perf_counter() - started_at
+                    _stage_duration_histogram.record(duration, {"stage": stage.name})
+                    with self._lock:
+                        stats.items += 1
+                        stats.busy_seconds += duration
+
+                with self._lock:
+                    self._running_workers[stage.name] -= 1
+                    last_worker = not self._running_workers[stage.name]
+                if last_worker:
+                    if stage.finish is not None:
+                        stage.finish(self.emit)
+                    for output in stage.outputs:
+                        self._close_input(output)
+            except _PipelineStoppedError:
+                pass
+            except BaseException as e:
+                self._fail(e)
+
+    def _close_input(self, stage_name: str) -> None:
+        with self._lock:
+            self._producers[stage_name] -= 1
+            closed = not self._producers[stage_name]
+        if not closed:
+            return
+
+        queues = self._queues[stage_name]
+        for worker_index in range(self._workers[stage_name]):
+            self._put(queues[worker_index % len(queues)], _END)
+
+    def _put(self, stage_queue: queue.Queue, item: Any) -> None:
+        blocked_at = time.perf_counter()
+        while True:
+            if self._stopped.is_set():
+                raise _PipelineStoppedError()
+            try:
+                stage_queue.put(item, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+
+        blocked = time.perf_counter() - blocked_at
+        # items of the source are put by the caller of run
+        stage_name: Optional[str] = getattr(self._local, "stage_name", None)
+        if stage_name is not None:
+            _stage_blocked_histogram.record(blocked, {"stage": stage_name})
+            with self._lock:
+                self.stats[stage_name].blocked_seconds += blocked
+
+    def _get(self, stage_queue: queue.Queue) -> Any:
+        while True:
+            if self._stopped.is_set():
+                raise _PipelineStoppedError()
+            try:
+                return stage_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stopped.set()
@@ -1,3 +1,4 @@
+import collections
 import concurrent.futures
 import datetime
 import json
@@ -10,11 +11,13 @@ from typing import Any, Optional, cast
 
 from flask import current_app
 from flask_login import current_user  # type: ignore
+from sqlalchemy import func, select, update
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from configs import dify_config
 from core.entities.knowledge_entities import IndexingEstimate, PreviewDetail, QAPreviewDetail
 from core.errors.error import ProviderTokenNotInitError
+from core.indexing_pipeline import IndexingPipeline, PipelineStage
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.rag.cleaner.clean_processor import CleanProcessor
@@ -38,6 +41,7 @@ from libs import helper
 from models.dataset import ChildChunk, Dataset, DatasetProcessRule, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from models.model import UploadFile
+from services.entities.knowledge_entities.knowledge_entities import ParentMode
 from services.feature_service import FeatureService
 
 
@@ -66,6 +70,10 @@ class IndexingRunner:
                     raise ValueError("no process rule found")
                 index_type = dataset_document.doc_form
                 index_processor = IndexProcessorFactory(index_type).init_index_processor()
+                if self._can_run_pipelined(dataset_document, processing_rule.to_dict()):
+                    self._run_pipelined(index_processor, dataset, dataset_document, processing_rule.to_dict())
+                    continue
+
                 # extract
                 text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
@@ -108,6 +116,23 @@ class IndexingRunner:
             if not dataset:
                 raise ValueError("no dataset found")
 
+            # get the process rule
+            processing_rule = (
+                db.session.query(DatasetProcessRule)
+                .filter(DatasetProcessRule.id == dataset_document.dataset_process_rule_id)
+                .first()
+            )
+            if not processing_rule:
+                raise ValueError("no process rule found")
+
+            index_type = dataset_document.doc_form
+            index_processor = IndexProcessorFactory(index_type).init_index_processor()
+            pipelined = self._can_run_pipelined(dataset_document, processing_rule.to_dict())
+            if pipelined and self._get_indexing_checkpoint(dataset_document.id):
+                # resume the interrupted pipeline, the segments before the checkpoint are kept
+                self._run_pipelined(index_processor, dataset, dataset_document, processing_rule.to_dict(), resume=True)
+                return
+
             # get exist document_segment list and delete
             document_segments = DocumentSegment.query.filter_by(
                 dataset_id=dataset.id, document_id=dataset_document.id
@@ -119,17 +144,11 @@ class IndexingRunner:
                     # delete child chunks
                     db.session.query(ChildChunk).filter(ChildChunk.segment_id == document_segment.id).delete()
             db.session.commit()
-            # get the process rule
-            processing_rule = (
-                db.session.query(DatasetProcessRule)
-                .filter(DatasetProcessRule.id == dataset_document.dataset_process_rule_id)
-                .first()
-            )
-            if not processing_rule:
-                raise ValueError("no process rule found")
 
-            index_type = dataset_document.doc_form
-            index_processor = IndexProcessorFactory(index_type).init_index_processor()
+            if pipelined:
+                self._run_pipelined(index_processor, dataset, dataset_document, processing_rule.to_dict())
+                return
+
             # extract
             text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
@@ -172,37 +191,7 @@ class IndexingRunner:
                 dataset_id=dataset.id, document_id=dataset_document.id
             ).all()
 
-            documents = []
-            if document_segments:
-                for document_segment in document_segments:
-                    # transform segment to node
-                    if document_segment.status != "completed":
-                        document = Document(
-                            page_content=document_segment.content,
-                            metadata={
-                                "doc_id": document_segment.index_node_id,
-                                "doc_hash": document_segment.index_node_hash,
-                                "document_id": document_segment.document_id,
-                                "dataset_id": document_segment.dataset_id,
-                            },
-                        )
-                        if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
-                            child_chunks = document_segment.get_child_chunks()
-                            if child_chunks:
-                                child_documents = []
-                                for child_chunk in child_chunks:
-                                    child_document = ChildDocument(
-                                        page_content=child_chunk.content,
-                                        metadata={
-                                            "doc_id": child_chunk.index_node_id,
-                                            "doc_hash": child_chunk.index_node_hash,
-                                            "document_id": document_segment.document_id,
-                                            "dataset_id": document_segment.dataset_id,
-                                        },
-                                    )
-                                    child_documents.append(child_document)
-                                document.children = child_documents
-                        documents.append(document)
+            documents = self._get_unindexed_documents(dataset_document, document_segments)
 
             # build index
             # get the process rule
@@ -231,6 +220,105 @@ class IndexingRunner:
             dataset_document.stopped_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
             db.session.commit()
 
+    @staticmethod
+    def can_reindex_incrementally(dataset_document: DatasetDocument) -> bool:
+        """
+        Whether a document updated in place can be re-indexed by the diff of its chunk hashes, only the chunks of
+        paragraph documents are indexed on their own.
+        """
+        return (
+            dify_config.INDEXING_INCREMENTAL_REINDEX_ENABLED and dataset_document.doc_form == IndexType.PARAGRAPH_INDEX
+        )
+
+    def run_incremental(self, dataset_document: DatasetDocument):
+        """
+        Re-index a document whose content changed, only the chunks whose hash changed are embedded, inserted
+        or deleted. The segments of the unchanged chunks are kept, with their index.
+        """
+        try:
+            # get dataset
+            dataset = Dataset.query.filter_by(id=dataset_document.dataset_id).first()
+
+            if not dataset:
+                raise ValueError("no dataset found")
+
+            # get the process rule
+            processing_rule = (
+                db.session.query(DatasetProcessRule)
+                .filter(DatasetProcessRule.id == dataset_document.dataset_process_rule_id)
+                .first()
+            )
+            if not processing_rule:
+                raise ValueError("no process rule found")
+
+            index_processor = IndexProcessorFactory(dataset_document.doc_form).init_index_processor()
+
+            # extract
+            text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
+
+            # transform
+            documents = self._transform(
+                index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
+            )
+
+            # save the changed segments and index them
+            self._load_incremental(index_processor, dataset, dataset_document, documents)
+        except DocumentIsPausedError:
+            raise DocumentIsPausedError("Document paused, document id: {}".format(dataset_document.id))
+        except ProviderTokenNotInitError as e:
+            dataset_document.indexing_status = "error"
+            dataset_document.error = str(e.description)
+            dataset_document.stopped_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            db.session.commit()
+        except ObjectDeletedError:
+            logging.warning("Document deleted, document id: {}".format(dataset_document.id))
+        except Exception as e:
+            logging.exception("consume document failed")
+            dataset_document.indexing_status = "error"
+            dataset_document.error = str(e)
+            dataset_document.stopped_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            db.session.commit()
+
+    @staticmethod
+    def _get_unindexed_documents(
+        dataset_document: DatasetDocument, document_segments: list[DocumentSegment]
+    ) -> list[Document]:
+        """
+        Get the documents of the segments not indexed yet.
+        """
+        documents = []
+        for document_segment in document_segments:
+            # transform segment to node
+            if document_segment.status != "completed":
+                document = Document(
+                    page_content=document_segment.content,
+                    metadata={
+                        "doc_id": document_segment.index_node_id,
+                        "doc_hash": document_segment.index_node_hash,
+                        "document_id": document_segment.document_id,
+                        "dataset_id": document_segment.dataset_id,
+                    },
+                )
+                if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                    child_chunks = document_segment.get_child_chunks()
+                    if child_chunks:
+                        child_documents = []
+                        for child_chunk in child_chunks:
+                            child_document = ChildDocument(
+                                page_content=child_chunk.content,
+                                metadata={
+                                    "doc_id": child_chunk.index_node_id,
+                                    "doc_hash": child_chunk.index_node_hash,
+                                    "document_id": document_segment.document_id,
+                                    "dataset_id": document_segment.dataset_id,
+                                },
+                            )
+                            child_documents.append(child_document)
+                        document.children = child_documents
+                documents.append(document)
+
+        return documents
+
     def indexing_estimate(
         self,
         tenant_id: str,
@@ -518,17 +606,49 @@ class IndexingRunner:
         insert index and update document/segment status to completed
         """
 
-        embedding_model_instance = None
-        if dataset.indexing_technique == "high_quality":
-            embedding_model_instance = self.model_manager.get_model_instance(
-                tenant_id=dataset.tenant_id,
-                provider=dataset.embedding_model_provider,
-                model_type=ModelType.TEXT_EMBEDDING,
-                model=dataset.embedding_model,
-            )
+        embedding_model_instance = self._get_embedding_model_instance(dataset)
 
         # chunk nodes by chunk size
         indexing_start_at = time.perf_counter()
+        tokens = self._index_documents(index_processor, dataset, dataset_document, documents, embedding_model_instance)
+        indexing_end_at = time.perf_counter()
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.tokens: tokens,
+                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+
+    def _get_embedding_model_instance(self, dataset: Dataset) -> Optional[ModelInstance]:
+        if dataset.indexing_technique != "high_quality":
+            return None
+
+        return self.model_manager.get_model_instance(
+            tenant_id=dataset.tenant_id,
+            provider=dataset.embedding_model_provider,
+            model_type=ModelType.TEXT_EMBEDDING,
+            model=dataset.embedding_model,
+        )
+
+    def _index_documents(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        documents: list[Document],
+        embedding_model_instance: Optional[ModelInstance],
+    ) -> int:
+        """
+        Create the keyword and vector indexes of the documents and update their segments to completed.
+
+        :return: tokens of the documents
+        """
         tokens = 0
         if dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX:
             # create keyword index
@@ -570,19 +690,8 @@ class IndexingRunner:
                     tokens += future.result()
         if dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX:
             create_keyword_thread.join()
-        indexing_end_at = time.perf_counter()
 
-        # update document status to completed
-        self._update_document_index_status(
-            document_id=dataset_document.id,
-            after_indexing_status="completed",
-            extra_update_params={
-                DatasetDocument.tokens: tokens,
-                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
-                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
-                DatasetDocument.error: None,
-            },
-        )
+        return tokens
 
     @staticmethod
     def _process_keyword_index(flask_app, dataset_id, document_id, documents):
@@ -743,6 +852,349 @@ class IndexingRunner:
         )
         pass
 
+    def _load_incremental(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        documents: list[Document],
+    ) -> None:
+        """
+        Diff the chunks of the document with its segments by content hash: a chunk with the hash of an indexed
+        segment keeps the segment, the other chunks get new segments and the segments left are deleted.
+        """
+        segments = db.session.execute(
+            select(
+                DocumentSegment.id,
+                DocumentSegment.index_node_id,
+                DocumentSegment.index_node_hash,
+                DocumentSegment.tokens,
+                DocumentSegment.status,
+                DocumentSegment.enabled,
+                DocumentSegment.answer,
+            )
+            .where(DocumentSegment.dataset_id == dataset.id, DocumentSegment.document_id == dataset_document.id)
+            .order_by(DocumentSegment.position)
+        ).all()
+
+        # indexed segments by the hash of their content, a chunk repeated in the document takes one segment each
+        reusable_segments: dict[str, collections.deque] = collections.defaultdict(collections.deque)
+        for segment in segments:
+            if segment.status == "completed" and segment.enabled and segment.index_node_hash and not segment.answer:
+                reusable_segments[segment.index_node_hash].append(segment)
+
+        kept_segment_ids = set()
+        kept_tokens = 0
+        new_documents = []
+        for document in documents:
+            candidates = reusable_segments.get(document.metadata.get("doc_hash"))
+            if candidates:
+                segment = candidates.popleft()
+                document.metadata["doc_id"] = segment.index_node_id
+                kept_segment_ids.add(segment.id)
+                kept_tokens += segment.tokens
+            else:
+                new_documents.append(document)
+
+        removed_segments = [segment for segment in segments if segment.id not in kept_segment_ids]
+        if removed_segments:
+            # delete from vector index, an empty list of ids would delete the index of the dataset
+            index_node_ids = [segment.index_node_id for segment in removed_segments if segment.index_node_id]
+            if index_node_ids:
+                index_processor.clean(dataset, index_node_ids, with_keywords=True)
+            db.session.query(DocumentSegment).filter(
+                DocumentSegment.id.in_([segment.id for segment in removed_segments])
+            ).delete(synchronize_session=False)
+            db.session.commit()
+
+        if new_documents:
+            doc_store = DatasetDocumentStore(
+                dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+            )
+            doc_store.add_documents(docs=new_documents)
+
+        # the new segments were added after the kept ones, order all of them as the chunks
+        positions = {document.metadata["doc_id"]: position for position, document in enumerate(documents, start=1)}
+        moved_segments = [
+            {"id": segment_id, "position": positions[index_node_id]}
+            for segment_id, index_node_id, position in db.session.execute(
+                select(DocumentSegment.id, DocumentSegment.index_node_id, DocumentSegment.position).where(
+                    DocumentSegment.dataset_id == dataset.id, DocumentSegment.document_id == dataset_document.id
+                )
+            )
+            if index_node_id in positions and positions[index_node_id] != position
+        ]
+        if moved_segments:
+            db.session.execute(update(DocumentSegment), moved_segments)
+        db.session.commit()
+
+        # update document status to indexing
+        cur_time = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="indexing",
+            extra_update_params={
+                DatasetDocument.cleaning_completed_at: cur_time,
+                DatasetDocument.splitting_completed_at: cur_time,
+            },
+        )
+
+        # update the new segments to indexing
+        DocumentSegment.query.filter_by(document_id=dataset_document.id, status="waiting").update(
+            {
+                DocumentSegment.status: "indexing",
+                DocumentSegment.indexing_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+            }
+        )
+        db.session.commit()
+
+        indexing_start_at = time.perf_counter()
+        tokens = 0
+        if new_documents:
+            embedding_model_instance = self._get_embedding_model_instance(dataset)
+            tokens = self._index_documents(
+                index_processor, dataset, dataset_document, new_documents, embedding_model_instance
+            )
+        indexing_end_at = time.perf_counter()
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.tokens: kept_tokens + tokens,
+                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+
+    @staticmethod
+    def _can_run_pipelined(dataset_document: DatasetDocument, process_rule: dict) -> bool:
+        if not dify_config.INDEXING_PIPELINE_ENABLED:
+            return False
+
+        # the parent chunk of the full doc mode is made of all text documents
+        rules = process_rule.get("rules") or {}
+        if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+            return rules.get("parent_mode") != ParentMode.FULL_DOC
+        return True
+
+    def _run_pipelined(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        process_rule: dict,
+        resume: bool = False,
+    ) -> None:
+        """
+        Index the document with the transform, persist, index and keyword stages running concurrently.
+
+        The chunks of every extracted text document are transformed and persisted in order, then
+        embedded and upserted in batches while the next text documents are split. A checkpoint is
+        saved after the chunks of a text document are persisted, an interrupted run resumed from it
+        skips the text documents already persisted and indexes their segments not completed yet.
+        """
+        flask_app = current_app._get_current_object()  # type: ignore
+        checkpoint = self._get_indexing_checkpoint(dataset_document.id) if resume else None
+        tokens = 0
+        indexing_start_at = time.perf_counter()
+        if checkpoint:
+            self._delete_segments_after_position(dataset_document, checkpoint["position"])
+        else:
+            redis_client.delete(self._indexing_checkpoint_key(dataset_document.id))
+
+        text_docs = self._extract(index_processor, dataset_document, process_rule)
+        # load the attributes expired by the commits here, the stages read them from their threads
+        db.session.refresh(dataset)
+        db.session.refresh(dataset_document)
+        embedding_model_instance = self._get_embedding_model_instance(dataset)
+        if checkpoint:
+            document_segments = DocumentSegment.query.filter_by(
+                dataset_id=dataset.id, document_id=dataset_document.id
+            ).all()
+            tokens += self._index_documents(
+                index_processor,
+                dataset,
+                dataset_document,
+                self._get_unindexed_documents(dataset_document, document_segments),
+                embedding_model_instance,
+            )
+
+        doc_store = DatasetDocumentStore(
+            dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+        )
+        batch_size = dify_config.INDEXING_PIPELINE_BATCH_SIZE
+        index_workers = dify_config.INDEXING_PIPELINE_INDEX_WORKERS
+        index_vectors = dataset.indexing_technique == "high_quality"
+        index_keywords = dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX
+        # chunks waiting to be sent to each index worker and to the keyword stage
+        index_batches: list[list[Document]] = [[] for _ in range(index_workers)]
+        # the keyword table of the dataset is loaded and saved for every batch, use larger ones
+        keyword_batch_size = batch_size * index_workers
+        keyword_batch: list[Document] = []
+        batch_tokens: list[int] = []
+
+        def transform(item: tuple[int, Document], emit) -> None:
+            text_doc_index, text_doc = item
+            documents = self._transform(
+                index_processor, dataset, [text_doc], dataset_document.doc_language, process_rule
+            )
+            emit("persist", (text_doc_index, documents))
+
+        def persist(item: tuple[int, list[Document]], emit) -> None:
+            text_doc_index, documents = item
+            self._check_document_paused_status(dataset_document.id)
+            if documents:
+                doc_store.add_documents(
+                    docs=documents, save_child=dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX
+                )
+                DocumentSegment.query.filter_by(document_id=dataset_document.id, status="waiting").update(
+                    {
+                        DocumentSegment.status: "indexing",
+                        DocumentSegment.indexing_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                    }
+                )
+                db.session.commit()
+            self._set_indexing_checkpoint(dataset_document.id, text_doc_index + 1)
+
+            for document in documents:
+                if index_vectors:
+                    # the same content is always indexed by the same worker, avoiding insertion deadlocks
+                    partition = int(helper.generate_text_hash(document.page_content), 16) % index_workers
+                    index_batches[partition].append(document)
+                    if len(index_batches[partition]) >= batch_size:
+                        emit("index", index_batches[partition], partition=partition)
+                        index_batches[partition] = []
+                if index_keywords:
+                    keyword_batch.append(document)
+                    if len(keyword_batch) >= keyword_batch_size:
+                        emit("keyword", keyword_batch[:])
+                        keyword_batch.clear()
+
+        def finish_persist(emit) -> None:
+            for partition, documents in enumerate(index_batches):
+                if documents:
+                    emit("index", documents, partition=partition)
+            if keyword_batch:
+                emit("keyword", keyword_batch[:])
+
+            # all chunks are persisted
+            cur_time = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            self._update_document_index_status(
+                document_id=dataset_document.id,
+                after_indexing_status="indexing",
+                extra_update_params={
+                    DatasetDocument.cleaning_completed_at: cur_time,
+                    DatasetDocument.splitting_completed_at: cur_time,
+                },
+            )
+
+        def index(documents: list[Document], emit) -> None:
+            batch_tokens.append(
+                self._process_chunk(
+                    flask_app, index_processor, documents, dataset, dataset_document, embedding_model_instance
+                )
+            )
+
+        def create_keywords(documents: list[Document], emit) -> None:
+            self._process_keyword_index(flask_app, dataset.id, dataset_document.id, documents)
+
+        stages = [
+            PipelineStage(name="transform", process=transform, outputs=("persist",)),
+            PipelineStage(
+                name="persist",
+                process=persist,
+                outputs=tuple(
+                    name for name, enabled in (("index", index_vectors), ("keyword", index_keywords)) if enabled
+                ),
+                finish=finish_persist,
+            ),
+        ]
+        if index_vectors:
+            stages.append(PipelineStage(name="index", process=index, workers=index_workers, partitioned=True))
+        if index_keywords:
+            stages.append(PipelineStage(name="keyword", process=create_keywords))
+
+        # the transform stage holds the only reference to a text document once it is handed over
+        pending_text_docs = collections.deque(enumerate(text_docs))
+        text_docs.clear()
+        for _ in range(min(checkpoint["text_docs"] if checkpoint else 0, len(pending_text_docs))):
+            pending_text_docs.popleft()
+
+        def source():
+            while pending_text_docs:
+                yield pending_text_docs.popleft()
+
+        stats = IndexingPipeline(stages, queue_size=dify_config.INDEXING_PIPELINE_QUEUE_SIZE).run(flask_app, source())
+        indexing_end_at = time.perf_counter()
+        logging.info(
+            "Indexed document %s in pipeline, stages: %s",
+            dataset_document.id,
+            ", ".join(
+                f"{name} {stage_stats.items} items busy {stage_stats.busy_seconds:.2f}s"
+                f" blocked {stage_stats.blocked_seconds:.2f}s idle {stage_stats.idle_seconds:.2f}s"
+                for name, stage_stats in stats.items()
+            ),
+        )
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.tokens: tokens + sum(batch_tokens),
+                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+        redis_client.delete(self._indexing_checkpoint_key(dataset_document.id))
+
+    @staticmethod
+    def _indexing_checkpoint_key(document_id: str) -> str:
+        return "document_{}_indexing_checkpoint".format(document_id)
+
+    def _get_indexing_checkpoint(self, document_id: str) -> Optional[dict]:
+        """
+        Get the checkpoint of the indexing pipeline of the document: the number of text documents
+        whose chunks are persisted and the max position of their segments.
+        """
+        checkpoint = redis_client.get(self._indexing_checkpoint_key(document_id))
+        if not checkpoint:
+            return None
+        return cast(dict, json.loads(checkpoint))
+
+    def _set_indexing_checkpoint(self, document_id: str, text_docs: int) -> None:
+        position = (
+            db.session.query(func.max(DocumentSegment.position))
+            .filter(DocumentSegment.document_id == document_id)
+            .scalar()
+        )
+        redis_client.setex(
+            self._indexing_checkpoint_key(document_id),
+            86400,
+            json.dumps({"text_docs": text_docs, "position": position or 0}),
+        )
+
+    @staticmethod
+    def _delete_segments_after_position(dataset_document: DatasetDocument, position: int) -> None:
+        """
+        Delete the segments persisted after the checkpoint, they are not indexed yet.
+        """
+        segment_ids = db.session.query(DocumentSegment.id).filter(
+            DocumentSegment.document_id == dataset_document.id, DocumentSegment.position > position
+        )
+        if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+            db.session.query(ChildChunk).filter(ChildChunk.segment_id.in_(segment_ids.scalar_subquery())).delete(
+                synchronize_session=False
+            )
+        db.session.query(DocumentSegment).filter(
+            DocumentSegment.document_id == dataset_document.id, DocumentSegment.position > position
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
 
 class DocumentIsPausedError(Exception):
     pass
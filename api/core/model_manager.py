@@ -1,7 +1,12 @@
 import logging
+import threading
+import time
 from collections.abc import Callable, Generator, Iterable, Sequence
 from typing import IO, Any, Literal, Optional, Union, cast, overload
 
+from cachetools import LRUCache
+from opentelemetry.metrics import get_meter
+
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
 from core.entities.provider_configuration import ProviderConfiguration, ProviderModelBundle
@@ -26,6 +31,17 @@ from models.provider import ProviderType
 
 logger = logging.getLogger(__name__)
 
+_lb_meter = get_meter("model_load_balancing")
+_lb_selection_counter = _lb_meter.create_counter(
+    "model_lb.selections", description="Number of times a load balancing config was selected", unit="{selection}"
+)
+_lb_cooldown_counter = _lb_meter.create_counter(
+    "model_lb.cooldowns", description="Number of times a load balancing config was put in cooldown", unit="{cooldown}"
+)
+_lb_error_counter = _lb_meter.create_counter(
+    "model_lb.errors", description="Number of failed invocations per load balancing config", unit="{error}"
+)
+
 
 class ModelInstance:
     """
@@ -378,23 +394,34 @@ class ModelInstance:
                 else:
                     raise last_exception
 
+            self.load_balancing_manager.acquire(lb_config)
             try:
                 if "credentials" in kwargs:
                     del kwargs["credentials"]
-                return function(*args, **kwargs, credentials=lb_config.credentials)
+                result = function(*args, **kwargs, credentials=lb_config.credentials)
             except InvokeRateLimitError as e:
+                self.load_balancing_manager.release(lb_config, error=e)
                 # expire in 60 seconds
                 self.load_balancing_manager.cooldown(lb_config, expire=60)
                 last_exception = e
                 continue
             except (InvokeAuthorizationError, InvokeConnectionError) as e:
+                self.load_balancing_manager.release(lb_config, error=e)
                 # expire in 10 seconds
                 self.load_balancing_manager.cooldown(lb_config, expire=10)
                 last_exception = e
                 continue
             except Exception as e:
+                self.load_balancing_manager.release(lb_config, error=e)
                 raise e
 
+            if isinstance(result, Generator) and self.load_balancing_manager.tracks_in_flight:
+                # streaming responses stay in flight until the stream is consumed
+                return self.load_balancing_manager.release_after_stream(lb_config, result)
+
+            self.load_balancing_manager.release(lb_config)
+            return result
+
     def get_tts_voices(self, language: Optional[str] = None) -> list:
         """
         Invoke large language tts model voices
@@ -495,12 +522,30 @@ class LBModelManager:
                 else:
                     load_balancing_config.credentials = managed_credentials
 
+        self._local_state: Optional[_LocalLBState] = None
+        if dify_config.MODEL_LB_LOCAL_STATE_ENABLED:
+            self._local_state = _get_local_lb_state(self._cache_key_prefix())
+
+    @property
+    def tracks_in_flight(self) -> bool:
+        """
+        Whether in-flight invocations are counted for this manager
+        """
+        return self._local_state is not None
+
     def fetch_next(self) -> Optional[ModelLoadBalancingConfiguration]:
         """
         Get next model load balancing config
-        Strategy: Round Robin
+        Strategy: Round Robin, or the configured in-process strategy if local state is enabled
         :return:
         """
+        if self._local_state is not None:
+            config = self._fetch_next_local(self._local_state)
+            if config:
+                self._record_selection(config)
+
+            return config
+
         cache_key = "model_lb_index:{}:{}:{}:{}".format(
             self._tenant_id, self._provider, self._model_type.value, self._model
         )
@@ -533,17 +578,96 @@ class LBModelManager:
 
                 continue
 
-            if dify_config.DEBUG:
-                logger.info(
-                    f"Model LB\nid: {config.id}\nname:{config.name}\n"
-                    f"tenant_id: {self._tenant_id}\nprovider: {self._provider}\n"
-                    f"model_type: {self._model_type.value}\nmodel: {self._model}"
-                )
-
+            self._record_selection(config)
             return config
 
         return None
 
+    def _fetch_next_local(self, state: "_LocalLBState") -> Optional[ModelLoadBalancingConfiguration]:
+        """
+        Choose the next config from worker-local state without a Redis round trip
+        :param state: local load balancing state
+        :return:
+        """
+        candidates = [config for config in self._load_balancing_configs if not self.in_cooldown(config)]
+        if not candidates:
+            # all configs are in cooldown
+            return None
+
+        with state.lock:
+            if dify_config.MODEL_LB_STRATEGY == "least_in_flight":
+                min_in_flight = min(state.in_flight.get(config.id, 0) for config in candidates)
+                candidates = [config for config in candidates if state.in_flight.get(config.id, 0) == min_in_flight]
+
+            # smooth weighted round robin, ties among least-in-flight configs are rotated the same way
+            total_weight = 0
+            selected = None
+            for config in candidates:
+                weight = max(config.weight, 1)
+                total_weight += weight
+                state.current_weights[config.id] = state.current_weights.get(config.id, 0) + weight
+                if selected is None or state.current_weights[config.id] > state.current_weights[selected.id]:
+                    selected = config
+
+            assert selected is not None
+            state.current_weights[selected.id] -= total_weight
+
+        return selected
+
+    def _record_selection(self, config: ModelLoadBalancingConfiguration) -> None:
+        if dify_config.DEBUG:
+            logger.info(
+                f"Model LB\nid: {config.id}\nname:{config.name}\n"
+                f"tenant_id: {self._tenant_id}\nprovider: {self._provider}\n"
+                f"model_type: {self._model_type.value}\nmodel: {self._model}"
+            )
+
+        _lb_selection_counter.add(1, self._metric_attributes(config))
+
+    def acquire(self, config: ModelLoadBalancingConfiguration) -> None:
+        """
+        Mark an invocation on the config as started
+        :param config: model load balancing config
+        :return:
+        """
+        if self._local_state is None:
+            return
+
+        with self._local_state.lock:
+            self._local_state.in_flight[config.id] = self._local_state.in_flight.get(config.id, 0) + 1
+
+    def release(self, config: ModelLoadBalancingConfiguration, error: Optional[Exception] = None) -> None:
+        """
+        Mark an invocation on the config as finished
+        :param config: model load balancing config
+        :param error: exception raised by the invocation, if any
+        :return:
+        """
+        if error is not None:
+            _lb_error_counter.add(1, {**self._metric_attributes(config), "error": type(error).__name__})
+
+        if self._local_state is None:
+            return
+
+        with self._local_state.lock:
+            in_flight = self._local_state.in_flight.get(config.id, 0) - 1
+            if in_flight > 0:
+                self._local_state.in_flight[config.id] = in_flight
+            else:
+                self._local_state.in_flight.pop(config.id, None)
+
+    def release_after_stream(self, config: ModelLoadBalancingConfiguration, stream: Generator) -> Generator:
+        """
+        Release the config once the streaming result is exhausted or closed
+        :param config: model load balancing config
+        :param stream: streaming result
+        :return:
+        """
+        try:
+            yield from stream
+        finally:
+            self.release(config)
+
     def cooldown(self, config: ModelLoadBalancingConfiguration, expire: int = 60) -> None:
         """
         Cooldown model load balancing config
@@ -555,7 +679,15 @@ class LBModelManager:
             self._tenant_id, self._provider, self._model_type.value, self._model, config.id
         )
 
+        # always written to Redis so that other workers learn about it
         redis_client.setex(cooldown_cache_key, expire, "true")
+        _lb_cooldown_counter.add(1, self._metric_attributes(config))
+
+        if self._local_state is not None:
+            now = time.monotonic()
+            with self._local_state.lock:
+                self._local_state.cooldown_until[config.id] = now + expire
+                self._local_state.cooldown_checked_at[config.id] = now
 
     def in_cooldown(self, config: ModelLoadBalancingConfiguration) -> bool:
         """
@@ -567,9 +699,54 @@ class LBModelManager:
             self._tenant_id, self._provider, self._model_type.value, self._model, config.id
         )
 
+        if self._local_state is not None:
+            return self._in_cooldown_local(self._local_state, config, cooldown_cache_key)
+
         res: bool = redis_client.exists(cooldown_cache_key)
         return res
 
+    @staticmethod
+    def _in_cooldown_local(state: "_LocalLBState", config: ModelLoadBalancingConfiguration, cache_key: str) -> bool:
+        """
+        Check cooldown against the local view, refreshing it from Redis once it is older than the cache ttl
+        :param state: local load balancing state
+        :param config: model load balancing config
+        :param cache_key: cooldown cache key
+        :return:
+        """
+        now = time.monotonic()
+        with state.lock:
+            cooldown_until = state.cooldown_until.get(config.id, 0.0)
+            checked_at = state.cooldown_checked_at.get(config.id)
+
+        if cooldown_until > now:
+            return True
+
+        if checked_at is not None and now - checked_at < dify_config.MODEL_LB_COOLDOWN_CACHE_TTL:
+            return False
+
+        # ttl is negative if the key does not exist
+        ttl = cast(int, redis_client.ttl(cache_key))
+        with state.lock:
+            state.cooldown_checked_at[config.id] = now
+            if ttl > 0:
+                state.cooldown_until[config.id] = now + ttl
+            else:
+                state.cooldown_until.pop(config.id, None)
+
+        return ttl > 0
+
+    def _cache_key_prefix(self) -> str:
+        return "{}:{}:{}:{}".format(self._tenant_id, self._provider, self._model_type.value, self._model)
+
+    def _metric_attributes(self, config: ModelLoadBalancingConfiguration) -> dict[str, str]:
+        return {
+            "provider": self._provider,
+            "model_type": self._model_type.value,
+            "model": self._model,
+            "config_id": config.id,
+        }
+
     @staticmethod
     def get_config_in_cooldown_and_ttl(
         tenant_id: str, provider: str, model_type: ModelType, model: str, config_id: str
@@ -593,3 +770,32 @@ class LBModelManager:
 
         ttl = cast(int, ttl)
         return True, ttl
+
+
+class _LocalLBState:
+    """
+    Worker-local load balancing state shared by every LBModelManager of the same tenant model
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # smooth weighted round robin cursor, keyed by config id
+        self.current_weights: dict[str, int] = {}
+        self.in_flight: dict[str, int] = {}
+        # monotonic timestamps, keyed by config id
+        self.cooldown_until: dict[str, float] = {}
+        self.cooldown_checked_at: dict[str, float] = {}
+
+
+_local_lb_states: LRUCache = LRUCache(maxsize=4096)
+_local_lb_states_lock = threading.Lock()
+
+
+def _get_local_lb_state(key: str) -> _LocalLBState:
+    with _local_lb_states_lock:
+        state = _local_lb_states.get(key)
+        if state is None:
+            state = _LocalLBState()
+            _local_lb_states[key] = state
+
+        return cast(_LocalLBState, state)
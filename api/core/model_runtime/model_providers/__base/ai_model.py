@@ -1,11 +1,11 @@
 import decimal
-import hashlib
 from threading import Lock
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
 import contexts
+from core.helper.model_provider_cache import PluginModelCache
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.defaults import PARAMETER_RULE_TEMPLATE
 from core.model_runtime.entities.model_entities import (
@@ -143,9 +143,7 @@ class AIModel(BaseModel):
         """
         plugin_model_manager = PluginModelManager()
         cache_key = f"{self.tenant_id}:{self.plugin_id}:{self.provider_name}:{self.model_type.value}:{model}"
-        # sort credentials
-        sorted_credentials = sorted(credentials.items()) if credentials else []
-        cache_key += ":".join([hashlib.md5(f"{k}:{v}".encode()).hexdigest() for k, v in sorted_credentials])
+        cache_key += f":{PluginModelCache.hash_credentials(credentials)}"
 
         try:
             contexts.plugin_model_schemas.get()
@@ -157,14 +155,21 @@ class AIModel(BaseModel):
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
-            schema = plugin_model_manager.get_model_schema(
-                tenant_id=self.tenant_id,
-                user_id="unknown",
-                plugin_id=self.plugin_id,
+            schema = PluginModelCache(self.tenant_id).get_model_schema(
+                plugin_unique_identifier=self.plugin_model_provider.plugin_unique_identifier,
                 provider=self.provider_name,
                 model_type=self.model_type.value,
                 model=model,
-                credentials=credentials or {},
+                credentials=credentials,
+                fetch=lambda: plugin_model_manager.get_model_schema(
+                    tenant_id=self.tenant_id,
+                    user_id="unknown",
+                    plugin_id=self.plugin_id,
+                    provider=self.provider_name,
+                    model_type=self.model_type.value,
+                    model=model,
+                    credentials=credentials or {},
+                ),
             )
 
             if schema:
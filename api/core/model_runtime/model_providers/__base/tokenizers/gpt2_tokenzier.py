@@ -1,4 +1,5 @@
 import logging
+import threading
 from threading import Lock
 from typing import Any
 
@@ -6,6 +7,8 @@ logger = logging.getLogger(__name__)
 
 _tokenizer: Any = None
 _lock = Lock()
+# encoders of the threads, the tokenizer of transformers can't be shared across threads
+_local = threading.local()
 
 
 class GPT2Tokenizer:
@@ -27,25 +30,59 @@ class GPT2Tokenizer:
         # return cast(int, result)
         return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
 
+    @staticmethod
+    def get_num_tokens_batch(texts: list[str]) -> list[int]:
+        """
+        Get the num tokens of texts with the encoder of the current thread, without taking any lock.
+        Special tokens in the texts are counted as plain text.
+
+        :param texts: texts
+        :return: num tokens of each text
+        """
+        if not texts:
+            return []
+
+        encoder = GPT2Tokenizer.get_thread_encoder()
+        if hasattr(encoder, "encode_ordinary"):
+            return [len(encoder.encode_ordinary(text)) for text in texts]
+        return [len(input_ids) for input_ids in encoder(texts)["input_ids"]]
+
+    @staticmethod
+    def get_thread_encoder() -> Any:
+        """
+        Get the encoder of the current thread, loaded on the first call of the thread.
+        """
+        encoder = getattr(_local, "encoder", None)
+        if encoder is None:
+            encoder = _local.encoder = GPT2Tokenizer._load_encoder()
+        return encoder
+
     @staticmethod
     def get_encoder() -> Any:
         global _tokenizer, _lock
+        if _tokenizer is not None:
+            return _tokenizer
+
         with _lock:
             if _tokenizer is None:
-                # Try to use tiktoken to get the tokenizer because it is faster
-                #
-                try:
-                    import tiktoken
+                _tokenizer = GPT2Tokenizer._load_encoder()
+            return _tokenizer
 
-                    _tokenizer = tiktoken.get_encoding("gpt2")
-                except Exception:
-                    from os.path import abspath, dirname, join
+    @staticmethod
+    def _load_encoder() -> Any:
+        # Try to use tiktoken to get the tokenizer because it is faster
+        #
+        try:
+            import tiktoken
 
-                    from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer  # type: ignore
+            return tiktoken.get_encoding("gpt2")
+        except Exception:
+            from os.path import abspath, dirname, join
 
-                    base_path = abspath(__file__)
-                    gpt2_tokenizer_path = join(dirname(base_path), "gpt2")
-                    _tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
-                    logger.info("Fallback to Transformers' GPT-2 tokenizer from tiktoken")
+            from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer  # type: ignore
 
-            return _tokenizer
+            base_path = abspath(__file__)
+            gpt2_tokenizer_path = join(dirname(base_path), "gpt2")
+            tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
+            logger.info("Fallback to Transformers' GPT-2 tokenizer from tiktoken")
+            return tokenizer
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 from collections.abc import Sequence
@@ -8,6 +7,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 import contexts
+from core.helper.model_provider_cache import PluginModelCache
 from core.helper.position_helper import get_provider_position_map, sort_to_dict_by_position_map
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderConfig, ProviderEntity, SimpleProviderEntity
@@ -34,11 +34,10 @@ class ModelProviderExtension(BaseModel):
 
 
 class ModelProviderFactory:
-    provider_position_map: dict[str, int]
+    # parsed once per process, a factory is created for every model instance
+    provider_position_map: dict[str, int] = {}
 
     def __init__(self, tenant_id: str) -> None:
-        self.provider_position_map = {}
-
         self.tenant_id = tenant_id
         self.plugin_model_manager = PluginModelManager()
 
@@ -48,7 +47,7 @@ class ModelProviderFactory:
             model_providers_path = os.path.dirname(current_path)
 
             # get _position.yaml file path
-            self.provider_position_map = get_provider_position_map(model_providers_path)
+            ModelProviderFactory.provider_position_map = get_provider_position_map(model_providers_path)
 
     def get_providers(self) -> Sequence[ProviderEntity]:
         """
@@ -92,14 +91,24 @@ class ModelProviderFactory:
             contexts.plugin_model_providers.set(plugin_model_providers)
 
             # Fetch plugin model providers
-            plugin_providers = self.plugin_model_manager.fetch_model_providers(self.tenant_id)
-
-            for provider in plugin_providers:
-                provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
-                plugin_model_providers.append(provider)
+            plugin_model_providers.extend(
+                PluginModelCache(self.tenant_id).get_providers(self._fetch_plugin_model_providers)
+            )
 
             return plugin_model_providers
 
+    def _fetch_plugin_model_providers(self) -> list[PluginModelProviderEntity]:
+        """
+        Fetch all plugin model providers from the plugin daemon
+        :return: list of plugin model providers
+        """
+        plugin_providers = self.plugin_model_manager.fetch_model_providers(self.tenant_id)
+
+        for provider in plugin_providers:
+            provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
+
+        return list(plugin_providers)
+
     def get_provider_schema(self, provider: str) -> ProviderEntity:
         """
         Get provider schema
@@ -208,9 +217,7 @@ class ModelProviderFactory:
         """
         plugin_id, provider_name = self.get_plugin_id_and_provider_name_from_provider(provider)
         cache_key = f"{self.tenant_id}:{plugin_id}:{provider_name}:{model_type.value}:{model}"
-        # sort credentials
-        sorted_credentials = sorted(credentials.items()) if credentials else []
-        cache_key += ":".join([hashlib.md5(f"{k}:{v}".encode()).hexdigest() for k, v in sorted_credentials])
+        cache_key += f":{PluginModelCache.hash_credentials(credentials)}"
 
         try:
             contexts.plugin_model_schemas.get()
@@ -222,14 +229,21 @@ class ModelProviderFactory:
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
-            schema = self.plugin_model_manager.get_model_schema(
-                tenant_id=self.tenant_id,
-                user_id="unknown",
-                plugin_id=plugin_id,
+            schema = PluginModelCache(self.tenant_id).get_model_schema(
+                plugin_unique_identifier=self.get_plugin_model_provider(provider).plugin_unique_identifier,
                 provider=provider_name,
                 model_type=model_type.value,
                 model=model,
-                credentials=credentials or {},
+                credentials=credentials,
+                fetch=lambda: self.plugin_model_manager.get_model_schema(
+                    tenant_id=self.tenant_id,
+                    user_id="unknown",
+                    plugin_id=plugin_id,
+                    provider=provider_name,
+                    model_type=model_type.value,
+                    model=model,
+                    credentials=credentials or {},
+                ),
             )
 
             if schema:
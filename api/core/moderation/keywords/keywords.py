@@ -1,9 +1,40 @@
-from collections.abc import Sequence
+from functools import lru_cache
 from typing import Any
 
 from core.moderation.base import Moderation, ModerationAction, ModerationInputsResult, ModerationOutputsResult
 
 
+class KeywordsMatcher:
+    """
+    Case-insensitive matcher of the keywords of a moderation config, built once per keywords config.
+    """
+
+    def __init__(self, keywords: str):
+        # Filter out empty values
+        lowered_keywords = {keyword.lower() for keyword in keywords.split("\n") if keyword}
+        # a keyword containing another keyword can only match where the other one does
+        self._keywords = tuple(
+            sorted(
+                (
+                    keyword
+                    for keyword in lowered_keywords
+                    if not any(other != keyword and other in keyword for other in lowered_keywords)
+                ),
+                key=len,
+            )
+        )
+
+    def is_matched(self, value: Any) -> bool:
+        # the value is lowercased once for all the keywords
+        text = str(value).lower()
+        return any(keyword in text for keyword in self._keywords)
+
+
+@lru_cache(maxsize=256)
+def _get_keywords_matcher(keywords: str) -> KeywordsMatcher:
+    return KeywordsMatcher(keywords)
+
+
 class KeywordsModeration(Moderation):
     name: str = "keywords"
 
@@ -40,10 +71,7 @@ class KeywordsModeration(Moderation):
             if query:
                 inputs["query__"] = query
 
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated(inputs, keywords_list)
+            flagged = self._is_violated(inputs, _get_keywords_matcher(self.config["keywords"]))
 
         return ModerationInputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
@@ -56,18 +84,12 @@ class KeywordsModeration(Moderation):
             raise ValueError("The config is not set.")
 
         if self.config["outputs_config"]["enabled"]:
-            # Filter out empty values
-            keywords_list = [keyword for keyword in self.config["keywords"].split("\n") if keyword]
-
-            flagged = self._is_violated({"text": text}, keywords_list)
+            flagged = self._is_violated({"text": text}, _get_keywords_matcher(self.config["keywords"]))
             preset_response = self.config["outputs_config"]["preset_response"]
 
         return ModerationOutputsResult(
             flagged=flagged, action=ModerationAction.DIRECT_OUTPUT, preset_response=preset_response
         )
 
-    def _is_violated(self, inputs: dict, keywords_list: list) -> bool:
-        return any(self._check_keywords_in_value(keywords_list, value) for value in inputs.values())
-
-    def _check_keywords_in_value(self, keywords_list: Sequence[str], value: Any) -> bool:
-        return any(keyword.lower() in str(value).lower() for keyword in keywords_list)
+    def _is_violated(self, inputs: dict, matcher: KeywordsMatcher) -> bool:
+        return any(matcher.is_matched(value) for value in inputs.values())
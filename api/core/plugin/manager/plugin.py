@@ -1,5 +1,6 @@
 from collections.abc import Sequence
 
+from core.helper.model_provider_cache import PluginModelCache
 from core.plugin.entities.bundle import PluginBundleDependency
 from core.plugin.entities.plugin import (
     GenericProviderID,
@@ -9,8 +10,14 @@ from core.plugin.entities.plugin import (
     PluginInstallation,
     PluginInstallationSource,
 )
-from core.plugin.entities.plugin_daemon import PluginInstallTask, PluginInstallTaskStartResponse, PluginUploadResponse
+from core.plugin.entities.plugin_daemon import (
+    PluginInstallTask,
+    PluginInstallTaskStartResponse,
+    PluginInstallTaskStatus,
+    PluginUploadResponse,
+)
 from core.plugin.manager.base import BasePluginManager
+from extensions.ext_redis import redis_client
 
 
 class PluginInstallationManager(BasePluginManager):
@@ -87,7 +94,7 @@ class PluginInstallationManager(BasePluginManager):
         Install a plugin from an identifier.
         """
         # exception will be raised if the request failed
-        return self._request_with_plugin_daemon_response(
+        response = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/install/identifiers",
             PluginInstallTaskStartResponse,
@@ -98,27 +105,38 @@ class PluginInstallationManager(BasePluginManager):
             },
             headers={"Content-Type": "application/json"},
         )
+        # otherwise the plugins are installed by a task, invalidated when it is seen finished
+        if response.all_installed:
+            PluginModelCache(tenant_id).delete()
+
+        return response
 
     def fetch_plugin_installation_tasks(self, tenant_id: str, page: int, page_size: int) -> Sequence[PluginInstallTask]:
         """
         Fetch plugin installation tasks.
         """
-        return self._request_with_plugin_daemon_response(
+        tasks = self._request_with_plugin_daemon_response(
             "GET",
             f"plugin/{tenant_id}/management/install/tasks",
             list[PluginInstallTask],
             params={"page": page, "page_size": page_size},
         )
+        self._invalidate_plugin_model_cache_on_finished_tasks(tenant_id, tasks)
+
+        return tasks
 
     def fetch_plugin_installation_task(self, tenant_id: str, task_id: str) -> PluginInstallTask:
         """
         Fetch a plugin installation task.
         """
-        return self._request_with_plugin_daemon_response(
+        task = self._request_with_plugin_daemon_response(
             "GET",
             f"plugin/{tenant_id}/management/install/tasks/{task_id}",
             PluginInstallTask,
         )
+        self._invalidate_plugin_model_cache_on_finished_tasks(tenant_id, [task])
+
+        return task
 
     def delete_plugin_installation_task(self, tenant_id: str, task_id: str) -> bool:
         """
@@ -194,7 +212,7 @@ class PluginInstallationManager(BasePluginManager):
         """
         Uninstall a plugin.
         """
-        return self._request_with_plugin_daemon_response(
+        uninstalled = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/uninstall",
             bool,
@@ -203,6 +221,9 @@ class PluginInstallationManager(BasePluginManager):
             },
             headers={"Content-Type": "application/json"},
         )
+        PluginModelCache(tenant_id).delete()
+
+        return uninstalled
 
     def upgrade_plugin(
         self,
@@ -215,7 +236,7 @@ class PluginInstallationManager(BasePluginManager):
         """
         Upgrade a plugin.
         """
-        return self._request_with_plugin_daemon_response(
+        response = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/install/upgrade",
             PluginInstallTaskStartResponse,
@@ -227,6 +248,28 @@ class PluginInstallationManager(BasePluginManager):
             },
             headers={"Content-Type": "application/json"},
         )
+        # otherwise the plugin is upgraded by a task, invalidated when it is seen finished
+        if response.all_installed:
+            PluginModelCache(tenant_id).delete()
+
+        return response
+
+    @staticmethod
+    def _invalidate_plugin_model_cache_on_finished_tasks(tenant_id: str, tasks: Sequence[PluginInstallTask]) -> None:
+        """
+        Invalidate the plugin model cache of the tenant once for every finished installation task.
+        """
+        newly_finished = False
+        for task in tasks:
+            if task.status not in {PluginInstallTaskStatus.Success, PluginInstallTaskStatus.Failed}:
+                continue
+
+            # tasks are polled until they finish and listed long after, only the first sight invalidates
+            if redis_client.set(f"plugin_install_task_finished:{task.id}", 1, ex=86400, nx=True):
+                newly_finished = True
+
+        if newly_finished:
+            PluginModelCache(tenant_id).delete()
 
     def check_tools_existence(self, tenant_id: str, provider_ids: Sequence[GenericProviderID]) -> Sequence[bool]:
         """
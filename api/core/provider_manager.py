@@ -20,7 +20,11 @@ from core.entities.provider_entities import (
     SystemConfiguration,
 )
 from core.helper import encrypter
-from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.model_provider_cache import (
+    ProviderConfigurationsCache,
+    ProviderCredentialsCache,
+    ProviderCredentialsCacheType,
+)
 from core.helper.position_helper import is_filtered
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
@@ -89,6 +93,26 @@ class ProviderManager:
         - Get provider instance
         - Switch selection priority
 
+        The configurations are cached per process until a provider, model or credential of the
+        workspace changes, they are shared by the callers and must not be modified.
+
+        :param tenant_id:
+        :return:
+        """
+        configurations_cache = ProviderConfigurationsCache(tenant_id)
+        # read before building, a change made meanwhile bumps the version past the cached one
+        version = configurations_cache.get_version()
+        provider_configurations = configurations_cache.get(version)
+        if provider_configurations is None:
+            provider_configurations = self._build_configurations(tenant_id)
+            configurations_cache.set(version, provider_configurations)
+
+        return provider_configurations
+
+    def _build_configurations(self, tenant_id: str) -> ProviderConfigurations:
+        """
+        Build model provider configurations from the workspace records.
+
         :param tenant_id:
         :return:
         """
@@ -1,53 +1,106 @@
 import re
+from collections.abc import Callable
+from functools import lru_cache
+
+# invalid symbols removed by the default clean, with Unicode U+FFFE
+_INVALID_SYMBOLS_PATTERN = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE\ufffe]")
+_EXTRA_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+_SPACE = r"[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]"
+# two or more spaces
+_EXTRA_SPACES_PATTERN = re.compile(_SPACE + _SPACE + "+")
+_EMAIL_PATTERN = re.compile(r"([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)")
+_MARKDOWN_IMAGE_PATTERN = re.compile(r"!\[.*?\]\((https?://[^\s)]+)\)")
+_URL_PATTERN = re.compile(r"https?://[^\s)]+")
+_MARKDOWN_IMAGE_PLACEHOLDER_PATTERN = re.compile(r"__MARKDOWN_IMAGE_URL_(\d+)__")
+
+
+def _remove_extra_spaces(text: str) -> str:
+    if "\n\n\n" in text:
+        text = _EXTRA_NEWLINES_PATTERN.sub("\n\n", text)
+    return _EXTRA_SPACES_PATTERN.sub(" ", text)
+
+
+def _remove_urls_emails(text: str) -> str:
+    # Remove email
+    if "@" in text:
+        text = _EMAIL_PATTERN.sub("", text)
+
+    # Remove URL but keep Markdown image URLs
+    # First, temporarily replace Markdown image URLs with a placeholder
+    placeholders: list[str] = []
+
+    def replace_with_placeholder(match: re.Match) -> str:
+        placeholder = f"__MARKDOWN_IMAGE_URL_{len(placeholders)}__"
+        placeholders.append(match.group(1))
+        return f"![image]({placeholder})"
+
+    if "![" in text:
+        text = _MARKDOWN_IMAGE_PATTERN.sub(replace_with_placeholder, text)
+
+    # Now remove all remaining URLs
+    if "://" in text:
+        text = _URL_PATTERN.sub("", text)
+
+    # Finally, restore the Markdown image URLs
+    if placeholders:
+
+        def restore_placeholder(match: re.Match) -> str:
+            index = int(match.group(1))
+            return placeholders[index] if index < len(placeholders) else match.group()
+
+        text = _MARKDOWN_IMAGE_PLACEHOLDER_PATTERN.sub(restore_placeholder, text)
+    return text
+
+
+_PRE_PROCESSING_RULES: dict[str, Callable[[str], str]] = {
+    "remove_extra_spaces": _remove_extra_spaces,
+    "remove_urls_emails": _remove_urls_emails,
+}
+
+
+class CompiledCleaner:
+    """
+    Cleaning of a set of enabled pre-processing rules, built once and shared by all texts cleaned with them.
+    """
+
+    def __init__(self, enabled_rule_ids: tuple[str, ...]):
+        self._steps = [_PRE_PROCESSING_RULES[rule_id] for rule_id in enabled_rule_ids]
+
+    def clean(self, text: str) -> str:
+        # default clean
+        # remove invalid symbol
+        text = text.replace("<|", "<").replace("|>", ">")
+        text = _INVALID_SYMBOLS_PATTERN.sub("", text)
+        for step in self._steps:
+            text = step(text)
+        return text
+
+
+@lru_cache(maxsize=64)
+def _get_compiled_cleaner(enabled_rule_ids: tuple[str, ...]) -> CompiledCleaner:
+    return CompiledCleaner(enabled_rule_ids)
 
 
 class CleanProcessor:
     @classmethod
     def clean(cls, text: str, process_rule: dict) -> str:
-        # default clean
-        # remove invalid symbol
-        text = re.sub(r"<\|", "<", text)
-        text = re.sub(r"\|>", ">", text)
-        text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]", "", text)
-        # Unicode  U+FFFE
-        text = re.sub("\ufffe", "", text)
+        return cls.get_cleaner(process_rule).clean(text)
 
+    @classmethod
+    def get_cleaner(cls, process_rule: dict) -> CompiledCleaner:
+        """
+        Get the cleaner of the pre-processing rules of a process rule, cleaners are cached by their enabled rules.
+
+        :param process_rule: process rule
+        :return: cleaner
+        """
         rules = process_rule["rules"] if process_rule else {}
-        if "pre_processing_rules" in rules:
-            pre_processing_rules = rules["pre_processing_rules"]
-            for pre_processing_rule in pre_processing_rules:
-                if pre_processing_rule["id"] == "remove_extra_spaces" and pre_processing_rule["enabled"] is True:
-                    # Remove extra spaces
-                    pattern = r"\n{3,}"
-                    text = re.sub(pattern, "\n\n", text)
-                    pattern = r"[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}"
-                    text = re.sub(pattern, " ", text)
-                elif pre_processing_rule["id"] == "remove_urls_emails" and pre_processing_rule["enabled"] is True:
-                    # Remove email
-                    pattern = r"([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)"
-                    text = re.sub(pattern, "", text)
-
-                    # Remove URL but keep Markdown image URLs
-                    # First, temporarily replace Markdown image URLs with a placeholder
-                    markdown_image_pattern = r"!\[.*?\]\((https?://[^\s)]+)\)"
-                    placeholders: list[str] = []
-
-                    def replace_with_placeholder(match, placeholders=placeholders):
-                        url = match.group(1)
-                        placeholder = f"__MARKDOWN_IMAGE_URL_{len(placeholders)}__"
-                        placeholders.append(url)
-                        return f"![image]({placeholder})"
-
-                    text = re.sub(markdown_image_pattern, replace_with_placeholder, text)
-
-                    # Now remove all remaining URLs
-                    url_pattern = r"https?://[^\s)]+"
-                    text = re.sub(url_pattern, "", text)
-
-                    # Finally, restore the Markdown image URLs
-                    for i, url in enumerate(placeholders):
-                        text = text.replace(f"__MARKDOWN_IMAGE_URL_{i}__", url)
-        return text
+        enabled_rule_ids = tuple(
+            pre_processing_rule["id"]
+            for pre_processing_rule in rules.get("pre_processing_rules", [])
+            if pre_processing_rule["id"] in _PRE_PROCESSING_RULES and pre_processing_rule["enabled"] is True
+        )
+        return _get_compiled_cleaner(enabled_rule_ids)
 
     def filter_string(self, text):
         return text
@@ -0,0 +1,376 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from configs import dify_config
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
+from core.rag.datasource.vdb.vector_type import VectorType
+from core.rag.embedding.embedding_base import Embeddings
+from core.rag.models.document import Document
+from extensions.ext_redis import redis_client
+from models.dataset import Dataset
+
+# file of a collection listing its segments in order, replaced atomically when a segment is added
+_MANIFEST_FILE = "CURRENT"
+_VECTORS_FILE = "vectors.npy"
+_DOCUMENTS_FILE = "documents.json"
+# a collection is compacted into a single segment once it has more segments than this
+_MAX_SEGMENT_COUNT = 16
+
+
+class EmbeddedVectorConfig(BaseModel):
+    path: str
+
+
+@dataclass
+class _Segment:
+    """
+    Documents added to a collection by one write, and the ids of the documents it deleted. The vectors are
+    memory-mapped and normalized so their cosine with a normalized query is their dot product.
+    """
+
+    name: str
+    ids: list[str]
+    texts: list[str]
+    metadatas: list[dict]
+    deleted_ids: list[str]
+    vectors: Optional[np.ndarray]
+    document_ids: np.ndarray
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> "_Segment":
+        segment_directory = os.path.join(directory, name)
+        with open(os.path.join(segment_directory, _DOCUMENTS_FILE), encoding="utf-8") as f:
+            documents = json.load(f)
+        ids = documents["ids"]
+        metadatas = documents["metadatas"]
+        return cls(
+            name=name,
+            ids=ids,
+            texts=documents["texts"],
+            metadatas=metadatas,
+            deleted_ids=documents["deleted_ids"],
+            vectors=np.load(os.path.join(segment_directory, _VECTORS_FILE), mmap_mode="r") if ids else None,
+            document_ids=np.array([metadata.get("document_id") for metadata in metadatas], dtype=object),
+        )
+
+    @staticmethod
+    def write(
+        directory: str,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+        vectors: Optional[np.ndarray],
+        deleted_ids: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Write a new segment in the directory of a collection.
+
+        :return: name of the segment
+        """
+        name = uuid.uuid4().hex
+        segment_directory = os.path.join(directory, name)
+        os.makedirs(segment_directory)
+        if vectors is not None and ids:
+            np.save(os.path.join(segment_directory, _VECTORS_FILE), np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(os.path.join(segment_directory, _DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {"ids": ids, "texts": texts, "metadatas": metadatas, "deleted_ids": deleted_ids or []},
+                f,
+                ensure_ascii=False,
+            )
+        return name
+
+
+class _Collection:
+    """
+    The segments of a collection loaded in memory, with the rows still live: neither deleted nor replaced by a later
+    segment. A loaded collection is never changed, adding segments returns a new one.
+    """
+
+    def __init__(
+        self,
+        segments: Optional[list[_Segment]] = None,
+        live: Optional[list[np.ndarray]] = None,
+        positions: Optional[dict[str, tuple[int, int]]] = None,
+    ):
+        self.segments = segments or []
+        # live rows of each segment
+        self.live = live or []
+        # segment index and row of the live documents, by id
+        self.positions = positions or {}
+
+    @property
+    def names(self) -> list[str]:
+        return [segment.name for segment in self.segments]
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return next((segment.vectors.shape[1] for segment in self.segments if segment.vectors is not None), None)
+
+    def extend(self, segments: list[_Segment]) -> "_Collection":
+        collection = _Collection(list(self.segments), [live.copy() for live in self.live], dict(self.positions))
+        for segment in segments:
+            for id in [*segment.deleted_ids, *segment.ids]:
+                position = collection.positions.pop(id, None)
+                if position is not None:
+                    collection.live[position[0]][position[1]] = False
+            for row, id in enumerate(segment.ids):
+                collection.positions[id] = (len(collection.segments), row)
+            collection.segments.append(segment)
+            collection.live.append(np.ones(len(segment.ids), dtype=bool))
+        return collection
+
+    def rows(self) -> Iterator[tuple[_Segment, int]]:
+        """
+        The live rows, in the order they were added.
+        """
+        for segment, live in zip(self.segments, self.live):
+            for row in np.flatnonzero(live):
+                yield segment, int(row)
+
+
+# collections loaded by this process, by collection directory
+_loaded_collections: dict[str, _Collection] = {}
+_loaded_collections_lock = threading.Lock()
+
+
+class EmbeddedVector(BaseVector):
+    """
+    Vector store kept as files on the local disk and searched in process, for datasets small enough for an exact
+    search over all their vectors.
+
+    Each write appends a segment to the collection, deletions are segments of deleted ids only. The segments are
+    compacted once there are too many of them.
+    """
+
+    def __init__(self, collection_name: str, config: EmbeddedVectorConfig):
+        super().__init__(collection_name)
+        self._directory = os.path.join(config.path, collection_name)
+
+    def get_type(self) -> str:
+        return VectorType.EMBEDDED
+
+    def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        if texts:
+            self.add_texts(texts, embeddings, **kwargs)
+
+    def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        uuids = self._get_uuids(documents)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        with redis_client.lock(self._lock_name, timeout=60):
+            collection = self._load()
+            dimension = collection.dimension if collection is not None else None
+            if dimension is not None and dimension != vectors.shape[1]:
+                raise ValueError(
+                    f"Dimension {vectors.shape[1]} of the embeddings does not match the dimension"
+                    f" {dimension} of the collection {self._collection_name}"
+                )
+            # the documents with an existing id replace it
+            texts = [d.page_content for d in documents]
+            metadatas = [d.metadata for d in documents]
+            self._append_segment(_Segment.write(self._directory, uuids, texts, metadatas, vectors))
+        self._compact_if_needed()
+
+    def text_exists(self, id: str) -> bool:
+        collection = self._load()
+        return collection is not None and id in collection.positions
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._delete(lambda collection: [id for id in ids if id in collection.positions])
+
+    def get_ids_by_metadata_field(self, key: str, value: str):
+        collection = self._load()
+        if collection is None:
+            return None
+        return [
+            segment.ids[row] for segment, row in collection.rows() if segment.metadatas[row].get(key) == value
+        ] or None
+
+    def delete_by_metadata_field(self, key: str, value: str) -> None:
+        self._delete(
+            lambda collection: [
+                segment.ids[row] for segment, row in collection.rows() if segment.metadatas[row].get(key) == value
+            ]
+        )
+
+    def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        collection = self._load()
+        if collection is None:
+            return []
+        segments = [(segment, live) for segment, live in zip(collection.segments, collection.live) if segment.ids]
+        if not segments:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return []
+        query = query / query_norm
+
+        document_ids_filter = kwargs.get("document_ids_filter")
+        segment_scores = []
+        for segment, live in segments:
+            if document_ids_filter:
+                live = live & np.isin(segment.document_ids, document_ids_filter)
+            segment_scores.append(np.where(live, segment.vectors @ query, -np.inf))
+        scores = np.concatenate(segment_scores)
+        # index of the first score of each segment
+        offsets = np.cumsum([0] + [len(segment.ids) for segment, _ in segments])
+
+        top_k = min(kwargs.get("top_k", 4), len(scores))
+        top_indexes = np.argpartition(-scores, top_k - 1)[:top_k]
+        top_indexes = top_indexes[np.argsort(-scores[top_indexes])]
+        score_threshold = float(kwargs.get("score_threshold") or 0.0)
+
+        docs = []
+        for index in top_indexes:
+            score = float(scores[index])
+            if score > score_threshold:
+                segment_index = int(np.searchsorted(offsets, index, side="right")) - 1
+                segment = segments[segment_index][0]
+                row = int(index - offsets[segment_index])
+                metadata = dict(segment.metadatas[row])
+                metadata["score"] = score
+                docs.append(Document(page_content=segment.texts[row], metadata=metadata))
+        return docs
+
+    def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
+        # the embedded vector store does not support full text searching
+        return []
+
+    def delete(self) -> None:
+        with redis_client.lock(self._lock_name, timeout=60):
+            shutil.rmtree(self._directory, ignore_errors=True)
+        with _loaded_collections_lock:
+            _loaded_collections.pop(self._directory, None)
+
+    @property
+    def _lock_name(self) -> str:
+        return "vector_indexing_lock_{}".format(self._collection_name)
+
+    def _segment_names(self) -> Optional[list[str]]:
+        try:
+            with open(os.path.join(self._directory, _MANIFEST_FILE), encoding="utf-8") as f:
+                return f.read().split()
+        except FileNotFoundError:
+            return None
+
+    def _write_segment_names(self, names: list[str]) -> None:
+        manifest_file = os.path.join(self._directory, _MANIFEST_FILE)
+        temporary_file = f"{manifest_file}.{uuid.uuid4().hex}"
+        with open(temporary_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(names))
+        os.replace(temporary_file, manifest_file)
+
+    def _append_segment(self, name: str) -> None:
+        """
+        Add a segment after the others, to call under the lock of the collection.
+        """
+        self._write_segment_names([*(self._segment_names() or []), name])
+
+    def _load(self) -> Optional[_Collection]:
+        """
+        Get the collection, loaded on the first use. Only the segments added since are loaded when another instance
+        or process wrote the collection.
+        """
+        for attempt in range(3):
+            names = self._segment_names()
+            if names is None:
+                return None
+
+            collection = _loaded_collections.get(self._directory)
+            if collection is not None and collection.names == names:
+                return collection
+
+            with _loaded_collections_lock:
+                collection = _loaded_collections.get(self._directory) or _Collection()
+                loaded_names = collection.names
+                if names[: len(loaded_names)] != loaded_names:
+                    # the collection was compacted since
+                    collection = _Collection()
+                try:
+                    new_segments = [_Segment.load(self._directory, name) for name in names[len(collection.segments) :]]
+                except FileNotFoundError:
+                    # a compaction removed the segments after their names were read
+                    if attempt == 2:
+                        raise
+                    continue
+                collection = _loaded_collections[self._directory] = collection.extend(new_segments)
+                return collection
+        return None
+
+    def _delete(self, select_ids) -> None:
+        """
+        :param select_ids: function of the collection returning the ids of the live documents to delete
+        """
+        with redis_client.lock(self._lock_name, timeout=60):
+            collection = self._load()
+            if collection is None:
+                return
+            deleted_ids = select_ids(collection)
+            if not deleted_ids:
+                return
+            self._append_segment(_Segment.write(self._directory, [], [], [], None, deleted_ids))
+        self._compact_if_needed()
+
+    def _compact_if_needed(self) -> None:
+        """
+        Merge the live documents of the segments into a single segment once there are too many segments. The merged
+        segment is written without the lock, it replaces the segments it merged only if no other compaction replaced
+        them meanwhile, keeping the segments added since.
+        """
+        collection = self._load()
+        if collection is None or len(collection.segments) <= _MAX_SEGMENT_COUNT:
+            return
+
+        rows = list(collection.rows())
+        vectors = [segment.vectors[live] for segment, live in zip(collection.segments, collection.live) if segment.ids]
+        merged_name = _Segment.write(
+            self._directory,
+            [segment.ids[row] for segment, row in rows],
+            [segment.texts[row] for segment, row in rows],
+            [segment.metadatas[row] for segment, row in rows],
+            np.concatenate(vectors) if vectors else None,
+        )
+
+        merged_names = collection.names
+        with redis_client.lock(self._lock_name, timeout=60):
+            names = self._segment_names()
+            if names is None or names[: len(merged_names)] != merged_names:
+                shutil.rmtree(os.path.join(self._directory, merged_name), ignore_errors=True)
+                return
+            self._write_segment_names([merged_name, *names[len(merged_names) :]])
+            # the memory maps of the merged segments stay readable after their files are removed
+            for name in merged_names:
+                shutil.rmtree(os.path.join(self._directory, name), ignore_errors=True)
+
+
+class EmbeddedVectorFactory(AbstractVectorFactory):
+    def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> BaseVector:
+        if dataset.index_struct_dict:
+            class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
+            collection_name = class_prefix.lower()
+        else:
+            dataset_id = dataset.id
+            collection_name = Dataset.gen_collection_name_by_id(dataset_id).lower()
+            dataset.index_struct = json.dumps(self.gen_index_struct_dict(VectorType.EMBEDDED, collection_name))
+
+        return EmbeddedVector(
+            collection_name=collection_name,
+            config=EmbeddedVectorConfig(path=dify_config.EMBEDDED_VECTOR_STORE_PATH),
+        )
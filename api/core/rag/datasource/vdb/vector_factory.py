@@ -160,6 +160,10 @@ class Vector:
                 from core.rag.datasource.vdb.huawei.huawei_cloud_vector import HuaweiCloudVectorFactory
 
                 return HuaweiCloudVectorFactory
+            case VectorType.EMBEDDED:
+                from core.rag.datasource.vdb.embedded.embedded_vector import EmbeddedVectorFactory
+
+                return EmbeddedVectorFactory
             case _:
                 raise ValueError(f"Vector store {vector_type} is not supported.")
 
@@ -1,16 +1,20 @@
+import uuid
 from collections.abc import Sequence
 from typing import Any, Optional
 
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, update
 
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
-from core.rag.models.document import Document
+from core.rag.models.document import ChildDocument, Document
 from extensions.ext_database import db
 from models.dataset import ChildChunk, Dataset, DocumentSegment
 
 
 class DatasetDocumentStore:
+    # documents whose segments are written in one round of bulk statements
+    _BULK_BATCH_SIZE = 1000
+
     def __init__(
         self,
         dataset: Dataset,
@@ -61,6 +65,13 @@ class DatasetDocumentStore:
         return output
 
     def add_documents(self, docs: Sequence[Document], allow_update: bool = True, save_child: bool = False) -> None:
+        for doc in docs:
+            if not isinstance(doc, Document):
+                raise ValueError("doc must be a Document")
+
+            if doc.metadata is None:
+                raise ValueError("doc.metadata must be a dict")
+
         max_position = (
             db.session.query(func.max(DocumentSegment.position))
             .filter(DocumentSegment.document_id == self._document_id)
@@ -85,92 +96,131 @@ class DatasetDocumentStore:
         else:
             tokens_list = [0] * len(docs)
 
-        for doc, tokens in zip(docs, tokens_list):
-            if not isinstance(doc, Document):
-                raise ValueError("doc must be a Document")
+        for start in range(0, len(docs), self._BULK_BATCH_SIZE):
+            max_position = self._add_documents_batch(
+                docs=docs[start : start + self._BULK_BATCH_SIZE],
+                tokens_list=tokens_list[start : start + self._BULK_BATCH_SIZE],
+                max_position=max_position,
+                allow_update=allow_update,
+                save_child=save_child,
+            )
 
-            if doc.metadata is None:
-                raise ValueError("doc.metadata must be a dict")
+    def _add_documents_batch(
+        self,
+        docs: Sequence[Document],
+        tokens_list: Sequence[int],
+        max_position: int,
+        allow_update: bool,
+        save_child: bool,
+    ) -> int:
+        """
+        Insert the new segments and update the existing ones of a batch of documents in bulk.
+
+        :param docs: documents of the batch
+        :param tokens_list: tokens of the documents
+        :param max_position: max position of the segments of the document before the batch
+        :return: max position of the segments of the document after the batch
+        """
+        doc_ids = list({doc.metadata["doc_id"] for doc in docs})
+        segment_ids: dict[str, str] = dict(
+            db.session.execute(
+                select(DocumentSegment.index_node_id, DocumentSegment.id).where(
+                    DocumentSegment.dataset_id == self._dataset.id, DocumentSegment.index_node_id.in_(doc_ids)
+                )
+            ).all()
+        )
 
-            segment_document = self.get_document_segment(doc_id=doc.metadata["doc_id"])
+        new_segments: dict[str, dict[str, Any]] = {}
+        updated_segments: dict[str, dict[str, Any]] = {}
+        # children replacing the ones of each segment
+        segment_children: dict[str, list[ChildDocument]] = {}
+        for doc, tokens in zip(docs, tokens_list):
+            doc_id = doc.metadata["doc_id"]
+            segment_id = segment_ids.get(doc_id)
 
             # NOTE: doc could already exist in the store, but we overwrite it
-            if not allow_update and segment_document:
-                raise ValueError(
-                    f"doc_id {doc.metadata['doc_id']} already exists. Set allow_update to True to overwrite."
-                )
+            if not allow_update and segment_id:
+                raise ValueError(f"doc_id {doc_id} already exists. Set allow_update to True to overwrite.")
 
-            if not segment_document:
+            if not segment_id:
                 max_position += 1
-
-                segment_document = DocumentSegment(
-                    tenant_id=self._dataset.tenant_id,
-                    dataset_id=self._dataset.id,
-                    document_id=self._document_id,
-                    index_node_id=doc.metadata["doc_id"],
-                    index_node_hash=doc.metadata["doc_hash"],
-                    position=max_position,
-                    content=doc.page_content,
-                    word_count=len(doc.page_content),
-                    tokens=tokens,
-                    enabled=False,
-                    created_by=self._user_id,
-                )
-                if doc.metadata.get("answer"):
-                    segment_document.answer = doc.metadata.pop("answer", "")
-
-                db.session.add(segment_document)
-                db.session.flush()
-                if save_child:
-                    if doc.children:
-                        for postion, child in enumerate(doc.children, start=1):
-                            child_segment = ChildChunk(
-                                tenant_id=self._dataset.tenant_id,
-                                dataset_id=self._dataset.id,
-                                document_id=self._document_id,
-                                segment_id=segment_document.id,
-                                position=postion,
-                                index_node_id=child.metadata.get("doc_id"),
-                                index_node_hash=child.metadata.get("doc_hash"),
-                                content=child.page_content,
-                                word_count=len(child.page_content),
-                                type="automatic",
-                                created_by=self._user_id,
-                            )
-                            db.session.add(child_segment)
-            else:
-                segment_document.content = doc.page_content
-                if doc.metadata.get("answer"):
-                    segment_document.answer = doc.metadata.pop("answer", "")
-                segment_document.index_node_hash = doc.metadata.get("doc_hash")
-                segment_document.word_count = len(doc.page_content)
-                segment_document.tokens = tokens
+                segment_id = str(uuid.uuid4())
+                segment_ids[doc_id] = segment_id
+                new_segments[segment_id] = {
+                    "id": segment_id,
+                    "tenant_id": self._dataset.tenant_id,
+                    "dataset_id": self._dataset.id,
+                    "document_id": self._document_id,
+                    "index_node_id": doc_id,
+                    "index_node_hash": doc.metadata["doc_hash"],
+                    "position": max_position,
+                    "content": doc.page_content,
+                    "answer": doc.metadata.pop("answer", "") if doc.metadata.get("answer") else None,
+                    "word_count": len(doc.page_content),
+                    "tokens": tokens,
+                    "enabled": False,
+                    "created_by": self._user_id,
+                }
                 if save_child and doc.children:
-                    # delete the existing child chunks
-                    db.session.query(ChildChunk).filter(
-                        ChildChunk.tenant_id == self._dataset.tenant_id,
-                        ChildChunk.dataset_id == self._dataset.id,
-                        ChildChunk.document_id == self._document_id,
-                        ChildChunk.segment_id == segment_document.id,
-                    ).delete()
-                    # add new child chunks
-                    for position, child in enumerate(doc.children, start=1):
-                        child_segment = ChildChunk(
-                            tenant_id=self._dataset.tenant_id,
-                            dataset_id=self._dataset.id,
-                            document_id=self._document_id,
-                            segment_id=segment_document.id,
-                            position=position,
-                            index_node_id=child.metadata.get("doc_id"),
-                            index_node_hash=child.metadata.get("doc_hash"),
-                            content=child.page_content,
-                            word_count=len(child.page_content),
-                            type="automatic",
-                            created_by=self._user_id,
-                        )
-                        db.session.add(child_segment)
-
-            db.session.commit()
+                    segment_children[segment_id] = doc.children
+                continue
+
+            segment = {
+                "content": doc.page_content,
+                "index_node_hash": doc.metadata.get("doc_hash"),
+                "word_count": len(doc.page_content),
+                "tokens": tokens,
+            }
+            if doc.metadata.get("answer"):
+                segment["answer"] = doc.metadata.pop("answer", "")
+            if segment_id in new_segments:
+                # the same doc_id earlier in the batch
+                new_segments[segment_id].update(segment)
+            else:
+                updated_segments.setdefault(segment_id, {"id": segment_id}).update(segment)
+            if save_child and doc.children:
+                segment_children[segment_id] = doc.children
+
+        if new_segments:
+            # rows without an answer are batched with the others instead of omitting the column
+            db.session.execute(
+                insert(DocumentSegment).execution_options(render_nulls=True), list(new_segments.values())
+            )
+        if updated_segments:
+            db.session.execute(update(DocumentSegment), list(updated_segments.values()))
+
+        replaced_segment_ids = [segment_id for segment_id in segment_children if segment_id not in new_segments]
+        if replaced_segment_ids:
+            # delete the existing child chunks
+            db.session.query(ChildChunk).filter(
+                ChildChunk.tenant_id == self._dataset.tenant_id,
+                ChildChunk.dataset_id == self._dataset.id,
+                ChildChunk.document_id == self._document_id,
+                ChildChunk.segment_id.in_(replaced_segment_ids),
+            ).delete(synchronize_session=False)
+
+        child_chunks = [
+            {
+                "tenant_id": self._dataset.tenant_id,
+                "dataset_id": self._dataset.id,
+                "document_id": self._document_id,
+                "segment_id": segment_id,
+                "position": position,
+                "index_node_id": child.metadata.get("doc_id"),
+                "index_node_hash": child.metadata.get("doc_hash"),
+                "content": child.page_content,
+                "word_count": len(child.page_content),
+                "type": "automatic",
+                "created_by": self._user_id,
+            }
+            for segment_id, children in segment_children.items()
+            for position, child in enumerate(children, start=1)
+        ]
+        if child_chunks:
+            db.session.execute(insert(ChildChunk).execution_options(render_nulls=True), child_chunks)
+
+        db.session.commit()
+        return max_position
 
     def document_exists(self, doc_id: str) -> bool:
         """Check if document exists."""
@@ -1,14 +1,55 @@
 """Abstract interface for document loader implementations."""
 
 import os
-from typing import Optional, cast
+from collections.abc import Iterator
+from typing import Any, Optional
+from zipfile import ZipFile
 
 import pandas as pd
 from openpyxl import load_workbook  # type: ignore
+from openpyxl.packaging.relationship import get_dependents, get_rels_path  # type: ignore
+from openpyxl.utils.cell import range_boundaries  # type: ignore
+from openpyxl.xml.constants import REL_NS, SHEET_MAIN_NS  # type: ignore
+from openpyxl.xml.functions import iterparse  # type: ignore
 
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
 
+_HYPERLINK_TAG = f"{{{SHEET_MAIN_NS}}}hyperlink"
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_RELATIONSHIP_ID = f"{{{REL_NS}}}id"
+
+
+class _SheetHyperlinks:
+    """Targets of the hyperlinks of a sheet, by cell."""
+
+    def __init__(self):
+        self._cells: dict[tuple[int, int], str] = {}
+        # (min_col, min_row, max_col, max_row) of the links over a range of cells
+        self._ranges: list[tuple[tuple[Any, Any, Any, Any], str]] = []
+
+    def add(self, ref: str, target: str) -> None:
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        if min_col == max_col and min_row == max_row:
+            self._cells.setdefault((min_row, min_col), target)
+        else:
+            self._ranges.append(((min_col, min_row, max_col, max_row), target))
+
+    def get(self, row: int, column: int) -> Optional[str]:
+        target = self._cells.get((row, column))
+        if target is not None or not self._ranges:
+            return target
+
+        for (min_col, min_row, max_col, max_row), target in self._ranges:
+            if (
+                (min_col is None or min_col <= column)
+                and (max_col is None or column <= max_col)
+                and (min_row is None or min_row <= row)
+                and (max_row is None or row <= max_row)
+            ):
+                return target
+        return None
+
 
 class ExcelExtractor(BaseExtractor):
     """Load Excel files.
@@ -26,53 +67,93 @@ class ExcelExtractor(BaseExtractor):
 
     def extract(self) -> list[Document]:
         """Load from Excel file in xls or xlsx format using Pandas and openpyxl."""
-        documents = []
+        return list(self.load())
+
+    def load(self) -> Iterator[Document]:
+        """Lazy load the rows of the file as documents."""
         file_extension = os.path.splitext(self._file_path)[-1].lower()
 
         if file_extension == ".xlsx":
-            wb = load_workbook(self._file_path, data_only=True)
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                data = sheet.values
-                try:
-                    cols = next(data)
-                except StopIteration:
-                    continue
-                df = pd.DataFrame(data, columns=cols)
-
-                df.dropna(how="all", inplace=True)
-
-                for index, row in df.iterrows():
-                    page_content = []
-                    for col_index, (k, v) in enumerate(row.items()):
-                        if pd.notna(v):
-                            cell = sheet.cell(
-                                row=cast(int, index) + 2, column=col_index + 1
-                            )  # +2 to account for header and 1-based index
-                            if cell.hyperlink:
-                                value = f"[{v}]({cell.hyperlink.target})"
-                                page_content.append(f'"{k}":"{value}"')
-                            else:
-                                page_content.append(f'"{k}":"{v}"')
-                    documents.append(
-                        Document(page_content=";".join(page_content), metadata={"source": self._file_path})
-                    )
-
+            yield from self._load_xlsx()
         elif file_extension == ".xls":
-            excel_file = pd.ExcelFile(self._file_path, engine="xlrd")
-            for excel_sheet_name in excel_file.sheet_names:
-                df = excel_file.parse(sheet_name=excel_sheet_name)
-                df.dropna(how="all", inplace=True)
-
-                for _, row in df.iterrows():
-                    page_content = []
-                    for k, v in row.items():
-                        if pd.notna(v):
-                            page_content.append(f'"{k}":"{v}"')
-                    documents.append(
-                        Document(page_content=";".join(page_content), metadata={"source": self._file_path})
-                    )
+            yield from self._load_xls()
         else:
             raise ValueError(f"Unsupported file extension: {file_extension}")
 
-        return documents
+    def _load_xlsx(self) -> Iterator[Document]:
+        """
+        Stream the rows of the sheets in read-only mode, only the hyperlinks of a sheet are held in memory.
+        """
+        wb = load_workbook(self._file_path, read_only=True, data_only=True)
+        try:
+            with ZipFile(self._file_path) as archive:
+                for sheet_name in wb.sheetnames:
+                    sheet = wb[sheet_name]
+                    if not hasattr(sheet, "iter_rows"):
+                        # chartsheet
+                        continue
+
+                    hyperlinks = self._read_hyperlinks(archive, sheet._worksheet_path)
+                    rows = sheet.iter_rows(values_only=True)
+                    cols = next(rows, None)
+                    if cols is None:
+                        continue
+
+                    # the header is the first row
+                    for row_index, row in enumerate(rows, start=2):
+                        if all(v is None for v in row):
+                            continue
+
+                        page_content = []
+                        for col_index, (k, v) in enumerate(zip(cols, row), start=1):
+                            if v is None:
+                                continue
+                            target = hyperlinks.get(row_index, col_index)
+                            if target:
+                                page_content.append(f'"{k}":"[{v}]({target})"')
+                            else:
+                                page_content.append(f'"{k}":"{v}"')
+                        yield Document(page_content=";".join(page_content), metadata={"source": self._file_path})
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _read_hyperlinks(archive: ZipFile, worksheet_path: str) -> _SheetHyperlinks:
+        """
+        Read the hyperlinks of a sheet, they are stored after the cells so the sheet is scanned once
+        without reading the cells.
+
+        :param archive: xlsx file
+        :param worksheet_path: path of the sheet in the file
+        :return: hyperlinks of the sheet
+        """
+        hyperlinks = _SheetHyperlinks()
+        rels_path = get_rels_path(worksheet_path)
+        if rels_path not in archive.namelist():
+            # the targets of hyperlinks are relationships of the sheet
+            return hyperlinks
+        targets = {rel.id: rel.Target for rel in get_dependents(archive, rels_path)}
+
+        with archive.open(worksheet_path) as source:
+            for _, element in iterparse(source):
+                if element.tag == _HYPERLINK_TAG:
+                    target = targets.get(element.get(_RELATIONSHIP_ID))
+                    ref = element.get("ref")
+                    if target and ref:
+                        hyperlinks.add(ref, target)
+                elif element.tag == _ROW_TAG:
+                    element.clear()
+        return hyperlinks
+
+    def _load_xls(self) -> Iterator[Document]:
+        excel_file = pd.ExcelFile(self._file_path, engine="xlrd")
+        for excel_sheet_name in excel_file.sheet_names:
+            df = excel_file.parse(sheet_name=excel_sheet_name)
+            df.dropna(how="all", inplace=True)
+
+            for _, row in df.iterrows():
+                page_content = []
+                for k, v in row.items():
+                    if pd.notna(v):
+                        page_content.append(f'"{k}":"{v}"')
+                yield Document(page_content=";".join(page_content), metadata={"source": self._file_path})
@@ -6,28 +6,9 @@ from urllib.parse import unquote
 
 from configs import dify_config
 from core.helper import ssrf_proxy
-from core.rag.extractor.csv_extractor import CSVExtractor
 from core.rag.extractor.entity.datasource_type import DatasourceType
 from core.rag.extractor.entity.extract_setting import ExtractSetting
-from core.rag.extractor.excel_extractor import ExcelExtractor
 from core.rag.extractor.extractor_base import BaseExtractor
-from core.rag.extractor.firecrawl.firecrawl_web_extractor import FirecrawlWebExtractor
-from core.rag.extractor.html_extractor import HtmlExtractor
-from core.rag.extractor.jina_reader_extractor import JinaReaderWebExtractor
-from core.rag.extractor.markdown_extractor import MarkdownExtractor
-from core.rag.extractor.notion_extractor import NotionExtractor
-from core.rag.extractor.pdf_extractor import PdfExtractor
-from core.rag.extractor.text_extractor import TextExtractor
-from core.rag.extractor.unstructured.unstructured_doc_extractor import UnstructuredWordExtractor
-from core.rag.extractor.unstructured.unstructured_eml_extractor import UnstructuredEmailExtractor
-from core.rag.extractor.unstructured.unstructured_epub_extractor import UnstructuredEpubExtractor
-from core.rag.extractor.unstructured.unstructured_markdown_extractor import UnstructuredMarkdownExtractor
-from core.rag.extractor.unstructured.unstructured_msg_extractor import UnstructuredMsgExtractor
-from core.rag.extractor.unstructured.unstructured_ppt_extractor import UnstructuredPPTExtractor
-from core.rag.extractor.unstructured.unstructured_pptx_extractor import UnstructuredPPTXExtractor
-from core.rag.extractor.unstructured.unstructured_xml_extractor import UnstructuredXmlExtractor
-from core.rag.extractor.watercrawl.extractor import WaterCrawlWebExtractor
-from core.rag.extractor.word_extractor import WordExtractor
 from core.rag.models.document import Document
 from extensions.ext_storage import storage
 from models.model import UploadFile
@@ -110,61 +91,120 @@ class ExtractProcessor:
                     unstructured_api_key = dify_config.UNSTRUCTURED_API_KEY or ""
 
                     if file_extension in {".xlsx", ".xls"}:
+                        from core.rag.extractor.excel_extractor import ExcelExtractor
+
                         extractor = ExcelExtractor(file_path)
                     elif file_extension == ".pdf":
+                        from core.rag.extractor.pdf_extractor import PdfExtractor
+
                         extractor = PdfExtractor(file_path)
                     elif file_extension in {".md", ".markdown", ".mdx"}:
-                        extractor = (
-                            UnstructuredMarkdownExtractor(file_path, unstructured_api_url, unstructured_api_key)
-                            if is_automatic
-                            else MarkdownExtractor(file_path, autodetect_encoding=True)
-                        )
+                        if is_automatic:
+                            from core.rag.extractor.unstructured.unstructured_markdown_extractor import (
+                                UnstructuredMarkdownExtractor,
+                            )
+
+                            extractor = UnstructuredMarkdownExtractor(
+                                file_path, unstructured_api_url, unstructured_api_key
+                            )
+                        else:
+                            from core.rag.extractor.markdown_extractor import MarkdownExtractor
+
+                            extractor = MarkdownExtractor(file_path, autodetect_encoding=True)
                     elif file_extension in {".htm", ".html"}:
+                        from core.rag.extractor.html_extractor import HtmlExtractor
+
                         extractor = HtmlExtractor(file_path)
                     elif file_extension == ".docx":
+                        from core.rag.extractor.word_extractor import WordExtractor
+
                         extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
                     elif file_extension == ".doc":
+                        from core.rag.extractor.unstructured.unstructured_doc_extractor import UnstructuredWordExtractor
+
                         extractor = UnstructuredWordExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     elif file_extension == ".csv":
+                        from core.rag.extractor.csv_extractor import CSVExtractor
+
                         extractor = CSVExtractor(file_path, autodetect_encoding=True)
                     elif file_extension == ".msg":
+                        from core.rag.extractor.unstructured.unstructured_msg_extractor import UnstructuredMsgExtractor
+
                         extractor = UnstructuredMsgExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     elif file_extension == ".eml":
+                        from core.rag.extractor.unstructured.unstructured_eml_extractor import (
+                            UnstructuredEmailExtractor,
+                        )
+
                         extractor = UnstructuredEmailExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     elif file_extension == ".ppt":
+                        from core.rag.extractor.unstructured.unstructured_ppt_extractor import UnstructuredPPTExtractor
+
                         extractor = UnstructuredPPTExtractor(file_path, unstructured_api_url, unstructured_api_key)
                         # You must first specify the API key
                         # because unstructured_api_key is necessary to parse .ppt documents
                     elif file_extension == ".pptx":
+                        from core.rag.extractor.unstructured.unstructured_pptx_extractor import (
+                            UnstructuredPPTXExtractor,
+                        )
+
                         extractor = UnstructuredPPTXExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     elif file_extension == ".xml":
+                        from core.rag.extractor.unstructured.unstructured_xml_extractor import UnstructuredXmlExtractor
+
                         extractor = UnstructuredXmlExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     elif file_extension == ".epub":
+                        from core.rag.extractor.unstructured.unstructured_epub_extractor import (
+                            UnstructuredEpubExtractor,
+                        )
+
                         extractor = UnstructuredEpubExtractor(file_path, unstructured_api_url, unstructured_api_key)
                     else:
                         # txt
+                        from core.rag.extractor.text_extractor import TextExtractor
+
                         extractor = TextExtractor(file_path, autodetect_encoding=True)
                 else:
                     if file_extension in {".xlsx", ".xls"}:
+                        from core.rag.extractor.excel_extractor import ExcelExtractor
+
                         extractor = ExcelExtractor(file_path)
                     elif file_extension == ".pdf":
+                        from core.rag.extractor.pdf_extractor import PdfExtractor
+
                         extractor = PdfExtractor(file_path)
                     elif file_extension in {".md", ".markdown", ".mdx"}:
+                        from core.rag.extractor.markdown_extractor import MarkdownExtractor
+
                         extractor = MarkdownExtractor(file_path, autodetect_encoding=True)
                     elif file_extension in {".htm", ".html"}:
+                        from core.rag.extractor.html_extractor import HtmlExtractor
+
                         extractor = HtmlExtractor(file_path)
                     elif file_extension == ".docx":
+                        from core.rag.extractor.word_extractor import WordExtractor
+
                         extractor = WordExtractor(file_path, upload_file.tenant_id, upload_file.created_by)
                     elif file_extension == ".csv":
+                        from core.rag.extractor.csv_extractor import CSVExtractor
+
                         extractor = CSVExtractor(file_path, autodetect_encoding=True)
                     elif file_extension == ".epub":
+                        from core.rag.extractor.unstructured.unstructured_epub_extractor import (
+                            UnstructuredEpubExtractor,
+                        )
+
                         extractor = UnstructuredEpubExtractor(file_path)
                     else:
                         # txt
+                        from core.rag.extractor.text_extractor import TextExtractor
+
                         extractor = TextExtractor(file_path, autodetect_encoding=True)
                 return extractor.extract()
         elif extract_setting.datasource_type == DatasourceType.NOTION.value:
             assert extract_setting.notion_info is not None, "notion_info is required"
+            from core.rag.extractor.notion_extractor import NotionExtractor
+
             extractor = NotionExtractor(
                 notion_workspace_id=extract_setting.notion_info.notion_workspace_id,
                 notion_obj_id=extract_setting.notion_info.notion_obj_id,
@@ -176,6 +216,8 @@ class ExtractProcessor:
         elif extract_setting.datasource_type == DatasourceType.WEBSITE.value:
             assert extract_setting.website_info is not None, "website_info is required"
             if extract_setting.website_info.provider == "firecrawl":
+                from core.rag.extractor.firecrawl.firecrawl_web_extractor import FirecrawlWebExtractor
+
                 extractor = FirecrawlWebExtractor(
                     url=extract_setting.website_info.url,
                     job_id=extract_setting.website_info.job_id,
@@ -185,6 +227,8 @@ class ExtractProcessor:
                 )
                 return extractor.extract()
             elif extract_setting.website_info.provider == "watercrawl":
+                from core.rag.extractor.watercrawl.extractor import WaterCrawlWebExtractor
+
                 extractor = WaterCrawlWebExtractor(
                     url=extract_setting.website_info.url,
                     job_id=extract_setting.website_info.job_id,
@@ -194,6 +238,8 @@ class ExtractProcessor:
                 )
                 return extractor.extract()
             elif extract_setting.website_info.provider == "jinareader":
+                from core.rag.extractor.jina_reader_extractor import JinaReaderWebExtractor
+
                 extractor = JinaReaderWebExtractor(
                     url=extract_setting.website_info.url,
                     job_id=extract_setting.website_info.job_id,
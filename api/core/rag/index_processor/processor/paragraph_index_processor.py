@@ -50,9 +50,10 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
             embedding_model_instance=kwargs.get("embedding_model_instance"),
         )
         all_documents = []
+        cleaner = CleanProcessor.get_cleaner(kwargs.get("process_rule", {}))
         for document in documents:
             # document clean
-            document_text = CleanProcessor.clean(document.page_content, kwargs.get("process_rule", {}))
+            document_text = cleaner.clean(document.page_content)
             document.page_content = document_text
             # parse document to nodes
             document_nodes = splitter.split_documents([document])
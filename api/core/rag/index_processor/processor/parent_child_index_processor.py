@@ -48,11 +48,12 @@ class ParentChildIndexProcessor(BaseIndexProcessor):
                 separator=rules.segmentation.separator,
                 embedding_model_instance=kwargs.get("embedding_model_instance"),
             )
+            cleaner = CleanProcessor.get_cleaner(process_rule)
             for document in documents:
                 if kwargs.get("preview") and len(all_documents) >= 10:
                     return all_documents
                 # document clean
-                document_text = CleanProcessor.clean(document.page_content, process_rule)
+                document_text = cleaner.clean(document.page_content)
                 document.page_content = document_text
                 # parse document to nodes
                 document_nodes = splitter.split_documents([document])
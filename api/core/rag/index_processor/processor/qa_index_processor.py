@@ -1,16 +1,20 @@
 """Paragraph index processor."""
 
+import concurrent.futures
 import logging
+import random
 import re
 import threading
+import time
 import uuid
 from typing import Optional
 
-import pandas as pd
 from flask import Flask, current_app
 from werkzeug.datastructures import FileStorage
 
+from configs import dify_config
 from core.llm_generator.llm_generator import LLMGenerator
+from core.model_runtime.errors.invoke import InvokeRateLimitError
 from core.rag.cleaner.clean_processor import CleanProcessor
 from core.rag.datasource.retrieval_service import RetrievalService
 from core.rag.datasource.vdb.vector_factory import Vector
@@ -19,10 +23,35 @@ from core.rag.extractor.extract_processor import ExtractProcessor
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.models.document import Document
 from core.tools.utils.text_processing_utils import remove_leading_symbols
+from extensions.ext_redis import redis_client
 from libs import helper
 from models.dataset import Dataset
 from services.entities.knowledge_entities.knowledge_entities import Rule
 
+_QA_GENERATION_BACKOFF_BASE = 1.0
+_QA_GENERATION_BACKOFF_MAX = 30.0
+
+
+def _wait_for_qa_generation_rate_limit(tenant_id: str) -> None:
+    """
+    Wait until the workspace may make another Q&A generation call, the calls are counted per minute
+    in Redis so the limit holds across the indexing workers.
+    """
+    limit = dify_config.QA_GENERATION_RATE_LIMIT_PER_MINUTE
+    if not limit:
+        return
+
+    while True:
+        now = time.time()
+        key = "qa_generation_rate_limit:{}:{}".format(tenant_id, int(now // 60))
+        count = redis_client.incr(key)
+        if count == 1:
+            redis_client.expire(key, 120)
+        if count <= limit:
+            return
+        # wait for the next window, spread the waiting workers over its first second
+        time.sleep(60 - now % 60 + random.uniform(0, 1))
+
 
 class QAIndexProcessor(BaseIndexProcessor):
     def extract(self, extract_setting: ExtractSetting, **kwargs) -> list[Document]:
@@ -53,9 +82,10 @@ class QAIndexProcessor(BaseIndexProcessor):
         # Split the text documents into nodes.
         all_documents: list[Document] = []
         all_qa_documents: list[Document] = []
+        cleaner = CleanProcessor.get_cleaner(kwargs.get("process_rule") or {})
         for document in documents:
             # document clean
-            document_text = CleanProcessor.clean(document.page_content, kwargs.get("process_rule") or {})
+            document_text = cleaner.clean(document.page_content)
             document.page_content = document_text
 
             # parse document to nodes
@@ -74,32 +104,21 @@ class QAIndexProcessor(BaseIndexProcessor):
                     split_documents.append(document_node)
             all_documents.extend(split_documents)
         if preview:
-            self._format_qa_document(
-                current_app._get_current_object(),  # type: ignore
-                kwargs.get("tenant_id"),  # type: ignore
-                all_documents[0],
-                all_qa_documents,
-                kwargs.get("doc_language", "English"),
+            all_qa_documents.extend(
+                self._format_qa_document(
+                    kwargs.get("tenant_id"),  # type: ignore
+                    all_documents[0],
+                    kwargs.get("doc_language", "English"),
+                )
             )
         else:
-            for i in range(0, len(all_documents), 10):
-                threads = []
-                sub_documents = all_documents[i : i + 10]
-                for doc in sub_documents:
-                    document_format_thread = threading.Thread(
-                        target=self._format_qa_document,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),  # type: ignore
-                            "tenant_id": kwargs.get("tenant_id"),  # type: ignore
-                            "document_node": doc,
-                            "all_qa_documents": all_qa_documents,
-                            "document_language": kwargs.get("doc_language", "English"),
-                        },
-                    )
-                    threads.append(document_format_thread)
-                    document_format_thread.start()
-                for thread in threads:
-                    thread.join()
+            all_qa_documents.extend(
+                self._generate_qa_documents(
+                    kwargs.get("tenant_id"),  # type: ignore
+                    all_documents,
+                    kwargs.get("doc_language", "English"),
+                )
+            )
         return all_qa_documents
 
     def format_by_template(self, file: FileStorage, **kwargs) -> list[Document]:
@@ -107,6 +126,8 @@ class QAIndexProcessor(BaseIndexProcessor):
         if not file.filename.endswith(".csv"):
             raise ValueError("Invalid file type. Only CSV files are allowed")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
@@ -161,30 +182,81 @@ class QAIndexProcessor(BaseIndexProcessor):
                 docs.append(doc)
         return docs
 
-    def _format_qa_document(self, flask_app: Flask, tenant_id: str, document_node, all_qa_documents, document_language):
-        format_documents = []
+    def _generate_qa_documents(
+        self, tenant_id: str, document_nodes: list[Document], document_language: str
+    ) -> list[Document]:
+        """
+        Generate the Q&A documents of the document nodes, at most QA_GENERATION_MAX_WORKERS LLM calls
+        run at a time and a worker starts the next node as soon as its call returns.
+
+        :param tenant_id: workspace id
+        :param document_nodes: document nodes
+        :param document_language: language of the Q&A pairs
+        :return: Q&A documents, in the order of the document nodes
+        """
+        flask_app: Flask = current_app._get_current_object()  # type: ignore
+        results: list[list[Document]] = [[] for _ in document_nodes]
+        next_indexes = iter(range(len(document_nodes)))
+        lock = threading.Lock()
+
+        def work() -> None:
+            # one app context per worker instead of per document node
+            with flask_app.app_context():
+                while True:
+                    with lock:
+                        index = next(next_indexes, None)
+                    if index is None:
+                        return
+                    results[index] = self._format_qa_document(tenant_id, document_nodes[index], document_language)
+
+        max_workers = min(dify_config.QA_GENERATION_MAX_WORKERS, len(document_nodes))
+        if max_workers:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for future in [executor.submit(work) for _ in range(max_workers)]:
+                    future.result()
+
+        return [qa_document for qa_documents in results for qa_document in qa_documents]
+
+    def _format_qa_document(self, tenant_id: str, document_node: Document, document_language: str) -> list[Document]:
         if document_node.page_content is None or not document_node.page_content.strip():
-            return
-        with flask_app.app_context():
+            return []
+        try:
+            # qa model document
+            response = self._generate_qa_document(tenant_id, document_node.page_content, document_language)
+            document_qa_list = self._format_split_text(response)
+            qa_documents = []
+            for result in document_qa_list:
+                qa_document = Document(page_content=result["question"], metadata=document_node.metadata.copy())
+                if qa_document.metadata is not None:
+                    doc_id = str(uuid.uuid4())
+                    hash = helper.generate_text_hash(result["question"])
+                    qa_document.metadata["answer"] = result["answer"]
+                    qa_document.metadata["doc_id"] = doc_id
+                    qa_document.metadata["doc_hash"] = hash
+                qa_documents.append(qa_document)
+            return qa_documents
+        except Exception as e:
+            logging.exception("Failed to format qa document")
+            return []
+
+    @staticmethod
+    def _generate_qa_document(tenant_id: str, query: str, document_language: str) -> str:
+        """
+        Generate the Q&A pairs of a text within the rate limit of the workspace, retrying with
+        exponential backoff when the provider rate limits the call.
+        """
+        max_retries = dify_config.QA_GENERATION_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            _wait_for_qa_generation_rate_limit(tenant_id)
             try:
-                # qa model document
-                response = LLMGenerator.generate_qa_document(tenant_id, document_node.page_content, document_language)
-                document_qa_list = self._format_split_text(response)
-                qa_documents = []
-                for result in document_qa_list:
-                    qa_document = Document(page_content=result["question"], metadata=document_node.metadata.copy())
-                    if qa_document.metadata is not None:
-                        doc_id = str(uuid.uuid4())
-                        hash = helper.generate_text_hash(result["question"])
-                        qa_document.metadata["answer"] = result["answer"]
-                        qa_document.metadata["doc_id"] = doc_id
-                        qa_document.metadata["doc_hash"] = hash
-                    qa_documents.append(qa_document)
-                format_documents.extend(qa_documents)
-            except Exception as e:
-                logging.exception("Failed to format qa document")
-
-            all_qa_documents.extend(format_documents)
+                return LLMGenerator.generate_qa_document(tenant_id, query, document_language)
+            except InvokeRateLimitError:
+                if attempt == max_retries:
+                    raise
+                backoff = min(_QA_GENERATION_BACKOFF_BASE * 2**attempt, _QA_GENERATION_BACKOFF_MAX)
+                time.sleep(backoff * random.uniform(0.5, 1))
+
+        raise AssertionError("unreachable")
 
     def _format_split_text(self, text):
         regex = r"Q\d+:\s*(.*?)\s*A\d+:\s*([\s\S]*?)(?=Q\d+:|$)"
@@ -1,5 +1,4 @@
-import math
-from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
 import numpy as np
@@ -65,80 +64,58 @@ class WeightRerankRunner(BaseRerankRunner):
 
     def _calculate_keyword_score(self, query: str, documents: list[Document]) -> list[float]:
         """
-        Calculate BM25 scores
+        Calculate the TF-IDF cosine similarity of the keywords of the query and of each document
         :param query: search query
         :param documents: documents for reranking
 
         :return:
         """
-        keyword_table_handler = JiebaKeywordTableHandler()
-        query_keywords = keyword_table_handler.extract_keywords(query, None)
+        query_keywords = _extract_keywords(query)
         documents_keywords = []
         for document in documents:
             # get the document keywords
-            document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+            document_keywords = set(_extract_keywords(document.page_content))
             if document.metadata is not None:
                 document.metadata["keywords"] = document_keywords
                 documents_keywords.append(document_keywords)
 
-        # Counter query keywords(TF)
-        query_keyword_counts = Counter(query_keywords)
-
-        # total documents
+        # sparse term matrix of the documents: one (document, keyword) pair per entry, the keywords of a text are
+        # a set so the TF of every entry is 1
+        vocabulary: dict[str, int] = {}
+        document_indexes = []
+        keyword_indexes = []
+        for document_index, document_keywords in enumerate(documents_keywords):
+            for keyword in document_keywords:
+                document_indexes.append(document_index)
+                keyword_indexes.append(vocabulary.setdefault(keyword, len(vocabulary)))
+        if not vocabulary:
+            return [0.0] * len(documents_keywords)
+        entry_documents = np.array(document_indexes, dtype=np.int64)
+        entry_keywords = np.array(keyword_indexes, dtype=np.int64)
+
+        # IDF of the keywords of all documents
         total_documents = len(documents)
+        doc_count_containing_keyword = np.bincount(entry_keywords, minlength=len(vocabulary))
+        keyword_idf = np.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
+
+        # TF-IDF of the query, the keywords in no document weigh 0
+        query_tfidf = np.zeros(len(vocabulary))
+        for keyword in query_keywords:
+            keyword_index = vocabulary.get(keyword)
+            if keyword_index is not None:
+                query_tfidf[keyword_index] = keyword_idf[keyword_index]
+
+        # cosine of the query and of every document at once
+        scored_documents = len(documents_keywords)
+        entry_tfidf = keyword_idf[entry_keywords]
+        numerators = np.bincount(
+            entry_documents, weights=query_tfidf[entry_keywords] * entry_tfidf, minlength=scored_documents
+        )
+        documents_norm = np.sqrt(np.bincount(entry_documents, weights=entry_tfidf**2, minlength=scored_documents))
+        denominators = documents_norm * np.linalg.norm(query_tfidf)
+        similarities = np.divide(numerators, denominators, out=np.zeros(scored_documents), where=denominators != 0)
 
-        # calculate all documents' keywords IDF
-        all_keywords = set()
-        for document_keywords in documents_keywords:
-            all_keywords.update(document_keywords)
-
-        keyword_idf = {}
-        for keyword in all_keywords:
-            # calculate include query keywords' documents
-            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
-            # IDF
-            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
-
-        query_tfidf = {}
-
-        for keyword, count in query_keyword_counts.items():
-            tf = count
-            idf = keyword_idf.get(keyword, 0)
-            query_tfidf[keyword] = tf * idf
-
-        # calculate all documents' TF-IDF
-        documents_tfidf = []
-        for document_keywords in documents_keywords:
-            document_keyword_counts = Counter(document_keywords)
-            document_tfidf = {}
-            for keyword, count in document_keyword_counts.items():
-                tf = count
-                idf = keyword_idf.get(keyword, 0)
-                document_tfidf[keyword] = tf * idf
-            documents_tfidf.append(document_tfidf)
-
-        def cosine_similarity(vec1, vec2):
-            intersection = set(vec1.keys()) & set(vec2.keys())
-            numerator = sum(vec1[x] * vec2[x] for x in intersection)
-
-            sum1 = sum(vec1[x] ** 2 for x in vec1)
-            sum2 = sum(vec2[x] ** 2 for x in vec2)
-            denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-            if not denominator:
-                return 0.0
-            else:
-                return float(numerator) / denominator
-
-        similarities = []
-        for document_tfidf in documents_tfidf:
-            similarity = cosine_similarity(query_tfidf, document_tfidf)
-            similarities.append(similarity)
-
-        # for idx, similarity in enumerate(similarities):
-        #     print(f"Document {idx + 1} similarity: {similarity}")
-
-        return similarities
+        return similarities.tolist()
 
     def _calculate_cosine(
         self, tenant_id: str, query: str, documents: list[Document], vector_setting: VectorSetting
@@ -150,7 +127,17 @@ class WeightRerankRunner(BaseRerankRunner):
 
         :return:
         """
-        query_vector_scores = []
+        query_vector_scores: list[float] = [0.0] * len(documents)
+
+        # documents already scored by the vector search
+        unscored_indexes = []
+        for index, document in enumerate(documents):
+            if document.metadata and "score" in document.metadata:
+                query_vector_scores[index] = document.metadata["score"]
+            else:
+                unscored_indexes.append(index)
+        if not unscored_indexes:
+            return query_vector_scores
 
         model_manager = ModelManager()
 
@@ -161,25 +148,22 @@ class WeightRerankRunner(BaseRerankRunner):
             model=vector_setting.embedding_model_name,
         )
         cache_embedding = CacheEmbedding(embedding_model)
-        query_vector = cache_embedding.embed_query(query)
-        for document in documents:
-            # calculate cosine similarity
-            if document.metadata and "score" in document.metadata:
-                query_vector_scores.append(document.metadata["score"])
-            else:
-                # transform to NumPy
-                vec1 = np.array(query_vector)
-                vec2 = np.array(document.vector)
+        query_vector = np.array(cache_embedding.embed_query(query))
 
-                # calculate dot product
-                dot_product = np.dot(vec1, vec2)
+        # cosine similarity of the query and of all documents with one matrix product
+        document_vectors = np.array([documents[index].vector for index in unscored_indexes], dtype=float)
+        cosine_sims = (document_vectors @ query_vector) / (
+            np.linalg.norm(document_vectors, axis=1) * np.linalg.norm(query_vector)
+        )
+        for index, cosine_sim in zip(unscored_indexes, cosine_sims.tolist()):
+            query_vector_scores[index] = cosine_sim
 
-                # calculate norm
-                norm_vec1 = np.linalg.norm(vec1)
-                norm_vec2 = np.linalg.norm(vec2)
+        return query_vector_scores
 
-                # calculate cosine similarity
-                cosine_sim = dot_product / (norm_vec1 * norm_vec2)
-                query_vector_scores.append(cosine_sim)
 
-        return query_vector_scores
+@lru_cache(maxsize=1024)
+def _extract_keywords(text: str) -> frozenset[str]:
+    """
+    Extract the keywords of a text, cached as the same queries and chunks are reranked again and again.
+    """
+    return frozenset(JiebaKeywordTableHandler().extract_keywords(text, None))
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Optional
 
+from configs import dify_config
 from core.model_manager import ModelInstance
 from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
 from core.rag.splitter.text_splitter import (
@@ -31,13 +32,9 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
         **kwargs: Any,
     ):
         def _token_encoder(texts: list[str]) -> list[int]:
-            if not texts:
-                return []
-
-            if embedding_model_instance:
-                return embedding_model_instance.get_text_embedding_num_tokens(texts=texts)
-            else:
-                return [GPT2Tokenizer.get_num_tokens(text) for text in texts]
+            # the lengths of all splits are measured at once by the GPT-2 encoder of the current thread,
+            # the tokenizers of the embedding models are only reachable through a call to the plugin daemon
+            return GPT2Tokenizer.get_num_tokens_batch(texts)
 
         def _character_encoder(texts: list[str]) -> list[int]:
             if not texts:
@@ -53,6 +50,8 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
             }
             kwargs = {**kwargs, **extra_kwargs}
 
+        if dify_config.INDEXING_SEGMENTATION_LENGTH_IN_TOKENS:
+            return cls(length_function=_token_encoder, **kwargs)
         return cls(length_function=_character_encoder, **kwargs)
 
 
@@ -4,6 +4,7 @@ import copy
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections import deque
 from collections.abc import Callable, Collection, Iterable, Sequence, Set
 from dataclasses import dataclass
 from typing import (
@@ -67,6 +68,8 @@ class TextSplitter(BaseDocumentTransformer, ABC):
         self._length_function = length_function
         self._keep_separator = keep_separator
         self._add_start_index = add_start_index
+        # lengths of the separators, measured once
+        self._separator_lengths: dict[str, int] = {}
 
     @abstractmethod
     def split_text(self, text: str) -> list[str]:
@@ -106,21 +109,23 @@ class TextSplitter(BaseDocumentTransformer, ABC):
     def _merge_splits(self, splits: Iterable[str], separator: str, lengths: list[int]) -> list[str]:
         # We now want to combine these smaller pieces into medium size
         # chunks to send to the LLM.
-        separator_len = self._length_function([separator])[0]
+        separator_len = self._separator_lengths.get(separator)
+        if separator_len is None:
+            separator_len = self._separator_lengths[separator] = self._length_function([separator])[0]
 
         docs = []
-        current_doc: list[str] = []
+        # splits of the current chunk with their lengths, the overlap with the next chunk is kept
+        # by popping the splits from the left
+        current_doc: deque[tuple[str, int]] = deque()
         total = 0
-        index = 0
-        for d in splits:
-            _len = lengths[index]
+        for d, _len in zip(splits, lengths):
             if total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size:
                 if total > self._chunk_size:
                     logger.warning(
                         f"Created a chunk of size {total}, which is longer than the specified {self._chunk_size}"
                     )
                 if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                    doc = self._join_docs([split for split, _ in current_doc], separator)
                     if doc is not None:
                         docs.append(doc)
                     # Keep on popping if:
@@ -129,14 +134,11 @@ class TextSplitter(BaseDocumentTransformer, ABC):
                     while total > self._chunk_overlap or (
                         total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size and total > 0
                     ):
-                        total -= self._length_function([current_doc[0]])[0] + (
-                            separator_len if len(current_doc) > 1 else 0
-                        )
-                        current_doc = current_doc[1:]
-            current_doc.append(d)
+                        total -= current_doc[0][1] + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc.popleft()
+            current_doc.append((d, _len))
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-            index += 1
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs([split for split, _ in current_doc], separator)
         if doc is not None:
             docs.append(doc)
         return docs
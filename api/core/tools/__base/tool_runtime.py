@@ -1,7 +1,6 @@
 from typing import Any, Optional
 
-from openai import BaseModel
-from pydantic import Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.tools.entities.tool_entities import ToolInvokeFrom
@@ -12,6 +11,8 @@ class ToolRuntime(BaseModel):
     Meta data of a tool call processing
     """
 
+    model_config = ConfigDict(extra="allow")
+
     tenant_id: str
     tool_id: Optional[str] = None
     invoke_from: Optional[InvokeFrom] = None
@@ -33,6 +33,7 @@ class NodeRunMetadataKey(StrEnum):
     - LOOP_DURATION_MAP: 循环持续时间映射
     - ERROR_STRATEGY: 错误处理策略
     - LOOP_VARIABLE_MAP: 循环变量映射
+    - CACHE_HIT: 节点结果是否来自结果缓存
     """
 
     TOTAL_TOKENS = "total_tokens"
@@ -53,6 +54,7 @@ class NodeRunMetadataKey(StrEnum):
     LOOP_DURATION_MAP = "loop_duration_map"  # single loop duration if loop node runs
     ERROR_STRATEGY = "error_strategy"  # node in continue on error mode return the field
     LOOP_VARIABLE_MAP = "loop_variable_map"  # single loop variable output
+    CACHE_HIT = "cache_hit"  # node result was served from the node result cache
 
 
 class NodeRunResult(BaseModel):
@@ -1,8 +1,12 @@
+import hashlib
+import json
+import threading
 import uuid
 from collections import defaultdict
 from collections.abc import Mapping
 from typing import Any, Optional, cast
 
+from cachetools import LRUCache
 from pydantic import BaseModel, Field
 
 from configs import dify_config
@@ -53,6 +57,29 @@ class Graph(BaseModel):
     answer_stream_generate_routes: AnswerStreamGenerateRoute = Field(..., description="answer stream generate routes")
     end_stream_param: EndStreamParam = Field(..., description="end stream param")
 
+    @classmethod
+    def get_or_init(cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None) -> "Graph":
+        """
+        Get the compiled graph of a graph config from the process cache, or init and cache it.
+        The graph is shared by every run and iteration of the same config, so it must not be modified.
+
+        :param graph_config: graph config
+        :param root_node_id: root node id
+        :return: graph
+        """
+        if not dify_config.WORKFLOW_GRAPH_CACHE_MAX_SIZE:
+            return cls.init(graph_config=graph_config, root_node_id=root_node_id)
+
+        key = (hashlib.sha256(json.dumps(graph_config).encode()).hexdigest(), root_node_id)
+        with _compiled_graph_cache_lock:
+            graph = _compiled_graph_cache.get(key)
+        if graph is None:
+            graph = cls.init(graph_config=graph_config, root_node_id=root_node_id)
+            with _compiled_graph_cache_lock:
+                _compiled_graph_cache[key] = graph
+
+        return graph
+
     @classmethod
     def init(cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None) -> "Graph":
         """
@@ -149,11 +176,15 @@ class Graph(BaseModel):
             raise ValueError(f"Root node id {root_node_id} not found in the graph")
 
         # Check whether it is connected to the previous node
-        cls._check_connected_to_previous_node(route=[root_node_id], edge_mapping=edge_mapping)
+        cls._check_connected_to_previous_node(
+            route=[root_node_id], route_node_ids={root_node_id}, edge_mapping=edge_mapping, checked_node_ids=set()
+        )
 
         # fetch all node ids from root node
         node_ids = [root_node_id]
-        cls._recursively_add_node_ids(node_ids=node_ids, edge_mapping=edge_mapping, node_id=root_node_id)
+        cls._recursively_add_node_ids(
+            node_ids=node_ids, edge_mapping=edge_mapping, node_id=root_node_id, added_node_ids={root_node_id}
+        )
 
         node_id_config_mapping = {node_id: all_node_id_config_mapping[node_id] for node_id in node_ids}
 
@@ -166,6 +197,8 @@ class Graph(BaseModel):
             start_node_id=root_node_id,
             parallel_mapping=parallel_mapping,
             node_parallel_mapping=node_parallel_mapping,
+            visited=set(),
+            descendant_node_ids={},
         )
 
         # Check if it exceeds N layers of parallel
@@ -247,7 +280,7 @@ class Graph(BaseModel):
 
     @classmethod
     def _recursively_add_node_ids(
-        cls, node_ids: list[str], edge_mapping: dict[str, list[GraphEdge]], node_id: str
+        cls, node_ids: list[str], edge_mapping: dict[str, list[GraphEdge]], node_id: str, added_node_ids: set[str]
     ) -> None:
         """
         Recursively add node ids
@@ -255,20 +288,36 @@ class Graph(BaseModel):
         :param node_ids: node ids
         :param edge_mapping: edge mapping
         :param node_id: node id
+        :param added_node_ids: set of node ids, for membership checks
         """
         for graph_edge in edge_mapping.get(node_id, []):
-            if graph_edge.target_node_id in node_ids:
+            if graph_edge.target_node_id in added_node_ids:
                 continue
 
             node_ids.append(graph_edge.target_node_id)
+            added_node_ids.add(graph_edge.target_node_id)
             cls._recursively_add_node_ids(
-                node_ids=node_ids, edge_mapping=edge_mapping, node_id=graph_edge.target_node_id
+                node_ids=node_ids,
+                edge_mapping=edge_mapping,
+                node_id=graph_edge.target_node_id,
+                added_node_ids=added_node_ids,
             )
 
     @classmethod
-    def _check_connected_to_previous_node(cls, route: list[str], edge_mapping: dict[str, list[GraphEdge]]) -> None:
+    def _check_connected_to_previous_node(
+        cls,
+        route: list[str],
+        route_node_ids: set[str],
+        edge_mapping: dict[str, list[GraphEdge]],
+        checked_node_ids: set[str],
+    ) -> None:
         """
         Check whether it is connected to the previous node
+
+        :param route: current route, the last node is checked
+        :param route_node_ids: node ids of the current route
+        :param edge_mapping: edge mapping
+        :param checked_node_ids: nodes whose successors are known not to connect to a previous node
         """
         last_node_id = route[-1]
 
@@ -276,17 +325,26 @@ class Graph(BaseModel):
             if not graph_edge.target_node_id:
                 continue
 
-            if graph_edge.target_node_id in route:
+            if graph_edge.target_node_id in route_node_ids:
                 raise ValueError(
                     f"Node {graph_edge.source_node_id} is connected to the previous node, please check the graph."
                 )
 
-            new_route = route.copy()
-            new_route.append(graph_edge.target_node_id)
+            if graph_edge.target_node_id in checked_node_ids:
+                continue
+
+            route.append(graph_edge.target_node_id)
+            route_node_ids.add(graph_edge.target_node_id)
             cls._check_connected_to_previous_node(
-                route=new_route,
+                route=route,
+                route_node_ids=route_node_ids,
                 edge_mapping=edge_mapping,
+                checked_node_ids=checked_node_ids,
             )
+            route.pop()
+            route_node_ids.remove(graph_edge.target_node_id)
+
+        checked_node_ids.add(last_node_id)
 
     @classmethod
     def _recursively_add_parallels(
@@ -296,6 +354,8 @@ class Graph(BaseModel):
         start_node_id: str,
         parallel_mapping: dict[str, GraphParallel],
         node_parallel_mapping: dict[str, str],
+        visited: set[tuple[str, Optional[str]]],
+        descendant_node_ids: dict[str, set[str]],
         parent_parallel: Optional[GraphParallel] = None,
     ) -> None:
         """
@@ -305,8 +365,17 @@ class Graph(BaseModel):
         :param start_node_id: start from node id
         :param parallel_mapping: parallel mapping
         :param node_parallel_mapping: node parallel mapping
+        :param visited: visited (node id, parent parallel id) pairs
+        :param descendant_node_ids: cache of node id to ids of all nodes after it
         :param parent_parallel: parent parallel
         """
+        # a node reached again by another route within the same parallel, e.g. the merge node of a parallel,
+        # would only add a duplicate of the parallels already added from it
+        visit = (start_node_id, parent_parallel.id if parent_parallel else None)
+        if visit in visited:
+            return
+        visited.add(visit)
+
         target_node_edges = edge_mapping.get(start_node_id, [])
         parallel = None
         if len(target_node_edges) > 1:
@@ -344,6 +413,7 @@ class Graph(BaseModel):
                         edge_mapping=edge_mapping,
                         reverse_edge_mapping=reverse_edge_mapping,
                         parallel_branch_node_ids=condition_parallel_branch_node_ids,
+                        descendant_node_ids=descendant_node_ids,
                     )
 
                     # collect all branches node ids
@@ -352,16 +422,14 @@ class Graph(BaseModel):
                         for node_id in node_ids:
                             in_parent_parallel = True
                             if parent_parallel_id:
-                                in_parent_parallel = False
-                                for parallel_node_id, parallel_id in node_parallel_mapping.items():
-                                    if parallel_id == parent_parallel_id and parallel_node_id == node_id:
-                                        in_parent_parallel = True
-                                        break
+                                in_parent_parallel = node_parallel_mapping.get(node_id) == parent_parallel_id
 
                             if in_parent_parallel:
                                 parallel_node_ids.append(node_id)
                                 node_parallel_mapping[node_id] = parallel.id
 
+                    parallel_node_id_set = set(parallel_node_ids)
+
                     outside_parallel_target_node_ids = set()
                     for node_id in parallel_node_ids:
                         if node_id == parallel.start_from_node_id:
@@ -375,7 +443,7 @@ class Graph(BaseModel):
                             continue
 
                         target_node_id = node_edges[0].target_node_id
-                        if target_node_id in parallel_node_ids:
+                        if target_node_id in parallel_node_id_set:
                             continue
 
                         if parent_parallel_id:
@@ -423,6 +491,8 @@ class Graph(BaseModel):
                             start_node_id=graph_edge.target_node_id,
                             parallel_mapping=parallel_mapping,
                             node_parallel_mapping=node_parallel_mapping,
+                            visited=visited,
+                            descendant_node_ids=descendant_node_ids,
                             parent_parallel=current_parallel,
                         )
             else:
@@ -440,6 +510,8 @@ class Graph(BaseModel):
                         start_node_id=graph_edge.target_node_id,
                         parallel_mapping=parallel_mapping,
                         node_parallel_mapping=node_parallel_mapping,
+                        visited=visited,
+                        descendant_node_ids=descendant_node_ids,
                         parent_parallel=current_parallel,
                     )
         else:
@@ -457,6 +529,8 @@ class Graph(BaseModel):
                     start_node_id=graph_edge.target_node_id,
                     parallel_mapping=parallel_mapping,
                     node_parallel_mapping=node_parallel_mapping,
+                    visited=visited,
+                    descendant_node_ids=descendant_node_ids,
                     parent_parallel=current_parallel,
                 )
 
@@ -529,6 +603,7 @@ class Graph(BaseModel):
         edge_mapping: dict[str, list[GraphEdge]],
         merge_node_id: str,
         start_node_id: str,
+        added_node_ids: set[str],
     ) -> None:
         """
         Recursively add node ids
@@ -537,15 +612,18 @@ class Graph(BaseModel):
         :param edge_mapping: edge mapping
         :param merge_node_id: merge node id
         :param start_node_id: start node id
+        :param added_node_ids: set of in branch node ids, for membership checks
         """
         for graph_edge in edge_mapping.get(start_node_id, []):
-            if graph_edge.target_node_id != merge_node_id and graph_edge.target_node_id not in branch_node_ids:
+            if graph_edge.target_node_id != merge_node_id and graph_edge.target_node_id not in added_node_ids:
                 branch_node_ids.append(graph_edge.target_node_id)
+                added_node_ids.add(graph_edge.target_node_id)
                 cls._recursively_add_parallel_node_ids(
                     branch_node_ids=branch_node_ids,
                     edge_mapping=edge_mapping,
                     merge_node_id=merge_node_id,
                     start_node_id=graph_edge.target_node_id,
+                    added_node_ids=added_node_ids,
                 )
 
     @classmethod
@@ -554,24 +632,34 @@ class Graph(BaseModel):
         edge_mapping: dict[str, list[GraphEdge]],
         reverse_edge_mapping: dict[str, list[GraphEdge]],
         parallel_branch_node_ids: list[str],
+        descendant_node_ids: dict[str, set[str]],
     ) -> dict[str, list[str]]:
         """
         Fetch all node ids in parallels
         """
         routes_node_ids: dict[str, list[str]] = {}
+        routes_node_id_sets: dict[str, set[str]] = {}
         for parallel_branch_node_id in parallel_branch_node_ids:
             routes_node_ids[parallel_branch_node_id] = [parallel_branch_node_id]
+            routes_node_id_sets[parallel_branch_node_id] = {parallel_branch_node_id}
 
             # fetch routes node ids
             cls._recursively_fetch_routes(
                 edge_mapping=edge_mapping,
                 start_node_id=parallel_branch_node_id,
                 routes_node_ids=routes_node_ids[parallel_branch_node_id],
+                added_node_ids=routes_node_id_sets[parallel_branch_node_id],
             )
 
+        # only nodes with multiple incoming edges can merge branches, and only if all branches start from one node
+        branches_from_same_node = cls._is_node_in_routes(
+            reverse_edge_mapping=reverse_edge_mapping, routes_node_ids=routes_node_ids
+        )
+
         # fetch leaf node ids from routes node ids
         leaf_node_ids: dict[str, list[str]] = {}
         merge_branch_node_ids: dict[str, list[str]] = {}
+        merge_branch_node_id_sets: dict[str, set[str]] = defaultdict(set)
         for branch_node_id, node_ids in routes_node_ids.items():
             for node_id in node_ids:
                 if node_id not in edge_mapping or len(edge_mapping[node_id]) == 0:
@@ -580,42 +668,44 @@ class Graph(BaseModel):
 
                     leaf_node_ids[branch_node_id].append(node_id)
 
-                for branch_node_id2, inner_route2 in routes_node_ids.items():
-                    if (
-                        branch_node_id != branch_node_id2
-                        and node_id in inner_route2
-                        and len(reverse_edge_mapping.get(node_id, [])) > 1
-                        and cls._is_node_in_routes(
-                            reverse_edge_mapping=reverse_edge_mapping,
-                            start_node_id=node_id,
-                            routes_node_ids=routes_node_ids,
-                        )
-                    ):
+                if not branches_from_same_node or len(reverse_edge_mapping.get(node_id, [])) <= 1:
+                    continue
+
+                for branch_node_id2, inner_route2 in routes_node_id_sets.items():
+                    if branch_node_id != branch_node_id2 and node_id in inner_route2:
                         if node_id not in merge_branch_node_ids:
                             merge_branch_node_ids[node_id] = []
 
-                        if branch_node_id2 not in merge_branch_node_ids[node_id]:
+                        if branch_node_id2 not in merge_branch_node_id_sets[node_id]:
                             merge_branch_node_ids[node_id].append(branch_node_id2)
+                            merge_branch_node_id_sets[node_id].add(branch_node_id2)
 
         # sorted merge_branch_node_ids by branch_node_ids length desc
         merge_branch_node_ids = dict(sorted(merge_branch_node_ids.items(), key=lambda x: len(x[1]), reverse=True))
 
+        # pairs of merge nodes of the same branches, in the order of merge_branch_node_ids
+        same_branches_node_ids: dict[frozenset[str], list[str]] = defaultdict(list)
+        for node_id, branch_node_ids in merge_branch_node_ids.items():
+            same_branches_node_ids[frozenset(branch_node_ids)].append(node_id)
+
         duplicate_end_node_ids = {}
         for node_id, branch_node_ids in merge_branch_node_ids.items():
-            for node_id2, branch_node_ids2 in merge_branch_node_ids.items():
-                if node_id != node_id2 and set(branch_node_ids) == set(branch_node_ids2):
-                    if (node_id, node_id2) not in duplicate_end_node_ids and (
-                        node_id2,
-                        node_id,
-                    ) not in duplicate_end_node_ids:
-                        duplicate_end_node_ids[(node_id, node_id2)] = branch_node_ids
+            node_ids = same_branches_node_ids[frozenset(branch_node_ids)]
+            for node_id2 in node_ids[node_ids.index(node_id) + 1 :]:
+                duplicate_end_node_ids[(node_id, node_id2)] = branch_node_ids
 
         for (node_id, node_id2), branch_node_ids in duplicate_end_node_ids.items():
             # check which node is after
-            if cls._is_node2_after_node1(node1_id=node_id, node2_id=node_id2, edge_mapping=edge_mapping):
+            for current_node_id in (node_id, node_id2):
+                if current_node_id not in descendant_node_ids:
+                    descendant_node_ids[current_node_id] = cls._fetch_descendant_node_ids(
+                        node_id=current_node_id, edge_mapping=edge_mapping
+                    )
+
+            if node_id2 in descendant_node_ids[node_id]:
                 if node_id in merge_branch_node_ids and node_id2 in merge_branch_node_ids:
                     del merge_branch_node_ids[node_id2]
-            elif cls._is_node2_after_node1(node1_id=node_id2, node2_id=node_id, edge_mapping=edge_mapping):
+            elif node_id in descendant_node_ids[node_id2]:
                 if node_id in merge_branch_node_ids and node_id2 in merge_branch_node_ids:
                     del merge_branch_node_ids[node_id]
 
@@ -648,13 +738,18 @@ class Graph(BaseModel):
                     edge_mapping=edge_mapping,
                     merge_node_id=merge_node_id,
                     start_node_id=branch_node_id,
+                    added_node_ids=set(in_branch_node_ids[branch_node_id]),
                 )
 
         return in_branch_node_ids
 
     @classmethod
     def _recursively_fetch_routes(
-        cls, edge_mapping: dict[str, list[GraphEdge]], start_node_id: str, routes_node_ids: list[str]
+        cls,
+        edge_mapping: dict[str, list[GraphEdge]],
+        start_node_id: str,
+        routes_node_ids: list[str],
+        added_node_ids: set[str],
     ) -> None:
         """
         Recursively fetch route
@@ -664,28 +759,26 @@ class Graph(BaseModel):
 
         for graph_edge in edge_mapping[start_node_id]:
             # find next node ids
-            if graph_edge.target_node_id not in routes_node_ids:
+            if graph_edge.target_node_id not in added_node_ids:
                 routes_node_ids.append(graph_edge.target_node_id)
+                added_node_ids.add(graph_edge.target_node_id)
 
                 cls._recursively_fetch_routes(
-                    edge_mapping=edge_mapping, start_node_id=graph_edge.target_node_id, routes_node_ids=routes_node_ids
+                    edge_mapping=edge_mapping,
+                    start_node_id=graph_edge.target_node_id,
+                    routes_node_ids=routes_node_ids,
+                    added_node_ids=added_node_ids,
                 )
 
     @classmethod
     def _is_node_in_routes(
-        cls, reverse_edge_mapping: dict[str, list[GraphEdge]], start_node_id: str, routes_node_ids: dict[str, list[str]]
+        cls, reverse_edge_mapping: dict[str, list[GraphEdge]], routes_node_ids: dict[str, list[str]]
     ) -> bool:
         """
-        Recursively check if the node is in the routes
+        Check if all routes start from the same node
         """
-        if start_node_id not in reverse_edge_mapping:
-            return False
-
-        all_routes_node_ids = set()
         parallel_start_node_ids: dict[str, list[str]] = {}
-        for branch_node_id, node_ids in routes_node_ids.items():
-            all_routes_node_ids.update(node_ids)
-
+        for branch_node_id in routes_node_ids:
             if branch_node_id in reverse_edge_mapping:
                 for graph_edge in reverse_edge_mapping[branch_node_id]:
                     if graph_edge.source_node_id not in parallel_start_node_ids:
@@ -700,20 +793,20 @@ class Graph(BaseModel):
         return False
 
     @classmethod
-    def _is_node2_after_node1(cls, node1_id: str, node2_id: str, edge_mapping: dict[str, list[GraphEdge]]) -> bool:
+    def _fetch_descendant_node_ids(cls, node_id: str, edge_mapping: dict[str, list[GraphEdge]]) -> set[str]:
         """
-        is node2 after node1
+        Fetch ids of all nodes after the node
         """
-        if node1_id not in edge_mapping:
-            return False
+        descendant_node_ids: set[str] = set()
+        node_ids = [node_id]
+        while node_ids:
+            for graph_edge in edge_mapping.get(node_ids.pop(), []):
+                if graph_edge.target_node_id not in descendant_node_ids:
+                    descendant_node_ids.add(graph_edge.target_node_id)
+                    node_ids.append(graph_edge.target_node_id)
 
-        for graph_edge in edge_mapping[node1_id]:
-            if graph_edge.target_node_id == node2_id:
-                return True
+        return descendant_node_ids
 
-            if cls._is_node2_after_node1(
-                node1_id=graph_edge.target_node_id, node2_id=node2_id, edge_mapping=edge_mapping
-            ):
-                return True
 
-        return False
+_compiled_graph_cache: LRUCache = LRUCache(maxsize=max(dify_config.WORKFLOW_GRAPH_CACHE_MAX_SIZE, 1))
+_compiled_graph_cache_lock = threading.Lock()
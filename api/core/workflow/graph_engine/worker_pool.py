@@ -0,0 +1,249 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Generator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from opentelemetry.metrics import CallbackOptions, Observation, get_meter
+
+from configs import dify_config
+
+_meter = get_meter("workflow_worker_pool")
+_queue_wait_histogram = _meter.create_histogram(
+    "workflow.worker_pool.queue_wait",
+    description="Time parallel branches waited in the worker pool before they started running",
+    unit="s",
+)
+
+
+@dataclass
+class _Task:
+    run_id: str
+    future: Future
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    # context of the submitter, the task runs in it so no context variable leaks between the tasks of a thread
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class _RunState:
+    def __init__(self) -> None:
+        self.pending: deque[_Task] = deque()
+        # tasks of the run taken by a worker and not parked in `blocking`
+        self.active = 0
+        # tasks of the run submitted and not finished yet
+        self.submitted = 0
+
+
+class GraphEngineWorkerPool:
+    """
+    Worker pool shared by the graph engines of a process to run parallel branches.
+
+    At most `max_workers` branches are running at a time. Every workflow run, identified by
+    its thread pool id, has its own FIFO of pending branches and the runs take turns in
+    round-robin order, so a run fanning out to many branches can't starve the others. A run
+    holds at most `max_workers_per_run` workers and has at most `max_submit_count` branches
+    submitted, further submits are rejected like the per-run thread pools did before.
+
+    A branch waiting for the branches of a nested parallel parks in `blocking`, which hands
+    its slot to the pending branches, so nested parallels can't deadlock the pool. Threads are
+    started on demand and stop after being idle for `idle_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_workers_per_run: int,
+        max_submit_count: int,
+        idle_timeout: float = 60,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_workers_per_run = max_workers_per_run
+        self.max_submit_count = max_submit_count
+        self.idle_timeout = idle_timeout
+
+        self._condition = threading.Condition()
+        self._runs: dict[str, _RunState] = {}
+        # runs with pending tasks, in the order they get their next turn
+        self._ready_runs: OrderedDict[str, None] = OrderedDict()
+        self._threads = 0
+        self._idle_threads = 0
+        self._blocked_threads = 0
+        self._local = threading.local()
+
+    def submit(self, run_id: str, fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+        """
+        Submit a task of a workflow run, it runs in a copy of the current context
+        :param run_id: workflow run thread pool id
+        :param fn: task
+        :return: future of the task result
+        """
+        future: Future = Future()
+        with self._condition:
+            run = self._runs.setdefault(run_id, _RunState())
+            if run.submitted >= self.max_submit_count:
+                if not run.submitted:
+                    del self._runs[run_id]
+                raise ValueError(f"Max submit count {self.max_submit_count} of workflow thread pool reached.")
+
+            run.submitted += 1
+            run.pending.append(_Task(run_id=run_id, future=future, fn=fn, args=args, kwargs=kwargs))
+            self._ready_runs[run_id] = None
+            self._dispatch()
+
+        return future
+
+    @contextmanager
+    def blocking(self) -> Generator[None, None, None]:
+        """
+        Give up the worker slot of the current task while it waits on other tasks of the pool.
+        No-op outside of the pool's worker threads.
+        """
+        run_id: Optional[str] = getattr(self._local, "run_id", None)
+        if run_id is None:
+            yield
+            return
+
+        with self._condition:
+            self._blocked_threads += 1
+            run = self._runs[run_id]
+            run.active -= 1
+            if run.pending:
+                self._ready_runs[run_id] = None
+            self._dispatch()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._blocked_threads -= 1
+                run.active += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        Snapshot of the pool usage
+        :return:
+        """
+        with self._condition:
+            return {
+                "threads": self._threads,
+                "idle_threads": self._idle_threads,
+                "blocked_threads": self._blocked_threads,
+                "active_branches": sum(run.active for run in self._runs.values()),
+                "pending_branches": sum(len(run.pending) for run in self._runs.values()),
+                "runs": len(self._runs),
+            }
+
+    def _dispatch(self) -> None:
+        """
+        Wake or start a worker if a pending task can run, must hold the condition
+        """
+        if not self._ready_runs:
+            return
+
+        if self._idle_threads:
+            self._condition.notify()
+        elif self._threads - self._blocked_threads < self.max_workers:
+            self._threads += 1
+            threading.Thread(target=self._work, name="GraphEngineWorker", daemon=True).start()
+
+    def _next_task(self) -> Optional[_Task]:
+        """
+        Take the pending task of the next run under its worker cap, must hold the condition
+        """
+        if self._threads - self._idle_threads - self._blocked_threads > self.max_workers:
+            # over budget after blocked tasks resumed, let this thread go idle
+            return None
+
+        for run_id in self._ready_runs:
+            run = self._runs[run_id]
+            if run.active >= self.max_workers_per_run:
+                continue
+
+            task = run.pending.popleft()
+            run.active += 1
+            del self._ready_runs[run_id]
+            if run.pending:
+                # back of the line
+                self._ready_runs[run_id] = None
+            return task
+
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                task = self._next_task()
+                while task is None:
+                    self._idle_threads += 1
+                    notified = self._condition.wait(timeout=self.idle_timeout)
+                    self._idle_threads -= 1
+                    task = self._next_task()
+                    if task is None and not notified:
+                        self._threads -= 1
+                        return
+
+                # more runnable tasks may be pending, keep the pool busy
+                self._dispatch()
+
+            _queue_wait_histogram.record(time.perf_counter() - task.submitted_at)
+            if not task.future.set_running_or_notify_cancel():
+                self._finish_task(task)
+                continue
+
+            self._local.run_id = task.run_id
+            try:
+                result = task.context.run(task.fn, *task.args, **task.kwargs)
+            except BaseException as e:
+                self._finish_task(task)
+                task.future.set_exception(e)
+            else:
+                # free the slot first, callers waiting on the future see the run's budget released
+                self._finish_task(task)
+                task.future.set_result(result)
+            finally:
+                self._local.run_id = None
+
+    def _finish_task(self, task: _Task) -> None:
+        with self._condition:
+            run = self._runs[task.run_id]
+            run.active -= 1
+            run.submitted -= 1
+            if not run.submitted:
+                del self._runs[task.run_id]
+            elif run.pending:
+                self._ready_runs[task.run_id] = None
+
+    def _observe_active_branches(self, options: CallbackOptions) -> list[Observation]:
+        stats = self.stats()
+        return [Observation(stats["active_branches"]), Observation(stats["pending_branches"], {"pending": True})]
+
+    def _observe_utilization(self, options: CallbackOptions) -> list[Observation]:
+        stats = self.stats()
+        busy_threads = stats["threads"] - stats["idle_threads"] - stats["blocked_threads"]
+        return [Observation(busy_threads / self.max_workers)]
+
+
+worker_pool = GraphEngineWorkerPool(
+    max_workers=dify_config.WORKFLOW_WORKER_POOL_MAX_WORKERS,
+    max_workers_per_run=dify_config.WORKFLOW_WORKER_POOL_MAX_WORKERS_PER_RUN,
+    max_submit_count=dify_config.MAX_SUBMIT_COUNT,
+)
+
+_meter.create_observable_gauge(
+    "workflow.worker_pool.branches",
+    callbacks=[worker_pool._observe_active_branches],
+    description="Parallel branches running in the worker pool, or pending with the pending attribute",
+    unit="{branch}",
+)
+_meter.create_observable_gauge(
+    "workflow.worker_pool.utilization",
+    callbacks=[worker_pool._observe_utilization],
+    description="Share of the worker pool budget running parallel branches",
+    unit="1",
+)
@@ -21,7 +21,15 @@ logger = logging.getLogger(__name__)
 class AnswerStreamProcessor(StreamProcessor):
     def __init__(self, graph: Graph, variable_pool: VariablePool) -> None:
         super().__init__(graph, variable_pool)
-        self.generate_routes = graph.answer_stream_generate_routes
+        # the graph may be shared by other runs, answer dependencies are modified while streaming
+        self.generate_routes = graph.answer_stream_generate_routes.model_copy(
+            update={
+                "answer_dependencies": {
+                    answer_node_id: list(dependencies)
+                    for answer_node_id, dependencies in graph.answer_stream_generate_routes.answer_dependencies.items()
+                }
+            }
+        )
         self.route_position = {}
         for answer_node_id in self.generate_routes.answer_generate_route:
             self.route_position[answer_node_id] = 0
@@ -119,6 +119,13 @@ class RetryConfig(BaseModel):
         return self.retry_interval / 1000
 
 
+class CacheConfig(BaseModel):
+    """node result cache config"""
+
+    cache_enabled: bool = False  # whether the node result is cached by its inputs
+    ttl: int = 300  # cache ttl in seconds
+
+
 class BaseNodeData(ABC, BaseModel):
     title: str
     desc: Optional[str] = None
@@ -126,6 +133,7 @@ class BaseNodeData(ABC, BaseModel):
     default_value: Optional[list[DefaultValue]] = None
     version: str = "1"
     retry_config: RetryConfig = RetryConfig()
+    cache_config: CacheConfig = CacheConfig()
 
     @property
     def default_value_dict(self):
@@ -1,10 +1,19 @@
+import hashlib
+import json
 import logging
 from abc import abstractmethod
 from collections.abc import Generator, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar, Union, cast
 
-from core.workflow.entities.node_entities import NodeRunResult
-from core.workflow.nodes.enums import CONTINUE_ON_ERROR_NODE_TYPE, RETRY_ON_ERROR_NODE_TYPE, NodeType
+from core.model_runtime.utils.encoders import jsonable_encoder
+from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeRunResult
+from core.workflow.nodes.base.result_cache import node_result_cache
+from core.workflow.nodes.enums import (
+    CACHEABLE_NODE_TYPE,
+    CONTINUE_ON_ERROR_NODE_TYPE,
+    RETRY_ON_ERROR_NODE_TYPE,
+    NodeType,
+)
 from core.workflow.nodes.event import NodeEvent, RunCompletedEvent
 from models.workflow import WorkflowNodeExecutionStatus
 
@@ -68,6 +77,14 @@ class BaseNode(Generic[GenericNodeData]):
         raise NotImplementedError
 
     def run(self) -> Generator[Union[NodeEvent, "InNodeEvent"], None, None]:
+        cache_key = self._get_result_cache_key() if self.should_cache_result else None
+        if cache_key:
+            cached_result = node_result_cache.get(cache_key, self.node_type.value)
+            if cached_result:
+                metadata = {**(cached_result.metadata or {}), NodeRunMetadataKey.CACHE_HIT: True}
+                yield RunCompletedEvent(run_result=cached_result.model_copy(update={"metadata": metadata}))
+                return
+
         try:
             result = self._run()
         except Exception as e:
@@ -79,10 +96,46 @@ class BaseNode(Generic[GenericNodeData]):
             )
 
         if isinstance(result, NodeRunResult):
+            if cache_key and result.status == WorkflowNodeExecutionStatus.SUCCEEDED:
+                node_result_cache.set(cache_key, result, self.node_data.cache_config.ttl)
             yield RunCompletedEvent(run_result=result)
         else:
             yield from result
 
+    def _get_result_cache_key(self) -> Optional[str]:
+        """
+        Hash the node config and the values of every variable the node reads
+        :return: cache key, or None if an input can not be serialized
+        """
+        try:
+            payload = json.dumps(
+                {"config": self.node_data.model_dump(mode="json"), "inputs": self._get_result_cache_inputs()},
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+        except Exception:
+            logger.warning(f"Node {self.node_id} inputs can not be hashed, skip result cache", exc_info=True)
+            return None
+
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"{self.tenant_id}:{self.app_id}:{self.node_type.value}:{digest}"
+
+    def _get_result_cache_inputs(self) -> dict[str, Any]:
+        """
+        Values of every variable the node reads, override to add values resolved at run time
+        by other means than the variable selector mapping
+        :return: json serializable inputs
+        """
+        variable_mapping = self._extract_variable_selector_to_variable_mapping(
+            graph_config=self.graph_config, node_id=self.node_id, node_data=self.node_data
+        )
+        inputs = {}
+        for key, selector in sorted(variable_mapping.items()):
+            segment = self.graph_runtime_state.variable_pool.get(selector)
+            inputs[key] = jsonable_encoder(segment.value) if segment is not None else None
+
+        return inputs
+
     @classmethod
     def extract_variable_selector_to_variable_mapping(
         cls,
@@ -148,6 +201,15 @@ class BaseNode(Generic[GenericNodeData]):
         """
         return self.node_data.error_strategy is not None and self.node_type in CONTINUE_ON_ERROR_NODE_TYPE
 
+    @property
+    def should_cache_result(self) -> bool:
+        """judge if the node result should be served from and stored in the node result cache
+
+        Returns:
+            bool: if should cache result
+        """
+        return self.node_data.cache_config.cache_enabled and self.node_type in CACHEABLE_NODE_TYPE
+
     @property
     def should_retry(self) -> bool:
         """judge if should retry
@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from cachetools import LRUCache
+from opentelemetry.metrics import get_meter
+
+from configs import dify_config
+from core.file import FILE_MODEL_IDENTITY, File
+from core.model_runtime.utils.encoders import jsonable_encoder
+from core.workflow.entities.node_entities import NodeRunResult
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_meter = get_meter("workflow_node_result_cache")
+_lookup_counter = _meter.create_counter(
+    "workflow.node_result_cache.lookups",
+    description="Node result cache lookups, the hit attribute gives the hit ratio",
+    unit="{lookup}",
+)
+
+
+class NodeResultCache:
+    """
+    Cache of successful node run results keyed by node config and resolved inputs.
+
+    Results are stored in Redis as JSON, with File values dumped together with their storage key
+    so they can be rebuilt, or kept in a process-local LRU when WORKFLOW_NODE_RESULT_CACHE_BACKEND
+    is `memory`.
+    """
+
+    _KEY_PREFIX = "workflow_node_result"
+
+    def __init__(self) -> None:
+        self._local: LRUCache = LRUCache(maxsize=dify_config.WORKFLOW_NODE_RESULT_CACHE_MAX_ENTRIES)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, node_type: str) -> Optional[NodeRunResult]:
+        """
+        Get cached node run result
+        :param key: cache key
+        :param node_type: node type, used as metric attribute
+        :return:
+        """
+        result: Optional[NodeRunResult] = None
+        if dify_config.WORKFLOW_NODE_RESULT_CACHE_BACKEND == "memory":
+            with self._lock:
+                entry = self._local.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                result = entry[1]
+        else:
+            data = redis_client.get(f"{self._KEY_PREFIX}:{key}")
+            if data is not None:
+                result = _load_result(data)
+
+        _lookup_counter.add(1, {"node_type": node_type, "hit": result is not None})
+        return result
+
+    def set(self, key: str, result: NodeRunResult, ttl: int) -> None:
+        """
+        Store node run result
+        :param key: cache key
+        :param result: node run result
+        :param ttl: ttl in seconds
+        :return:
+        """
+        if ttl <= 0:
+            return
+
+        if dify_config.WORKFLOW_NODE_RESULT_CACHE_BACKEND == "memory":
+            with self._lock:
+                self._local[key] = (time.monotonic() + ttl, result)
+        else:
+            try:
+                data = _dump_result(result)
+            except Exception:
+                logger.warning("Node run result can not be serialized, skip result cache", exc_info=True)
+                return
+
+            redis_client.setex(f"{self._KEY_PREFIX}:{key}", ttl, data)
+
+
+_VALUE_FIELDS = ("inputs", "process_data", "outputs")
+
+
+def _dump_result(result: NodeRunResult) -> str:
+    data = result.model_dump(mode="json", exclude=set(_VALUE_FIELDS))
+    for field in _VALUE_FIELDS:
+        data[field] = jsonable_encoder(_dump_files(getattr(result, field)))
+    return json.dumps(data)
+
+
+def _load_result(data: bytes) -> Optional[NodeRunResult]:
+    try:
+        values = json.loads(data)
+        for field in _VALUE_FIELDS:
+            values[field] = _load_files(values[field])
+        return NodeRunResult.model_validate(values)
+    except Exception:
+        logger.warning("Cached node run result can not be loaded, ignore it", exc_info=True)
+        return None
+
+
+def _dump_files(value: Any) -> Any:
+    if isinstance(value, File):
+        return {**value.model_dump(mode="json"), "storage_key": value._storage_key}
+    elif isinstance(value, Mapping):
+        return {key: _dump_files(item) for key, item in value.items()}
+    elif isinstance(value, list | tuple):
+        return [_dump_files(item) for item in value]
+    return value
+
+
+def _load_files(value: Any) -> Any:
+    if isinstance(value, dict):
+        if value.get("dify_model_identity") == FILE_MODEL_IDENTITY and "storage_key" in value:
+            return File(**value)
+        return {key: _load_files(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [_load_files(item) for item in value]
+    return value
+
+
+node_result_cache = NodeResultCache()
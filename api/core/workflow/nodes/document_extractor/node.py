@@ -8,7 +8,6 @@ from collections.abc import Mapping, Sequence
 from typing import Any, cast
 
 import docx
-import pandas as pd
 import pypandoc  # type: ignore
 import pypdfium2  # type: ignore
 import yaml  # type: ignore
@@ -349,6 +348,8 @@ def _extract_text_from_csv(file_content: bytes) -> str:
 
 def _extract_text_from_excel(file_content: bytes) -> str:
     """Extract text from an Excel file using pandas."""
+    import pandas as pd
+
     try:
         excel_file = pd.ExcelFile(io.BytesIO(file_content))
         markdown_table = ""
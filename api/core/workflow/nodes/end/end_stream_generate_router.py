@@ -109,6 +109,7 @@ class EndStreamGeneratorRouter:
                 node_id_config_mapping=node_id_config_mapping,
                 reverse_edge_mapping=reverse_edge_mapping,
                 end_dependencies=end_dependencies,
+                visited_node_ids=set(),
             )
 
         return end_dependencies
@@ -121,6 +122,7 @@ class EndStreamGeneratorRouter:
         node_id_config_mapping: dict[str, dict],
         reverse_edge_mapping: dict[str, list["GraphEdge"]],  # type: ignore[name-defined]
         end_dependencies: dict[str, list[str]],
+        visited_node_ids: set[str],
     ) -> None:
         """
         Recursive fetch end dependencies
@@ -129,13 +131,16 @@ class EndStreamGeneratorRouter:
         :param node_id_config_mapping: node id config mapping
         :param reverse_edge_mapping: reverse edge mapping
         :param end_dependencies: end dependencies
+        :param visited_node_ids: visited node ids, a node reached by multiple routes is only checked once
         :return:
         """
         reverse_edges = reverse_edge_mapping.get(current_node_id, [])
         for edge in reverse_edges:
             source_node_id = edge.source_node_id
-            if source_node_id not in node_id_config_mapping:
+            if source_node_id not in node_id_config_mapping or source_node_id in visited_node_ids:
                 continue
+
+            visited_node_ids.add(source_node_id)
             source_node_type = node_id_config_mapping[source_node_id].get("data", {}).get("type")
             if source_node_type in {
                 NodeType.IF_ELSE.value,
@@ -149,4 +154,5 @@ class EndStreamGeneratorRouter:
                     node_id_config_mapping=node_id_config_mapping,
                     reverse_edge_mapping=reverse_edge_mapping,
                     end_dependencies=end_dependencies,
+                    visited_node_ids=visited_node_ids,
                 )
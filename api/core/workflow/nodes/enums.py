@@ -39,3 +39,10 @@ class FailBranchSourceHandle(StrEnum):
 
 CONTINUE_ON_ERROR_NODE_TYPE = [NodeType.LLM, NodeType.CODE, NodeType.TOOL, NodeType.HTTP_REQUEST]
 RETRY_ON_ERROR_NODE_TYPE = CONTINUE_ON_ERROR_NODE_TYPE
+CACHEABLE_NODE_TYPE = [
+    NodeType.CODE,
+    NodeType.TEMPLATE_TRANSFORM,
+    NodeType.HTTP_REQUEST,
+    NodeType.KNOWLEDGE_RETRIEVAL,
+    NodeType.DOCUMENT_EXTRACTOR,
+]
@@ -60,6 +60,11 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
             },
         }
 
+    @property
+    def should_cache_result(self) -> bool:
+        # only idempotent requests may be served from the node result cache
+        return self.node_data.method == "get" and super().should_cache_result
+
     def _run(self) -> NodeRunResult:
         process_data = {}
         try:
@@ -1,5 +1,6 @@
 import contextvars
 import logging
+import threading
 import uuid
 from collections.abc import Generator, Mapping, Sequence
 from concurrent.futures import Future, wait
@@ -108,7 +109,7 @@ class IterationNode(BaseNode[IterationNodeData]):
         root_node_id = self.node_data.start_node_id
 
         # init graph
-        iteration_graph = Graph.init(graph_config=graph_config, root_node_id=root_node_id)
+        iteration_graph = Graph.get_or_init(graph_config=graph_config, root_node_id=root_node_id)
 
         if not iteration_graph:
             raise IterationGraphNotFoundError("iteration graph not found")
@@ -120,7 +121,7 @@ class IterationNode(BaseNode[IterationNodeData]):
         variable_pool.add([self.node_id, "item"], iterator_list_value[0])
 
         # init graph engine
-        from core.workflow.graph_engine.graph_engine import GraphEngine, GraphEngineThreadPool
+        from core.workflow.graph_engine.graph_engine import GraphEngine
 
         graph_engine = GraphEngine(
             tenant_id=self.tenant_id,
@@ -167,52 +168,79 @@ class IterationNode(BaseNode[IterationNodeData]):
             if self.node_data.is_parallel:
                 futures: list[Future] = []
                 q: Queue = Queue()
-                thread_pool = GraphEngineThreadPool(
-                    max_workers=self.node_data.parallel_nums, max_submit_count=dify_config.MAX_SUBMIT_COUNT
-                )
-                for index, item in enumerate(iterator_list_value):
-                    future: Future = thread_pool.submit(
-                        self._run_single_iter_parallel,
-                        flask_app=current_app._get_current_object(),  # type: ignore
-                        q=q,
-                        context=contextvars.copy_context(),
-                        iterator_list_value=iterator_list_value,
-                        inputs=inputs,
-                        outputs=outputs,
-                        start_at=start_at,
-                        graph_engine=graph_engine,
-                        iteration_graph=iteration_graph,
-                        index=index,
-                        item=item,
-                        iter_run_map=iter_run_map,
-                    )
-                    future.add_done_callback(thread_pool.task_done_callback)
-                    futures.append(future)
+                # iterations run in the worker pool shared by the workflow runs, at most parallel_nums at a time:
+                # the next item is submitted when an iteration finishes
+                thread_pool = graph_engine.thread_pool
+                flask_app = current_app._get_current_object()  # type: ignore
+                context = contextvars.copy_context()
+                items = iter(enumerate(iterator_list_value))
+                submit_lock = threading.RLock()
+                stopped = threading.Event()
+
+                def submit_next_item(_: Optional[Future] = None) -> None:
+                    with submit_lock:
+                        index_item = None if stopped.is_set() else next(items, None)
+                        if index_item is None:
+                            return
+                        index, item = index_item
+                        # submitted in the context of the iteration node, also from the callbacks of worker threads
+                        future: Future = context.run(
+                            thread_pool.submit,
+                            graph_engine.thread_pool_id,
+                            self._run_single_iter_parallel,
+                            flask_app=flask_app,
+                            q=q,
+                            iterator_list_value=iterator_list_value,
+                            inputs=inputs,
+                            outputs=outputs,
+                            start_at=start_at,
+                            graph_engine=graph_engine,
+                            iteration_graph=iteration_graph,
+                            index=index,
+                            item=item,
+                            iter_run_map=iter_run_map,
+                        )
+                        futures.append(future)
+                    future.add_done_callback(submit_next_item)
+
+                for _ in range(min(self.node_data.parallel_nums, len(iterator_list_value))):
+                    submit_next_item()
                 succeeded_count = 0
-                while True:
-                    try:
-                        event = q.get(timeout=1)
-                        if event is None:
-                            break
-                        if isinstance(event, IterationRunNextEvent):
-                            succeeded_count += 1
-                            if succeeded_count == len(futures):
-                                q.put(None)
-                        yield event
-                        if isinstance(event, RunCompletedEvent):
-                            q.put(None)
-                            for f in futures:
-                                if not f.done():
-                                    f.cancel()
-                            yield event
-                        if isinstance(event, IterationRunFailedEvent):
-                            q.put(None)
+                try:
+                    while True:
+                        try:
+                            # hand the worker over to the iterations while waiting for them
+                            with thread_pool.blocking():
+                                event = q.get(timeout=1)
+                            if event is None:
+                                break
+                            if isinstance(event, IterationRunNextEvent):
+                                succeeded_count += 1
+                                if succeeded_count == len(iterator_list_value):
+                                    q.put(None)
                             yield event
-                    except Empty:
-                        continue
+                            if isinstance(event, RunCompletedEvent):
+                                q.put(None)
+                                stopped.set()
+                                with submit_lock:
+                                    for f in futures:
+                                        if not f.done():
+                                            f.cancel()
+                                yield event
+                            if isinstance(event, IterationRunFailedEvent):
+                                q.put(None)
+                                stopped.set()
+                                yield event
+                        except Empty:
+                            continue
+                finally:
+                    stopped.set()
 
                 # wait all threads
-                wait(futures)
+                with submit_lock:
+                    submitted_futures = list(futures)
+                with thread_pool.blocking():
+                    wait(submitted_futures)
             else:
                 for _ in range(len(iterator_list_value)):
                     yield from self._run_single_iter(
@@ -570,7 +598,6 @@ class IterationNode(BaseNode[IterationNodeData]):
         self,
         *,
         flask_app: Flask,
-        context: contextvars.Context,
         q: Queue,
         iterator_list_value: Sequence[str],
         inputs: Mapping[str, list],
@@ -585,8 +612,6 @@ class IterationNode(BaseNode[IterationNodeData]):
         """
         run single iteration in parallel mode
         """
-        for var, val in context.items():
-            var.set(val)
         with flask_app.app_context():
             parallel_mode_run_id = uuid.uuid4().hex
             graph_engine_copy = graph_engine.create_copy()
@@ -515,6 +515,19 @@ class KnowledgeRetrievalNode(LLMNode):
                 pass
         return filters
 
+    def _get_result_cache_inputs(self) -> dict[str, Any]:
+        inputs = super()._get_result_cache_inputs()
+        # manual metadata filter values are templates resolved against the variable pool
+        if self.node_data.metadata_filtering_mode == "manual" and self.node_data.metadata_filtering_conditions:
+            inputs["metadata_filter_values"] = [
+                self.graph_runtime_state.variable_pool.convert_template(condition.value).text
+                if isinstance(condition.value, str)
+                else condition.value
+                for condition in self.node_data.metadata_filtering_conditions.conditions or []
+            ]
+
+        return inputs
+
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
         cls,
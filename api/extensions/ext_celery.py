@@ -92,6 +92,7 @@ def init_app(app: DifyApp) -> Celery:
         "schedule.update_tidb_serverless_status_task", # 更新TiDB Serverless状态任务
         "schedule.clean_messages",                  # 清理消息任务
         "schedule.mail_clean_document_notify_task", # 邮件清理文档通知任务
+        "schedule.rollup_app_statistics_task",      # 应用统计小时汇总任务
     ]
     
     # 定时任务执行间隔（天）
@@ -125,6 +126,13 @@ def init_app(app: DifyApp) -> Celery:
             "schedule": crontab(minute="0", hour="10", day_of_week="1"),  # 每周一上午10点
         },
     }
+
+    # 开启统计汇总时，每小时汇总一次已结束的小时
+    if dify_config.APP_STATISTIC_ROLLUP_ENABLED:
+        beat_schedule["rollup_app_statistics_task"] = {
+            "task": "schedule.rollup_app_statistics_task.rollup_app_statistics_task",
+            "schedule": crontab(minute="5", hour="*"),
+        }
     
     # 更新Celery配置，添加定时任务计划和导入列表
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
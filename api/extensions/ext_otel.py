@@ -4,42 +4,24 @@ import os
 import platform
 import socket
 import sys
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from celery.signals import worker_init  # type: ignore
 from flask_login import user_loaded_from_request, user_logged_in  # type: ignore
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.celery import CeleryInstrumentor
-from opentelemetry.instrumentation.flask import FlaskInstrumentor
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from opentelemetry.metrics import get_meter, get_meter_provider, set_meter_provider
-from opentelemetry.propagate import set_global_textmap
-from opentelemetry.propagators.b3 import B3Format
-from opentelemetry.propagators.composite import CompositePropagator
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import (
-    BatchSpanProcessor,
-    ConsoleSpanExporter,
-)
-from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
-from opentelemetry.semconv.resource import ResourceAttributes
-from opentelemetry.trace import Span, get_current_span, get_tracer_provider, set_tracer_provider
-from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
-from opentelemetry.trace.status import StatusCode
 
 from configs import dify_config
 from dify_app import DifyApp
 
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span
+
 
 @user_logged_in.connect
 @user_loaded_from_request.connect
 def on_user_loaded(_sender, user):
     if user:
+        from opentelemetry.trace import get_current_span
+
         current_span = get_current_span()
         if current_span:
             current_span.set_attribute("service.tenant.id", user.current_tenant_id)
@@ -48,6 +30,22 @@ def on_user_loaded(_sender, user):
 
 def init_app(app: DifyApp):
     if dify_config.ENABLE_OTEL:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.instrumentation.celery import CeleryInstrumentor
+        from opentelemetry.metrics import get_meter_provider, set_meter_provider
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+        )
+        from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+        from opentelemetry.semconv.resource import ResourceAttributes
+        from opentelemetry.trace import get_tracer_provider, set_tracer_provider
+
         setup_context_propagation()
         # Initialize OpenTelemetry
         # Follow Semantic Convertions 1.32.0 to define resource attributes
@@ -112,12 +110,16 @@ def is_celery_worker():
 
 
 def init_flask_instrumentor(app: DifyApp):
+    from opentelemetry.instrumentation.flask import FlaskInstrumentor
+    from opentelemetry.metrics import get_meter
+    from opentelemetry.trace.status import StatusCode
+
     meter = get_meter("http_metrics", version=dify_config.CURRENT_VERSION)
     _http_response_counter = meter.create_counter(
         "http.server.response.count", description="Total number of HTTP responses by status code", unit="{response}"
     )
 
-    def response_hook(span: Span, status: str, response_headers: list):
+    def response_hook(span: "Span", status: str, response_headers: list):
         if span and span.is_recording():
             if status.startswith("2"):
                 span.set_status(StatusCode.OK)
@@ -136,12 +138,19 @@ def init_flask_instrumentor(app: DifyApp):
 
 
 def init_sqlalchemy_instrumentor(app: DifyApp):
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
     with app.app_context():
         engines = list(app.extensions["sqlalchemy"].engines.values())
         SQLAlchemyInstrumentor().instrument(enable_commenter=True, engines=engines)
 
 
 def setup_context_propagation():
+    from opentelemetry.propagate import set_global_textmap
+    from opentelemetry.propagators.b3 import B3Format
+    from opentelemetry.propagators.composite import CompositePropagator
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
     # Configure propagators
     set_global_textmap(
         CompositePropagator(
@@ -155,6 +164,14 @@ def setup_context_propagation():
 
 @worker_init.connect(weak=False)
 def init_celery_worker(*args, **kwargs):
+    # instrumenting without the providers set up by init_app records nothing
+    if not dify_config.ENABLE_OTEL:
+        return
+
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    from opentelemetry.metrics import get_meter_provider
+    from opentelemetry.trace import get_tracer_provider
+
     tracer_provider = get_tracer_provider()
     metric_provider = get_meter_provider()
     if dify_config.DEBUG:
@@ -163,6 +180,8 @@ def init_celery_worker(*args, **kwargs):
 
 
 def shutdown_tracer():
+    from opentelemetry import trace
+
     provider = trace.get_tracer_provider()
     if hasattr(provider, "force_flush"):
         provider.force_flush()
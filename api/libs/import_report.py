@@ -0,0 +1,56 @@
+import logging
+import sys
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ImportReport:
+    """
+    Time spent and modules imported by each step of the startup, to find the steps importing heavy dependencies.
+    Run `python -X importtime` for the cost of every single module.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._steps: list[tuple[str, float, list[str]]] = []
+
+    @contextmanager
+    def measure(self, step: str) -> Generator[None, None, None]:
+        if not self.enabled:
+            yield
+            return
+
+        loaded_modules = set(sys.modules)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self._steps.append((step, elapsed, [name for name in sys.modules if name not in loaded_modules]))
+
+    def log(self, top_packages: int = 5) -> None:
+        """
+        Log the steps from the slowest, with their heaviest top-level packages by number of imported modules.
+        """
+        if not self.enabled:
+            return
+
+        logger.info(
+            "Startup imported %d modules in %.2f ms, %d modules loaded in total",
+            sum(len(modules) for _, _, modules in self._steps),
+            sum(elapsed for _, elapsed, _ in self._steps) * 1000,
+            len(sys.modules),
+        )
+        for step, elapsed, modules in sorted(self._steps, key=lambda step: step[1], reverse=True):
+            packages = Counter(name.partition(".")[0] for name in modules)
+            logger.info(
+                "%s: %.2f ms, %d modules, heaviest packages: %s",
+                step,
+                elapsed * 1000,
+                len(modules),
+                ", ".join(f"{package} ({count})" for package, count in packages.most_common(top_packages)) or "-",
+            )
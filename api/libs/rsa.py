@@ -1,9 +1,12 @@
 import hashlib
+import threading
 
+from cachetools import TTLCache
 from Crypto.Cipher import AES
 from Crypto.PublicKey import RSA
 from Crypto.Random import get_random_bytes
 
+from configs import dify_config
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from libs import gmpy2_pkcs10aep_cipher
@@ -19,6 +22,7 @@ def generate_key_pair(tenant_id):
     filepath = "privkeys/{tenant_id}".format(tenant_id=tenant_id) + "/private.pem"
 
     storage.save(filepath, pem_private)
+    invalidate_decrypt_decoding(tenant_id)
 
     return pem_public.decode()
 
@@ -45,10 +49,34 @@ def encrypt(text, public_key):
     return prefix_hybrid + encrypted_data
 
 
+# parsed private keys by tenant id, importing a 2048-bit key costs more than decrypting with it
+_decoding_cache: TTLCache = TTLCache(
+    maxsize=dify_config.DECRYPT_DECODING_CACHE_MAX_SIZE, ttl=dify_config.DECRYPT_DECODING_CACHE_TTL
+)
+_decoding_cache_lock = threading.Lock()
+
+# decrypted values by private key modulus and ciphertext hash
+_decrypted_cache: TTLCache = TTLCache(
+    maxsize=dify_config.DECRYPTED_VALUE_CACHE_MAX_SIZE, ttl=dify_config.DECRYPT_DECODING_CACHE_TTL
+)
+_decrypted_cache_lock = threading.Lock()
+
+
+def _get_privkey_cache_key(tenant_id):
+    filepath = "privkeys/{tenant_id}".format(tenant_id=tenant_id) + "/private.pem"
+
+    return "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+
+
 def get_decrypt_decoding(tenant_id):
+    with _decoding_cache_lock:
+        decoding = _decoding_cache.get(tenant_id)
+    if decoding is not None:
+        return decoding
+
     filepath = "privkeys/{tenant_id}".format(tenant_id=tenant_id) + "/private.pem"
 
-    cache_key = "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+    cache_key = _get_privkey_cache_key(tenant_id)
     private_key = redis_client.get(cache_key)
     if not private_key:
         try:
@@ -61,10 +89,39 @@ def get_decrypt_decoding(tenant_id):
     rsa_key = RSA.import_key(private_key)
     cipher_rsa = gmpy2_pkcs10aep_cipher.new(rsa_key)
 
+    with _decoding_cache_lock:
+        _decoding_cache[tenant_id] = (rsa_key, cipher_rsa)
+
     return rsa_key, cipher_rsa
 
 
+def invalidate_decrypt_decoding(tenant_id):
+    """
+    Drop the cached private key of a tenant, call after the key pair has changed.
+    Other processes pick up the new key once their cache entry expires.
+    """
+    with _decoding_cache_lock:
+        _decoding_cache.pop(tenant_id, None)
+
+    redis_client.delete(_get_privkey_cache_key(tenant_id))
+
+
 def decrypt_token_with_decoding(encrypted_text, rsa_key, cipher_rsa):
+    cache_key = (rsa_key.n, hashlib.sha256(encrypted_text).digest())
+    with _decrypted_cache_lock:
+        decrypted_text = _decrypted_cache.get(cache_key)
+    if decrypted_text is not None:
+        return decrypted_text
+
+    decrypted_text = _decrypt_token_with_decoding(encrypted_text, rsa_key, cipher_rsa)
+
+    with _decrypted_cache_lock:
+        _decrypted_cache[cache_key] = decrypted_text
+
+    return decrypted_text
+
+
+def _decrypt_token_with_decoding(encrypted_text, rsa_key, cipher_rsa):
     if encrypted_text.startswith(prefix_hybrid):
         encrypted_text = encrypted_text[len(prefix_hybrid) :]
 
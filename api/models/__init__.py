@@ -55,6 +55,8 @@ from .model import (
     AppAnnotationSetting,
     AppMode,
     AppModelConfig,
+    AppStatisticHourlyRollup,
+    AppStatisticRollupWatermark,
     Conversation,
     DatasetRetrieverResource,
     DifySetup,
@@ -126,6 +128,8 @@ __all__ = [
     "AppDatasetJoin",
     "AppMode",
     "AppModelConfig",
+    "AppStatisticHourlyRollup",
+    "AppStatisticRollupWatermark",
     "BuiltinToolProvider",  # Added
     "CeleryTask",
     "CeleryTaskSet",
@@ -1823,3 +1823,36 @@ class TraceAppConfig(Base):
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+class AppStatisticHourlyRollup(Base):
+    __tablename__ = "app_statistic_hourly_rollups"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="app_statistic_hourly_rollup_pkey"),
+        db.UniqueConstraint("app_id", "hour", name="unique_app_statistic_hourly_rollup"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    app_id = db.Column(StringUUID, nullable=False)
+    # start of the UTC hour the row aggregates
+    hour = db.Column(db.DateTime, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    message_tokens = db.Column(db.BigInteger, nullable=False, server_default=db.text("0"))
+    answer_tokens = db.Column(db.BigInteger, nullable=False, server_default=db.text("0"))
+    total_price = db.Column(db.Numeric(20, 7), nullable=False, server_default=db.text("0"))
+    latency_sum = db.Column(db.Float, nullable=False, server_default=db.text("0"))
+    latency_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    workflow_run_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    workflow_total_tokens = db.Column(db.BigInteger, nullable=False, server_default=db.text("0"))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+
+
+class AppStatisticRollupWatermark(Base):
+    __tablename__ = "app_statistic_rollup_watermarks"
+    __table_args__ = (db.PrimaryKeyConstraint("name", name="app_statistic_rollup_watermark_pkey"),)
+
+    name = db.Column(db.String(255), nullable=False)
+    # every UTC hour before this timestamp has been rolled up
+    rolled_up_until = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
@@ -1,9 +1,9 @@
 import datetime
 import time
+from typing import Optional
 
 import click
-from sqlalchemy import text
-from werkzeug.exceptions import NotFound
+from sqlalchemy import and_, delete, or_, select
 
 import app
 from configs import dify_config
@@ -17,26 +17,41 @@ def clean_embedding_cache_task():
     clean_days = int(dify_config.PLAN_SANDBOX_CLEAN_DAY_SETTING)
     start_at = time.perf_counter()
     thirty_days_ago = datetime.datetime.now() - datetime.timedelta(days=clean_days)
+    batch_size = dify_config.CLEAN_EMBEDDING_CACHE_BATCH_SIZE
+    # created_at and id of the last embedding of the previous batch, the scan resumes after it instead of
+    # walking again over the index entries of the deleted rows
+    cursor: Optional[tuple[datetime.datetime, str]] = None
+    deleted_count = 0
     while True:
-        try:
-            embedding_ids = (
-                db.session.query(Embedding.id)
-                .filter(Embedding.created_at < thirty_days_ago)
-                .order_by(Embedding.created_at.desc())
-                .limit(100)
-                .all()
+        query = (
+            select(Embedding.id, Embedding.created_at)
+            .where(Embedding.created_at < thirty_days_ago)
+            .order_by(Embedding.created_at.desc(), Embedding.id.desc())
+            .limit(batch_size)
+        )
+        if cursor is not None:
+            cursor_created_at, cursor_id = cursor
+            query = query.where(
+                or_(
+                    Embedding.created_at < cursor_created_at,
+                    and_(Embedding.created_at == cursor_created_at, Embedding.id < cursor_id),
+                )
             )
-            embedding_ids = [embedding_id[0] for embedding_id in embedding_ids]
-        except NotFound:
+        embeddings = db.session.execute(query).all()
+        if not embeddings:
             break
-        if embedding_ids:
-            for embedding_id in embedding_ids:
-                db.session.execute(
-                    text("DELETE FROM embeddings WHERE id = :embedding_id"), {"embedding_id": embedding_id}
-                )
+        cursor = embeddings[-1].created_at, embeddings[-1].id
 
-            db.session.commit()
-        else:
-            break
+        db.session.execute(
+            delete(Embedding).where(Embedding.id.in_([embedding.id for embedding in embeddings])),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        deleted_count += len(embeddings)
     end_at = time.perf_counter()
-    click.echo(click.style("Cleaned embedding cache from db success latency: {}".format(end_at - start_at), fg="green"))
+    click.echo(
+        click.style(
+            "Cleaned {} embedding caches from db success latency: {}".format(deleted_count, end_at - start_at),
+            fg="green",
+        )
+    )
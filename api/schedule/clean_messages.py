@@ -1,8 +1,9 @@
 import datetime
 import time
+from typing import Optional
 
 import click
-from werkzeug.exceptions import NotFound
+from sqlalchemy import and_, or_, select
 
 import app
 from configs import dify_config
@@ -20,6 +21,16 @@ from models.model import (
 from models.web import SavedMessage
 from services.feature_service import FeatureService
 
+# tables of the rows of a message, deleted before the message
+_MESSAGE_RELATED_MODELS = (
+    MessageFeedback,
+    MessageAnnotation,
+    MessageChain,
+    MessageAgentThought,
+    MessageFile,
+    SavedMessage,
+)
+
 
 @app.celery.task(queue="dataset")
 def clean_messages():
@@ -28,54 +39,73 @@ def clean_messages():
     plan_sandbox_clean_message_day = datetime.datetime.now() - datetime.timedelta(
         days=dify_config.PLAN_SANDBOX_CLEAN_MESSAGE_DAY_SETTING
     )
+    batch_size = dify_config.CLEAN_MESSAGES_BATCH_SIZE
+    tenant_plans: dict[str, str] = {}
+    # created_at and id of the last message of the previous batch
+    cursor: Optional[tuple[datetime.datetime, str]] = None
+    deleted_count = 0
     while True:
-        try:
-            # Main query with join and filter
-            # FIXME:for mypy no paginate method error
-            messages = (
-                db.session.query(Message)  # type: ignore
-                .filter(Message.created_at < plan_sandbox_clean_message_day)
-                .order_by(Message.created_at.desc())
-                .limit(100)
-                .all()
+        query = (
+            select(Message.id, Message.app_id, Message.created_at)
+            .where(Message.created_at < plan_sandbox_clean_message_day)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(batch_size)
+        )
+        if cursor is not None:
+            cursor_created_at, cursor_id = cursor
+            query = query.where(
+                or_(
+                    Message.created_at < cursor_created_at,
+                    and_(Message.created_at == cursor_created_at, Message.id < cursor_id),
+                )
             )
-
-        except NotFound:
-            break
+        messages = db.session.execute(query).all()
         if not messages:
             break
-        for message in messages:
-            plan_sandbox_clean_message_day = message.created_at
-            app = App.query.filter_by(id=message.app_id).first()
-            features_cache_key = f"features:{app.tenant_id}"
-            plan_cache = redis_client.get(features_cache_key)
-            if plan_cache is None:
-                features = FeatureService.get_features(app.tenant_id)
-                redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
-                plan = features.billing.subscription.plan
-            else:
-                plan = plan_cache.decode()
-            if plan == "sandbox":
-                # clean related message
-                db.session.query(MessageFeedback).filter(MessageFeedback.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageChain).filter(MessageChain.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAgentThought).filter(MessageAgentThought.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageFile).filter(MessageFile.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(SavedMessage).filter(SavedMessage.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(Message).filter(Message.id == message.id).delete()
-                db.session.commit()
+        cursor = messages[-1].created_at, messages[-1].id
+
+        app_tenant_ids = dict(
+            db.session.execute(
+                select(App.id, App.tenant_id).where(App.id.in_({message.app_id for message in messages}))
+            ).all()
+        )
+        _resolve_tenant_plans(set(app_tenant_ids.values()), tenant_plans)
+        message_ids = [
+            message.id
+            for message in messages
+            if message.app_id in app_tenant_ids and tenant_plans[app_tenant_ids[message.app_id]] == "sandbox"
+        ]
+        if message_ids:
+            # clean related message
+            for model in _MESSAGE_RELATED_MODELS:
+                db.session.query(model).filter(model.message_id.in_(message_ids)).delete(synchronize_session=False)
+            db.session.query(Message).filter(Message.id.in_(message_ids)).delete(synchronize_session=False)
+            deleted_count += len(message_ids)
+        db.session.commit()
     end_at = time.perf_counter()
-    click.echo(click.style("Cleaned messages from db success latency: {}".format(end_at - start_at), fg="green"))
+    click.echo(
+        click.style(
+            "Cleaned {} messages from db success latency: {}".format(deleted_count, end_at - start_at), fg="green"
+        )
+    )
+
+
+def _resolve_tenant_plans(tenant_ids: set[str], tenant_plans: dict[str, str]) -> None:
+    """
+    Add the subscription plans of the tenants not resolved yet by this run, from the features cache if present.
+
+    :param tenant_ids: ids of the tenants
+    :param tenant_plans: plans resolved by this run, by tenant id
+    """
+    unresolved_tenant_ids = [tenant_id for tenant_id in tenant_ids if tenant_id not in tenant_plans]
+    if not unresolved_tenant_ids:
+        return
+
+    plan_caches = redis_client.mget([f"features:{tenant_id}" for tenant_id in unresolved_tenant_ids])
+    for tenant_id, plan_cache in zip(unresolved_tenant_ids, plan_caches):
+        if plan_cache is None:
+            features = FeatureService.get_features(tenant_id)
+            redis_client.setex(f"features:{tenant_id}", 600, features.billing.subscription.plan)
+            tenant_plans[tenant_id] = features.billing.subscription.plan
+        else:
+            tenant_plans[tenant_id] = plan_cache.decode()
@@ -0,0 +1,17 @@
+import time
+
+import click
+
+import app
+from services.app_statistic_service import AppStatisticService
+
+
+@app.celery.task(queue="dataset")
+def rollup_app_statistics_task():
+    click.echo(click.style("Start rollup app statistics.", fg="green"))
+    start_at = time.perf_counter()
+    hours = AppStatisticService.rollup()
+    end_at = time.perf_counter()
+    click.echo(
+        click.style("Rolled up {} hours of app statistics latency: {}".format(hours, end_at - start_at), fg="green")
+    )
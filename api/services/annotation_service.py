@@ -2,7 +2,6 @@ import datetime
 import uuid
 from typing import cast
 
-import pandas as pd
 from flask_login import current_user  # type: ignore
 from sqlalchemy import or_
 from werkzeug.datastructures import FileStorage
@@ -281,6 +280,8 @@ class AppAnnotationService:
         if not app:
             raise NotFound("App not found")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
@@ -0,0 +1,327 @@
+import datetime
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import pytz
+from sqlalchemy import text
+
+from configs import dify_config
+from extensions.ext_database import db
+from models.enums import WorkflowRunTriggeredFrom
+from models.model import AppStatisticRollupWatermark
+
+MESSAGE_MEASURES = ("message_count", "message_tokens", "answer_tokens", "total_price", "latency_sum", "latency_count")
+WORKFLOW_RUN_MEASURES = ("workflow_run_count", "workflow_total_tokens")
+
+_DAY_EXPRESSION = "DATE(DATE_TRUNC('day', {column} AT TIME ZONE 'UTC' AT TIME ZONE :tz ))"
+
+_RAW_MESSAGE_QUERY = f"""SELECT
+    {_DAY_EXPRESSION.format(column="created_at")} AS date,
+    COUNT(*) AS message_count,
+    COALESCE(SUM(message_tokens), 0) AS message_tokens,
+    COALESCE(SUM(answer_tokens), 0) AS answer_tokens,
+    COALESCE(SUM(total_price), 0) AS total_price,
+    COALESCE(SUM(provider_response_latency), 0) AS latency_sum,
+    COUNT(provider_response_latency) AS latency_count
+FROM
+    messages
+WHERE
+    app_id = :app_id"""
+
+_RAW_WORKFLOW_RUN_QUERY = f"""SELECT
+    {_DAY_EXPRESSION.format(column="created_at")} AS date,
+    COUNT(id) AS workflow_run_count,
+    COALESCE(SUM(total_tokens), 0) AS workflow_total_tokens
+FROM
+    workflow_runs
+WHERE
+    app_id = :app_id
+    AND triggered_from = :triggered_from"""
+
+_ROLLUP_QUERY = f"""SELECT
+    {_DAY_EXPRESSION.format(column="hour")} AS date,
+    {{measures}}
+FROM
+    app_statistic_hourly_rollups
+WHERE
+    app_id = :app_id
+    AND hour >= :start
+    AND hour < :end
+GROUP BY date"""
+
+_ROLLUP_MESSAGES_STATEMENT = """INSERT INTO app_statistic_hourly_rollups
+    (app_id, hour, message_count, message_tokens, answer_tokens, total_price, latency_sum, latency_count)
+SELECT
+    app_id,
+    DATE_TRUNC('hour', created_at) AS hour,
+    COUNT(*),
+    COALESCE(SUM(message_tokens), 0),
+    COALESCE(SUM(answer_tokens), 0),
+    COALESCE(SUM(total_price), 0),
+    COALESCE(SUM(provider_response_latency), 0),
+    COUNT(provider_response_latency)
+FROM
+    messages
+WHERE
+    created_at >= :start
+    AND created_at < :end
+GROUP BY app_id, DATE_TRUNC('hour', created_at)
+ON CONFLICT (app_id, hour) DO UPDATE SET
+    message_count = EXCLUDED.message_count,
+    message_tokens = EXCLUDED.message_tokens,
+    answer_tokens = EXCLUDED.answer_tokens,
+    total_price = EXCLUDED.total_price,
+    latency_sum = EXCLUDED.latency_sum,
+    latency_count = EXCLUDED.latency_count,
+    updated_at = CURRENT_TIMESTAMP(0)"""
+
+_ROLLUP_WORKFLOW_RUNS_STATEMENT = """INSERT INTO app_statistic_hourly_rollups
+    (app_id, hour, workflow_run_count, workflow_total_tokens)
+SELECT
+    app_id,
+    DATE_TRUNC('hour', created_at) AS hour,
+    COUNT(id),
+    COALESCE(SUM(total_tokens), 0)
+FROM
+    workflow_runs
+WHERE
+    created_at >= :start
+    AND created_at < :end
+    AND triggered_from = :triggered_from
+GROUP BY app_id, DATE_TRUNC('hour', created_at)
+ON CONFLICT (app_id, hour) DO UPDATE SET
+    workflow_run_count = EXCLUDED.workflow_run_count,
+    workflow_total_tokens = EXCLUDED.workflow_total_tokens,
+    updated_at = CURRENT_TIMESTAMP(0)"""
+
+
+class AppStatisticService:
+    """
+    Daily app statistics served from hourly rollups, with raw scans for the parts of a range
+    that are not rolled up yet
+    """
+
+    WATERMARK_NAME = "app_hourly"
+
+    @classmethod
+    def get_daily_message_statistics(
+        cls,
+        app_id: str,
+        timezone: str,
+        start: Optional[datetime.datetime],
+        end: Optional[datetime.datetime],
+    ) -> list[dict[str, Any]]:
+        """
+        Get message measures per local day, ordered by date
+
+        :param app_id: app id
+        :param timezone: account timezone the days are bucketed in
+        :param start: inclusive UTC start, or None
+        :param end: exclusive UTC end, or None
+        :return: rows with a date and every measure in MESSAGE_MEASURES
+        """
+        return cls._get_daily_statistics(
+            app_id=app_id,
+            timezone=timezone,
+            start=start,
+            end=end,
+            raw_query=_RAW_MESSAGE_QUERY,
+            raw_args={},
+            measures=MESSAGE_MEASURES,
+        )
+
+    @classmethod
+    def get_daily_workflow_run_statistics(
+        cls,
+        app_id: str,
+        timezone: str,
+        start: Optional[datetime.datetime],
+        end: Optional[datetime.datetime],
+    ) -> list[dict[str, Any]]:
+        """
+        Get workflow run measures of app runs per local day, ordered by date
+
+        :param app_id: app id
+        :param timezone: account timezone the days are bucketed in
+        :param start: inclusive UTC start, or None
+        :param end: exclusive UTC end, or None
+        :return: rows with a date and every measure in WORKFLOW_RUN_MEASURES
+        """
+        return cls._get_daily_statistics(
+            app_id=app_id,
+            timezone=timezone,
+            start=start,
+            end=end,
+            raw_query=_RAW_WORKFLOW_RUN_QUERY,
+            raw_args={"triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value},
+            measures=WORKFLOW_RUN_MEASURES,
+        )
+
+    @classmethod
+    def rollup(cls, now: Optional[datetime.datetime] = None) -> int:
+        """
+        Roll up every settled hour after the watermark, one batch of hours per transaction
+
+        :param now: current UTC time, defaults to now
+        :return: number of hours rolled up
+        """
+        now = now or datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        until = _floor_hour(now - datetime.timedelta(minutes=dify_config.APP_STATISTIC_ROLLUP_SETTLE_MINUTES))
+        batch = datetime.timedelta(hours=dify_config.APP_STATISTIC_ROLLUP_BATCH_HOURS)
+
+        watermark = cls._get_watermark()
+        if watermark is None:
+            watermark = cls._get_earliest_hour()
+            if watermark is None:
+                return 0
+
+        hours = 0
+        while watermark < until:
+            batch_end = min(watermark + batch, until)
+            with db.engine.begin() as conn:
+                args = {"start": watermark, "end": batch_end}
+                conn.execute(text(_ROLLUP_MESSAGES_STATEMENT), args)
+                conn.execute(
+                    text(_ROLLUP_WORKFLOW_RUNS_STATEMENT),
+                    {**args, "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value},
+                )
+                conn.execute(
+                    text(
+                        """INSERT INTO app_statistic_rollup_watermarks (name, rolled_up_until)
+VALUES (:name, :rolled_up_until)
+ON CONFLICT (name) DO UPDATE SET rolled_up_until = EXCLUDED.rolled_up_until, updated_at = CURRENT_TIMESTAMP(0)"""
+                    ),
+                    {"name": cls.WATERMARK_NAME, "rolled_up_until": batch_end},
+                )
+
+            hours += int((batch_end - watermark) / datetime.timedelta(hours=1))
+            watermark = batch_end
+
+        return hours
+
+    @classmethod
+    def _get_daily_statistics(
+        cls,
+        app_id: str,
+        timezone: str,
+        start: Optional[datetime.datetime],
+        end: Optional[datetime.datetime],
+        raw_query: str,
+        raw_args: dict[str, Any],
+        measures: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        start, end = _to_naive_utc(start), _to_naive_utc(end)
+        segments: list[tuple[bool, Optional[datetime.datetime], Optional[datetime.datetime]]] = [(False, start, end)]
+        if dify_config.APP_STATISTIC_ROLLUP_ENABLED and _is_hour_aligned(timezone, start, end):
+            watermark = cls._get_watermark()
+            if watermark is not None:
+                segments = _split_range(start, end, watermark)
+
+        days: dict[str, dict[str, Any]] = {}
+        with db.engine.begin() as conn:
+            for rolled_up, segment_start, segment_end in segments:
+                args: dict[str, Any] = {"tz": timezone, "app_id": app_id}
+                if rolled_up:
+                    query = _ROLLUP_QUERY.format(
+                        measures=",\n    ".join(f"SUM({measure}) AS {measure}" for measure in measures)
+                    )
+                    args.update(start=segment_start, end=segment_end)
+                else:
+                    query = raw_query
+                    args.update(raw_args)
+                    if segment_start:
+                        query += " AND created_at >= :start"
+                        args["start"] = segment_start
+                    if segment_end:
+                        query += " AND created_at < :end"
+                        args["end"] = segment_end
+                    query += " GROUP BY date"
+
+                for row in conn.execute(text(query), args):
+                    day = days.setdefault(str(row.date), dict.fromkeys(measures, 0))
+                    for measure in measures:
+                        day[measure] += getattr(row, measure) or 0
+
+        # rollup rows are shared by messages and workflow runs, so skip days without the counted entity
+        return [{"date": date, **day} for date, day in sorted(days.items()) if day[measures[0]] > 0]
+
+    @classmethod
+    def _get_watermark(cls) -> Optional[datetime.datetime]:
+        watermark = db.session.get(AppStatisticRollupWatermark, cls.WATERMARK_NAME)
+        return watermark.rolled_up_until if watermark else None
+
+    @staticmethod
+    def _get_earliest_hour() -> Optional[datetime.datetime]:
+        with db.engine.begin() as conn:
+            earliest = conn.execute(
+                text(
+                    """SELECT LEAST(
+    (SELECT MIN(created_at) FROM messages),
+    (SELECT MIN(created_at) FROM workflow_runs)
+)"""
+                )
+            ).scalar()
+
+        return _floor_hour(earliest) if earliest else None
+
+
+def _floor_hour(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _is_hour_aligned(timezone: str, start: Optional[datetime.datetime], end: Optional[datetime.datetime]) -> bool:
+    """
+    Hourly UTC buckets only fall into a single local day if every offset the timezone uses
+    in [start, end) is a whole number of hours
+
+    :param timezone: timezone
+    :param start: naive UTC start, or None
+    :param end: naive UTC end, or None
+    """
+    tz = pytz.timezone(timezone)
+    # no statistics predate the Unix epoch or lie in the future
+    start = start or datetime.datetime(1970, 1, 1)
+    end = end or datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+    offsets = [pytz.utc.localize(start).astimezone(tz).utcoffset()]
+    transitions = zip(getattr(tz, "_utc_transition_times", []), getattr(tz, "_transition_info", []))
+    offsets.extend(utcoffset for transition_at, (utcoffset, _, _) in transitions if start < transition_at < end)
+
+    return all(offset is not None and offset.total_seconds() % 3600 == 0 for offset in offsets)
+
+
+def _split_range(
+    start: Optional[datetime.datetime],
+    end: Optional[datetime.datetime],
+    watermark: datetime.datetime,
+) -> list[tuple[bool, Optional[datetime.datetime], Optional[datetime.datetime]]]:
+    """
+    Split [start, end) into a raw head before the first full hour, the rolled up hours and a raw tail
+
+    :return: (rolled_up, start, end) segments, a None bound means unbounded
+    """
+    rollup_start = start
+    if start and start != _floor_hour(start):
+        rollup_start = _floor_hour(start) + datetime.timedelta(hours=1)
+
+    rollup_end = min(_floor_hour(end), watermark) if end else watermark
+    if rollup_start and rollup_start >= rollup_end:
+        return [(False, start, end)]
+
+    segments: list[tuple[bool, Optional[datetime.datetime], Optional[datetime.datetime]]] = []
+    if start and rollup_start != start:
+        segments.append((False, start, rollup_start))
+
+    # the rollup table has no rows before the first rolled up hour, so an open start is safe
+    segments.append((True, rollup_start or datetime.datetime.min, rollup_end))
+    if end is None or rollup_end < end:
+        segments.append((False, rollup_end, end))
+
+    return segments
+
+
+def _to_naive_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+
+    return value.astimezone(pytz.utc).replace(tzinfo=None)
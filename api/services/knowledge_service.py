@@ -1,5 +1,3 @@
-import boto3  # type: ignore
-
 from configs import dify_config
 
 
@@ -7,6 +5,8 @@ class ExternalDatasetTestService:
     # this service is only for internal testing
     @staticmethod
     def knowledge_retrieval(retrieval_setting: dict, query: str, knowledge_id: str):
+        import boto3  # type: ignore
+
         # get bedrock client
         client = boto3.client(
             "bedrock-agent-runtime",
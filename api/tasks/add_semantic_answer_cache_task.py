@@ -0,0 +1,40 @@
+import logging
+import time
+
+import click
+from celery import shared_task  # type: ignore
+
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
+from extensions.ext_database import db
+
+
+@shared_task(queue="dataset")
+def add_semantic_answer_cache_task(app_id: str, tenant_id: str, config_hash: str, query: str, answer: str):
+    """
+    Add answer of a chat query to the semantic answer cache.
+    :param app_id: app id
+    :param tenant_id: tenant id
+    :param config_hash: hash of the app config and inputs the answer was generated with
+    :param query: query
+    :param answer: answer
+
+    Usage: add_semantic_answer_cache_task.delay(app_id, tenant_id, config_hash, query, answer)
+    """
+    start_at = time.perf_counter()
+
+    try:
+        SemanticAnswerCacheFeature().add(
+            app_id=app_id, tenant_id=tenant_id, config_hash=config_hash, query=query, answer=answer
+        )
+
+        end_at = time.perf_counter()
+        logging.info(
+            click.style(
+                "Add semantic answer cache successful for app: {} latency: {}".format(app_id, end_at - start_at),
+                fg="green",
+            )
+        )
+    except Exception:
+        logging.exception("Add semantic answer cache failed")
+    finally:
+        db.session.close()
@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
 from core.rag.datasource.vdb.vector_factory import Vector
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -52,6 +53,12 @@ def disable_annotation_reply_task(job_id: str, app_id: str, tenant_id: str):
                 vector.delete()
         except Exception:
             logging.exception("Delete annotation index failed when annotation deleted.")
+
+        # cached answers are looked up with the embedding model of the annotation setting
+        try:
+            SemanticAnswerCacheFeature().clear(app_id, tenant_id, app_annotation_setting.collection_binding_id)
+        except Exception:
+            logging.exception("Delete semantic answer cache failed when annotation reply disabled.")
         redis_client.setex(disable_app_annotation_job_key, 600, "completed")
 
         # delete annotation setting
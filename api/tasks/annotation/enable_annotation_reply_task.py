@@ -5,6 +5,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -51,6 +52,12 @@ def enable_annotation_reply_task(
         )
         if annotation_setting:
             if dataset_collection_binding.id != annotation_setting.collection_binding_id:
+                # cached answers live in the collection of the previous embedding model
+                try:
+                    SemanticAnswerCacheFeature().clear(app_id, tenant_id, annotation_setting.collection_binding_id)
+                except Exception:
+                    logging.exception("Delete semantic answer cache failed when annotation embedding model changed.")
+
                 old_dataset_collection_binding = (
                     DatasetCollectionBindingService.get_dataset_collection_binding_by_id_and_type(
                         annotation_setting.collection_binding_id, "annotation"
@@ -71,38 +71,46 @@ def document_indexing_sync_task(dataset_id: str, document_id: str):
             document.processing_started_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
             db.session.commit()
 
-            # delete all document segment and index
-            try:
-                dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
-                if not dataset:
-                    raise Exception("Dataset not found")
-                index_type = document.doc_form
-                index_processor = IndexProcessorFactory(index_type).init_index_processor()
-
-                segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
-                index_node_ids = [segment.index_node_id for segment in segments]
-
-                # delete from vector index
-                index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
-
-                for segment in segments:
-                    db.session.delete(segment)
-
-                end_at = time.perf_counter()
-                logging.info(
-                    click.style(
-                        "Cleaned document when document update data source or process rule: {} latency: {}".format(
-                            document_id, end_at - start_at
-                        ),
-                        fg="green",
+            # the segments of the unchanged chunks are kept when re-indexing incrementally
+            incremental = IndexingRunner.can_reindex_incrementally(document)
+            if not incremental:
+                # delete all document segment and index
+                try:
+                    dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
+                    if not dataset:
+                        raise Exception("Dataset not found")
+                    index_type = document.doc_form
+                    index_processor = IndexProcessorFactory(index_type).init_index_processor()
+
+                    segments = (
+                        db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
                     )
-                )
-            except Exception:
-                logging.exception("Cleaned document when document update data source or process rule failed")
+                    index_node_ids = [segment.index_node_id for segment in segments]
+
+                    # delete from vector index
+                    index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
+
+                    for segment in segments:
+                        db.session.delete(segment)
+
+                    end_at = time.perf_counter()
+                    logging.info(
+                        click.style(
+                            "Cleaned document when document update data source or process rule: {} latency: {}".format(
+                                document_id, end_at - start_at
+                            ),
+                            fg="green",
+                        )
+                    )
+                except Exception:
+                    logging.exception("Cleaned document when document update data source or process rule failed")
 
             try:
                 indexing_runner = IndexingRunner()
-                indexing_runner.run([document])
+                if incremental:
+                    indexing_runner.run_incremental(document)
+                else:
+                    indexing_runner.run([document])
                 end_at = time.perf_counter()
                 logging.info(
                     click.style("update document: {} latency: {}".format(document.id, end_at - start_at), fg="green")
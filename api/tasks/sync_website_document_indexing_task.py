@@ -58,18 +58,21 @@ def sync_website_document_indexing_task(dataset_id: str, document_id: str):
         logging.info(click.style("Document not found: {}".format(document_id), fg="yellow"))
         return
     try:
-        # clean old data
-        index_processor = IndexProcessorFactory(document.doc_form).init_index_processor()
+        # the segments of the unchanged chunks are kept when re-indexing incrementally
+        incremental = IndexingRunner.can_reindex_incrementally(document)
+        if not incremental:
+            # clean old data
+            index_processor = IndexProcessorFactory(document.doc_form).init_index_processor()
 
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
-        if segments:
-            index_node_ids = [segment.index_node_id for segment in segments]
-            # delete from vector index
-            index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
+            segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
+            if segments:
+                index_node_ids = [segment.index_node_id for segment in segments]
+                # delete from vector index
+                index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
 
-        for segment in segments:
-            db.session.delete(segment)
-        db.session.commit()
+            for segment in segments:
+                db.session.delete(segment)
+            db.session.commit()
 
         document.indexing_status = "parsing"
         document.processing_started_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
@@ -77,7 +80,10 @@ def sync_website_document_indexing_task(dataset_id: str, document_id: str):
         db.session.commit()
 
         indexing_runner = IndexingRunner()
-        indexing_runner.run([document])
+        if incremental:
+            indexing_runner.run_incremental(document)
+        else:
+            indexing_runner.run([document])
         redis_client.delete(sync_indexing_cache_key)
     except Exception as ex:
         document.indexing_status = "error"
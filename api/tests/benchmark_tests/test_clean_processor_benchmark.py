@@ -0,0 +1,36 @@
+import pytest
+
+from core.rag.cleaner.clean_processor import CleanProcessor
+
+CHUNKS = 5000
+PROCESS_RULE = {
+    "rules": {
+        "pre_processing_rules": [
+            {"id": "remove_extra_spaces", "enabled": True},
+            {"id": "remove_urls_emails", "enabled": True},
+        ]
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return [
+        f"Chunk {i}  of the  document,\n\n\n\nwritten by user{i}@example.com. "
+        f"See https://example.com/{i} and ![figure](https://example.com/{i}.png). " * 5
+        for i in range(CHUNKS)
+    ]
+
+
+@pytest.mark.benchmark(group="clean-processor")
+def test_clean(benchmark, chunks):
+    """
+    Clean the chunks of a document one by one, with all pre-processing rules enabled
+    """
+
+    def clean():
+        return [CleanProcessor.clean(chunk, PROCESS_RULE) for chunk in chunks]
+
+    cleaned = benchmark(clean)
+
+    assert "example.com/0.png" in cleaned[0]
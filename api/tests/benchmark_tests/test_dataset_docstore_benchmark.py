@@ -0,0 +1,62 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.docstore.dataset_docstore import DatasetDocumentStore
+from core.rag.models.document import ChildDocument, Document
+
+CHUNKS = 5000
+CHILDREN_PER_CHUNK = 3
+# round trip of one statement to the database
+QUERY_LATENCY = 0.0005
+
+
+def _round_trip(result=None):
+    def execute(*args, **kwargs):
+        time.sleep(QUERY_LATENCY)
+        return result
+
+    return execute
+
+
+@pytest.fixture
+def doc_store(mocker):
+    session = mocker.patch("core.rag.docstore.dataset_docstore.db").session
+    query = session.query.return_value.filter.return_value
+    query.scalar.side_effect = _round_trip()
+    query.first.side_effect = _round_trip()
+    query.delete.side_effect = _round_trip()
+    session.execute.side_effect = _round_trip(MagicMock(all=MagicMock(return_value=[])))
+    session.flush.side_effect = _round_trip()
+    session.commit.side_effect = _round_trip()
+
+    dataset = MagicMock(id="dataset", tenant_id="tenant", indexing_technique="economy")
+    return DatasetDocumentStore(dataset=dataset, user_id="user", document_id="document")
+
+
+def _documents(children: int) -> list[Document]:
+    return [
+        Document(
+            page_content=f"chunk {i} " * 50,
+            metadata={"doc_id": f"chunk-{i}", "doc_hash": f"hash-{i}"},
+            children=[
+                ChildDocument(page_content=f"child {i}-{j}", metadata={"doc_id": f"child-{i}-{j}", "doc_hash": "hash"})
+                for j in range(children)
+            ],
+        )
+        for i in range(CHUNKS)
+    ]
+
+
+@pytest.mark.benchmark(group="docstore-add-documents")
+@pytest.mark.parametrize("children", [0, CHILDREN_PER_CHUNK], ids=["paragraph", "parent-child"])
+def test_add_documents(benchmark, doc_store, children):
+    """
+    Segments of a document written with the bulk statements, rows per second in extra_info
+    """
+    documents = _documents(children)
+
+    benchmark.pedantic(doc_store.add_documents, args=(documents,), kwargs={"save_child": True}, rounds=5)
+
+    benchmark.extra_info["rows_per_sec"] = round(CHUNKS * (1 + children) / benchmark.stats.stats.mean)
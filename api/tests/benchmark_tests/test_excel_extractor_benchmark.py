@@ -0,0 +1,37 @@
+import tracemalloc
+
+import openpyxl
+import pytest
+
+from core.rag.extractor.excel_extractor import ExcelExtractor
+
+ROWS = 20_000
+COLUMNS = 8
+
+
+@pytest.fixture(scope="module")
+def xlsx_file(tmp_path_factory):
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    sheet.append([f"column {i}" for i in range(COLUMNS)])
+    for row in range(ROWS):
+        sheet.append([f"value {row}-{i}" if i % 2 else row * i for i in range(COLUMNS)])
+    path = tmp_path_factory.mktemp("excel") / "file.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.benchmark(group="excel-extractor")
+def test_extract_xlsx(benchmark, xlsx_file):
+    """
+    Extract the rows of a large sheet, peak memory of an extraction in extra_info
+    """
+    documents = benchmark.pedantic(ExcelExtractor(xlsx_file).extract, rounds=3)
+
+    tracemalloc.start()
+    ExcelExtractor(xlsx_file).extract()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(documents) == ROWS
+    benchmark.extra_info["peak_memory_mb"] = round(peak / 1024 / 1024, 1)
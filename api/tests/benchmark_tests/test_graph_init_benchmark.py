@@ -0,0 +1,108 @@
+import pytest
+
+from core.workflow.graph_engine.entities.graph import Graph
+
+BRANCHES = 4
+
+
+def _graph_config(node_count: int) -> dict:
+    """
+    start -> 4 parallel branches of code nodes -> end
+    """
+    nodes = [{"id": "start", "data": {"type": "start", "title": "start"}}]
+    edges = []
+    branch_length, longer_branches = divmod(node_count - 2, BRANCHES)
+    for branch in range(BRANCHES):
+        source = "start"
+        for step in range(branch_length + (1 if branch < longer_branches else 0)):
+            node_id = f"code-{branch}-{step}"
+            nodes.append({"id": node_id, "data": {"type": "code", "title": node_id}})
+            edges.append({"id": f"{source}-{node_id}", "source": source, "target": node_id})
+            source = node_id
+        edges.append({"id": f"{source}-end", "source": source, "target": "end"})
+
+    nodes.append({"id": "end", "data": {"type": "end", "title": "end", "outputs": []}})
+    return {"nodes": nodes, "edges": edges}
+
+
+@pytest.mark.parametrize("node_count", [50, 200, 500])
+@pytest.mark.benchmark(group="graph-init")
+def test_graph_init(benchmark, node_count):
+    graph_config = _graph_config(node_count)
+    graph = benchmark(Graph.init, graph_config=graph_config)
+    assert len(graph.node_ids) == node_count
+
+
+@pytest.mark.parametrize("node_count", [50, 200, 500])
+@pytest.mark.benchmark(group="graph-init")
+def test_graph_get_or_init_cached(benchmark, node_count):
+    graph_config = _graph_config(node_count)
+    Graph.get_or_init(graph_config=graph_config)
+    graph = benchmark(Graph.get_or_init, graph_config=graph_config)
+    assert len(graph.node_ids) == node_count
+
+
+def _sequential_parallels_graph_config(node_count: int) -> dict:
+    """
+    start -> (3 parallel branches of 4 code nodes -> join) * n -> end
+    """
+    nodes = [{"id": "start", "data": {"type": "start", "title": "start"}}]
+    edges = []
+    previous = "start"
+    stage = 0
+    while len(nodes) + 3 * 4 + 2 <= node_count:
+        join = f"join-{stage}"
+        for branch in range(3):
+            source = previous
+            for step in range(4):
+                node_id = f"code-{stage}-{branch}-{step}"
+                nodes.append({"id": node_id, "data": {"type": "code", "title": node_id}})
+                edges.append({"id": f"{source}-{node_id}", "source": source, "target": node_id})
+                source = node_id
+            edges.append({"id": f"{source}-{join}", "source": source, "target": join})
+
+        nodes.append({"id": join, "data": {"type": "code", "title": join}})
+        previous = join
+        stage += 1
+
+    while len(nodes) < node_count - 1:
+        node_id = f"code-{len(nodes)}"
+        nodes.append({"id": node_id, "data": {"type": "code", "title": node_id}})
+        edges.append({"id": f"{previous}-{node_id}", "source": previous, "target": node_id})
+        previous = node_id
+
+    nodes.append({"id": "end", "data": {"type": "end", "title": "end", "outputs": []}})
+    edges.append({"id": f"{previous}-end", "source": previous, "target": "end"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def _wide_parallel_graph_config(node_count: int) -> dict:
+    """
+    start -> (node_count - 2) parallel code nodes -> end
+    """
+    nodes = [{"id": "start", "data": {"type": "start", "title": "start"}}]
+    edges = []
+    for index in range(node_count - 2):
+        node_id = f"code-{index}"
+        nodes.append({"id": node_id, "data": {"type": "code", "title": node_id}})
+        edges.append({"id": f"start-{node_id}", "source": "start", "target": node_id})
+        edges.append({"id": f"{node_id}-end", "source": node_id, "target": "end"})
+
+    nodes.append({"id": "end", "data": {"type": "end", "title": "end", "outputs": []}})
+    return {"nodes": nodes, "edges": edges}
+
+
+@pytest.mark.parametrize("node_count", [50, 200, 500])
+@pytest.mark.benchmark(group="graph-init-sequential-parallels")
+def test_graph_init_sequential_parallels(benchmark, node_count):
+    graph_config = _sequential_parallels_graph_config(node_count)
+    graph = benchmark(Graph.init, graph_config=graph_config)
+    assert len(graph.node_ids) == node_count
+
+
+@pytest.mark.parametrize("node_count", [50, 200, 500])
+@pytest.mark.benchmark(group="graph-init-wide-parallel")
+def test_graph_init_wide_parallel(benchmark, node_count):
+    graph_config = _wide_parallel_graph_config(node_count)
+    graph = benchmark(Graph.init, graph_config=graph_config)
+    assert len(graph.node_ids) == node_count
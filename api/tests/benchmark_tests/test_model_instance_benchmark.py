@@ -0,0 +1,122 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.helper.model_provider_cache import ProviderConfigurationsCache
+from core.model_manager import ModelManager
+from core.model_runtime.entities.common_entities import I18nObject
+from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, ModelType
+from core.model_runtime.entities.provider_entities import ConfigurateMethod, ProviderEntity
+from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+from core.provider_manager import ProviderManager
+from models.provider import Provider, ProviderType
+
+PROVIDERS = 10
+MODELS_PER_PROVIDER = 20
+# round trip of one of the queries get_configurations runs
+QUERY_LATENCY = 0.001
+
+
+def _plugin_model_provider(name: str) -> PluginModelProviderEntity:
+    return PluginModelProviderEntity(
+        id=uuid.uuid4().hex,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        provider=name,
+        tenant_id="tenant",
+        plugin_unique_identifier=f"langgenius/{name}:0.0.1",
+        plugin_id=f"langgenius/{name}",
+        declaration=ProviderEntity(
+            provider=name,
+            label=I18nObject(en_US=name),
+            supported_model_types=[ModelType.LLM],
+            configurate_methods=[ConfigurateMethod.PREDEFINED_MODEL],
+            models=[
+                AIModelEntity(
+                    model=f"{name}-model-{i}",
+                    label=I18nObject(en_US=f"{name}-model-{i}"),
+                    model_type=ModelType.LLM,
+                    fetch_from=FetchFrom.PREDEFINED_MODEL,
+                    model_properties={},
+                )
+                for i in range(MODELS_PER_PROVIDER)
+            ],
+        ),
+    )
+
+
+def _query(result):
+    def query(*args, **kwargs):
+        time.sleep(QUERY_LATENCY)
+        return result() if callable(result) else result
+
+    return query
+
+
+@pytest.fixture
+def model_manager(mocker):
+    names = [f"provider{i}" for i in range(PROVIDERS)]
+    mocker.patch(
+        "core.plugin.manager.model.PluginModelManager.fetch_model_providers",
+        return_value=[_plugin_model_provider(name) for name in names],
+    )
+    provider_records = {
+        f"langgenius/{name}/{name}": [
+            Provider(
+                id=uuid.uuid4().hex,
+                tenant_id="tenant",
+                provider_name=f"langgenius/{name}/{name}",
+                provider_type=ProviderType.CUSTOM.value,
+                encrypted_config=json.dumps({"api_key": "encrypted"}),
+                is_valid=True,
+            )
+        ]
+        for name in names
+    }
+    mocker.patch.object(ProviderManager, "_get_all_providers", _query(lambda: dict(provider_records)))
+    mocker.patch.object(ProviderManager, "_init_trial_provider_records", lambda self, tenant_id, records: records)
+    mocker.patch.object(ProviderManager, "_get_all_provider_models", _query(dict))
+    mocker.patch.object(ProviderManager, "_get_all_preferred_model_providers", _query(dict))
+    mocker.patch.object(ProviderManager, "_get_all_provider_model_settings", _query(dict))
+    mocker.patch.object(ProviderManager, "_get_all_provider_load_balancing_configs", _query(dict))
+    mocker.patch("core.provider_manager.ProviderCredentialsCache.get", return_value={"api_key": "secret"})
+
+    redis = mocker.patch("core.helper.model_provider_cache.redis_client", new=MagicMock())
+    redis.get.side_effect = _query(None)
+    ProviderConfigurationsCache._local_cache.clear()
+    yield ModelManager()
+    ProviderConfigurationsCache._local_cache.clear()
+
+
+def _get_model_instance(model_manager: ModelManager):
+    return model_manager.get_model_instance(
+        tenant_id="tenant",
+        provider="langgenius/provider0/provider0",
+        model_type=ModelType.LLM,
+        model="provider0-model-0",
+    )
+
+
+@pytest.mark.benchmark(group="get-model-instance")
+def test_get_model_instance_uncached(benchmark, model_manager, mocker):
+    """
+    Provider configurations built from the workspace records on every call, as before the cache
+    """
+    mocker.patch.object(dify_config, "PROVIDER_CONFIGURATIONS_CACHE_TTL", 0)
+
+    assert benchmark(_get_model_instance, model_manager).credentials == {"api_key": "secret"}
+
+
+@pytest.mark.benchmark(group="get-model-instance")
+def test_get_model_instance_cached(benchmark, model_manager):
+    """
+    Provider configurations served from the process cache after checking the tenant version
+    """
+    _get_model_instance(model_manager)
+
+    assert benchmark(_get_model_instance, model_manager).credentials == {"api_key": "secret"}
@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from libs import rsa
+
+SECRETS = 20
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return RSA.generate(2048)
+
+
+@pytest.fixture
+def encrypted_secrets(mocker, private_key):
+    mocker.patch("libs.rsa.storage").load.return_value = private_key.export_key()
+    mocker.patch("libs.rsa.redis_client", new=MagicMock()).get.return_value = None
+    public_key = private_key.publickey().export_key()
+    return [rsa.encrypt(f"secret-{i}", public_key) for i in range(SECRETS)]
+
+
+def _decrypt_all(encrypted_secrets):
+    return [rsa.decrypt(encrypted_text, "tenant") for encrypted_text in encrypted_secrets]
+
+
+@pytest.mark.benchmark(group="rsa-decrypt")
+def test_decrypt_uncached(benchmark, encrypted_secrets):
+    """
+    Every decrypt parses the private key and runs RSA-OAEP, as before the caches
+    """
+
+    def decrypt_all():
+        decrypted = []
+        for encrypted_text in encrypted_secrets:
+            rsa.invalidate_decrypt_decoding("tenant")
+            rsa._decrypted_cache.clear()
+            decrypted.append(rsa.decrypt(encrypted_text, "tenant"))
+        return decrypted
+
+    assert benchmark(decrypt_all)[0] == "secret-0"
+
+
+@pytest.mark.benchmark(group="rsa-decrypt")
+def test_decrypt_cached_key(benchmark, encrypted_secrets):
+    """
+    Parsed private key cached, values decrypted with RSA-OAEP
+    """
+
+    def decrypt_all():
+        rsa._decrypted_cache.clear()
+        return _decrypt_all(encrypted_secrets)
+
+    assert benchmark(decrypt_all)[0] == "secret-0"
+
+
+@pytest.mark.benchmark(group="rsa-decrypt")
+def test_decrypt_cached_values(benchmark, encrypted_secrets):
+    _decrypt_all(encrypted_secrets)
+    assert benchmark(_decrypt_all, encrypted_secrets)[0] == "secret-0"
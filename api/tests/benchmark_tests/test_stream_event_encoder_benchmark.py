@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from core.app.apps.stream_event_encoder import MessageChunkEncoder
+from core.app.entities.task_entities import MessageStreamResponse
+
+CHUNKS = 10000
+
+
+def _envelope() -> dict:
+    return {"event": "message", "conversation_id": "c1", "message_id": "m1", "created_at": 1700000000}
+
+
+@pytest.fixture
+def messages() -> list[MessageStreamResponse]:
+    return [MessageStreamResponse(task_id="t1", id="m1", answer=f"token{i} ") for i in range(CHUNKS)]
+
+
+def _model_dump_frames(messages: list[MessageStreamResponse]) -> int:
+    for message in messages:
+        response_chunk = _envelope()
+        response_chunk.update(message.to_dict())
+        f"data: {json.dumps(response_chunk)}\n\n"
+    return len(messages)
+
+
+def _encoder_frames(messages: list[MessageStreamResponse]) -> int:
+    encoder = MessageChunkEncoder()
+    for message in messages:
+        encoder.chunk(_envelope(), message).to_event_stream()
+    return len(messages)
+
+
+@pytest.mark.benchmark(group="sse-message-chunks")
+def test_model_dump_chunks_per_second(benchmark, messages):
+    assert benchmark(_model_dump_frames, messages) == CHUNKS
+
+
+@pytest.mark.benchmark(group="sse-message-chunks")
+def test_encoder_chunks_per_second(benchmark, messages):
+    assert benchmark(_encoder_frames, messages) == CHUNKS
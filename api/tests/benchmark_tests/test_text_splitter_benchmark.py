@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from configs import dify_config
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+
+WORDS = 200_000
+
+
+@pytest.fixture(scope="module")
+def text():
+    rng = random.Random(0)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+    sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 30))) for _ in range(WORDS // 15)]
+    return ". ".join(sentences)
+
+
+@pytest.mark.benchmark(group="text-splitter")
+@pytest.mark.parametrize(
+    ("chunk_size", "chunk_overlap"), [(500, 50), (4000, 2000)], ids=["default-chunks", "large-overlap"]
+)
+def test_split_text(benchmark, mocker, text, chunk_size, chunk_overlap):
+    """
+    Split a large text into chunks, most splits are merged into chunks with a window of overlap
+    """
+    # measure the merging of the splits, not the tokenizer
+    mocker.patch.object(dify_config, "INDEXING_SEGMENTATION_LENGTH_IN_TOKENS", False)
+    splitter = FixedRecursiveCharacterTextSplitter.from_encoder(
+        embedding_model_instance=None,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        fixed_separator="\n\n",
+        separators=["\n\n", "。", ". ", " ", ""],
+    )
+
+    chunks = benchmark(splitter.split_text, text)
+
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
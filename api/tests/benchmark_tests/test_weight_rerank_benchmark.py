@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from core.rag.models.document import Document
+from core.rag.rerank import weight_rerank
+from core.rag.rerank.entity.weight import KeywordSetting, VectorSetting, Weights
+from core.rag.rerank.weight_rerank import WeightRerankRunner
+
+DOCUMENTS = 200
+DIMENSIONS = 1024
+WORDS = 150
+
+
+@pytest.fixture(scope="module")
+def documents():
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return [
+        Document(
+            page_content=" ".join(rng.choice(vocabulary) for _ in range(WORDS)),
+            metadata={"doc_id": str(i)},
+            vector=[rng.random() for _ in range(DIMENSIONS)],
+        )
+        for i in range(DOCUMENTS)
+    ]
+
+
+@pytest.fixture
+def runner(mocker):
+    mocker.patch.object(weight_rerank, "ModelManager")
+    cache_embedding = mocker.patch.object(weight_rerank, "CacheEmbedding")
+    cache_embedding.return_value.embed_query.return_value = [0.5] * DIMENSIONS
+    weights = Weights(
+        vector_setting=VectorSetting(vector_weight=0.7, embedding_provider_name="openai", embedding_model_name="m"),
+        keyword_setting=KeywordSetting(keyword_weight=0.3),
+    )
+    return WeightRerankRunner("tenant", weights)
+
+
+@pytest.mark.benchmark(group="weight-rerank")
+@pytest.mark.parametrize("cached_keywords", [False, True], ids=["cold", "warm"])
+def test_rerank(benchmark, runner, documents, cached_keywords):
+    """
+    Rerank the candidates of a hybrid search, with the keywords of the texts extracted or already cached
+    """
+    query = " ".join(f"term{i}" for i in range(0, 100, 10))
+    runner.run(query, documents)
+
+    def setup():
+        if not cached_keywords:
+            weight_rerank._extract_keywords.cache_clear()
+
+    benchmark.pedantic(runner.run, args=(query, documents), setup=setup, rounds=10)
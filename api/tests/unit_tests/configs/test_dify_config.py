@@ -52,6 +52,8 @@ def test_dify_config(example_env_file):
     assert config.EDITION == "SELF_HOSTED"
     assert config.API_COMPRESSION_ENABLED is False
     assert config.SENTRY_TRACES_SAMPLE_RATE == 1.0
+    # switching it changes the chunk boundaries of the indexed documents
+    assert config.INDEXING_SEGMENTATION_LENGTH_IN_TOKENS is False
 
     # annotated field with default value
     assert config.HTTP_REQUEST_MAX_READ_TIMEOUT == 60
@@ -0,0 +1,42 @@
+import inspect
+
+import pytest
+
+from controllers.console.datasets.datasets import DatasetRetrievalSettingApi, DatasetRetrievalSettingMockApi
+from core.rag.datasource.vdb.vector_type import VectorType
+from core.rag.retrieval.retrieval_methods import RetrievalMethod
+
+ALL_RETRIEVAL_METHODS = [
+    RetrievalMethod.SEMANTIC_SEARCH.value,
+    RetrievalMethod.FULL_TEXT_SEARCH.value,
+    RetrievalMethod.HYBRID_SEARCH.value,
+]
+
+
+@pytest.mark.parametrize(
+    ("vector_type", "expected"),
+    [
+        (VectorType.EMBEDDED, [RetrievalMethod.SEMANTIC_SEARCH.value]),
+        (VectorType.CHROMA, [RetrievalMethod.SEMANTIC_SEARCH.value]),
+        (VectorType.QDRANT, ALL_RETRIEVAL_METHODS),
+    ],
+)
+def test_retrieval_setting(mocker, vector_type, expected):
+    mocker.patch("controllers.console.datasets.datasets.dify_config.VECTOR_STORE", vector_type)
+    get = inspect.unwrap(DatasetRetrievalSettingApi.get)
+
+    assert get(DatasetRetrievalSettingApi()) == {"retrieval_method": expected}
+
+
+@pytest.mark.parametrize(
+    ("vector_type", "expected"),
+    [
+        (VectorType.EMBEDDED, [RetrievalMethod.SEMANTIC_SEARCH.value]),
+        (VectorType.MILVUS, [RetrievalMethod.SEMANTIC_SEARCH.value]),
+        (VectorType.PGVECTOR, ALL_RETRIEVAL_METHODS),
+    ],
+)
+def test_retrieval_setting_mock(vector_type, expected):
+    get = inspect.unwrap(DatasetRetrievalSettingMockApi.get)
+
+    assert get(DatasetRetrievalSettingMockApi(), vector_type.value) == {"retrieval_method": expected}
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from configs import dify_config
+from core.app.apps.base_app_generator import BaseAppGenerator
+from core.app.apps.stream_event_encoder import MessageChunkEncoder
+from core.app.entities.task_entities import MessageStreamResponse
+
+
+def _envelope() -> dict:
+    return {"event": "message", "conversation_id": "c1", "message_id": "m1", "created_at": 1700000000}
+
+
+def _message(answer: str, from_variable_selector=None) -> MessageStreamResponse:
+    return MessageStreamResponse(task_id="t1", id="m1", answer=answer, from_variable_selector=from_variable_selector)
+
+
+def test_message_chunk_matches_model_dump():
+    encoder = MessageChunkEncoder()
+    message = _message('he said "hi"\n你好', from_variable_selector=["llm", "text"])
+
+    expected = _envelope()
+    expected.update(message.to_dict())
+    chunk = encoder.chunk(_envelope(), message)
+
+    assert chunk == expected
+    frame = chunk.to_event_stream()
+    assert frame.startswith("data: ")
+    assert frame.endswith("\n\n")
+    assert json.loads(frame[len("data: ") :]) == expected
+    assert list(json.loads(frame[len("data: ") :])) == list(expected)
+
+
+def test_convert_to_event_stream_coalesces_message_chunks():
+    encoder = MessageChunkEncoder()
+
+    def generator():
+        yield encoder.chunk(_envelope(), _message("Hel"))
+        yield encoder.chunk(_envelope(), _message("lo"))
+        yield encoder.chunk(_envelope(), _message("!", from_variable_selector=["llm", "text"]))
+        yield "ping"
+        yield {"event": "message_end"}
+
+    with patch.object(dify_config, "APP_STREAM_COALESCE_WINDOW_MS", 60000):
+        frames = list(BaseAppGenerator.convert_to_event_stream(generator()))
+
+    assert len(frames) == 4
+    assert json.loads(frames[0][len("data: ") :])["answer"] == "Hello"
+    assert json.loads(frames[1][len("data: ") :])["answer"] == "!"
+    assert frames[2] == "event: ping\n\n"
+    assert json.loads(frames[3][len("data: ") :]) == {"event": "message_end"}
+
+
+def test_convert_to_event_stream_without_coalescing():
+    encoder = MessageChunkEncoder()
+    chunks = [encoder.chunk(_envelope(), _message(answer)) for answer in ("a", "b")]
+
+    frames = list(BaseAppGenerator.convert_to_event_stream(iter(chunks)))
+
+    assert [json.loads(frame[len("data: ") :]) for frame in frames] == chunks
+
+
+def test_convert_to_event_stream_flushes_when_source_stalls():
+    encoder = MessageChunkEncoder()
+    second_chunk_sent = threading.Event()
+    first_frame_at = []
+
+    def generator():
+        yield encoder.chunk(_envelope(), _message("Hel"))
+        # the gap to the next chunk is longer than the window
+        second_chunk_sent.wait(timeout=5)
+        yield encoder.chunk(_envelope(), _message("lo"))
+
+    with patch.object(dify_config, "APP_STREAM_COALESCE_WINDOW_MS", 50):
+        stream = BaseAppGenerator.convert_to_event_stream(generator())
+        start = time.perf_counter()
+        first_frame = next(stream)
+        first_frame_at.append(time.perf_counter() - start)
+        second_chunk_sent.set()
+        frames = [first_frame, *stream]
+
+    assert first_frame_at[0] < 1
+    assert [json.loads(frame[len("data: ") :])["answer"] for frame in frames] == ["Hel", "lo"]
+
+
+def test_convert_to_event_stream_raises_source_error():
+    encoder = MessageChunkEncoder()
+
+    def generator():
+        yield encoder.chunk(_envelope(), _message("Hel"))
+        raise ValueError("source failed")
+
+    with patch.object(dify_config, "APP_STREAM_COALESCE_WINDOW_MS", 60000):
+        stream = BaseAppGenerator.convert_to_event_stream(generator())
+        with pytest.raises(ValueError):
+            list(stream)
+
+
+def test_convert_to_event_stream_closed_while_source_stalls():
+    encoder = MessageChunkEncoder()
+    release = threading.Event()
+    source_closed = threading.Event()
+
+    def generator():
+        try:
+            yield encoder.chunk(_envelope(), _message("Hel"))
+            # the client goes away while the source waits for the LLM
+            release.wait(timeout=10)
+            yield encoder.chunk(_envelope(), _message("lo"))
+            yield encoder.chunk(_envelope(), _message("!"))
+        finally:
+            source_closed.set()
+
+    with patch.object(dify_config, "APP_STREAM_COALESCE_WINDOW_MS", 50):
+        stream = BaseAppGenerator.convert_to_event_stream(generator())
+        assert json.loads(next(stream)[len("data: ") :])["answer"] == "Hel"
+        start = time.perf_counter()
+        stream.close()
+
+    assert time.perf_counter() - start < 5
+    assert not source_closed.is_set()
+    # the reader closes the source on its next message
+    release.set()
+    assert source_closed.wait(timeout=5)
@@ -0,0 +1,95 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.features.semantic_answer_cache.semantic_answer_cache import SemanticAnswerCacheFeature
+from core.rag.models.document import Document
+
+MODULE = "core.app.features.semantic_answer_cache.semantic_answer_cache"
+
+
+@pytest.fixture
+def feature(mocker):
+    mocker.patch.object(SemanticAnswerCacheFeature, "_get_annotation_setting", return_value=MagicMock())
+    mocker.patch.object(SemanticAnswerCacheFeature, "_get_dataset", return_value=MagicMock(id="group"))
+    return SemanticAnswerCacheFeature()
+
+
+@pytest.fixture
+def vector(mocker):
+    vector = MagicMock()
+    mocker.patch(f"{MODULE}.Vector", return_value=vector)
+    return vector
+
+
+@pytest.fixture
+def redis(mocker):
+    return mocker.patch(f"{MODULE}.redis_client", new=MagicMock())
+
+
+def _entry(config_hash: str, answer: str) -> bytes:
+    return json.dumps({"config_hash": config_hash, "answer": answer}).encode()
+
+
+def test_query_serves_entry_of_current_config(feature, vector, redis):
+    vector.search_by_vector.return_value = [
+        Document(page_content="q", metadata={"doc_id": "old", "score": 0.99}),
+        Document(page_content="q", metadata={"doc_id": "new", "score": 0.98}),
+    ]
+    entries = {
+        "semantic_answer_cache:app:old": _entry("previous", "outdated answer"),
+        "semantic_answer_cache:app:new": _entry("current", "answer"),
+    }
+    redis.get.side_effect = entries.get
+
+    assert feature.query(MagicMock(id="app"), "current", "question") == "answer"
+    redis.zadd.assert_called_once()
+    assert list(redis.zadd.call_args.args[1]) == ["new"]
+    vector.delete_by_ids.assert_not_called()
+
+
+def test_query_deletes_expired_entries(feature, vector, redis):
+    vector.search_by_vector.return_value = [Document(page_content="q", metadata={"doc_id": "expired"})]
+    redis.get.return_value = None
+
+    assert feature.query(MagicMock(id="app"), "current", "question") is None
+    vector.delete_by_ids.assert_called_once_with(["expired"])
+    redis.zrem.assert_called_once_with("semantic_answer_cache_entries:app", "expired")
+
+
+def test_query_skips_search_without_entries(feature, vector, redis):
+    redis.zcard.return_value = 0
+
+    assert feature.query(MagicMock(id="app"), "current", "question") is None
+    vector.search_by_vector.assert_not_called()
+
+
+def test_query_failure_is_a_miss(feature, vector, redis):
+    vector.search_by_vector.side_effect = ValueError("vector store unavailable")
+
+    assert feature.query(MagicMock(id="app"), "current", "question") is None
+
+
+def test_add_evicts_least_recently_served(feature, vector, redis, monkeypatch):
+    monkeypatch.setattr("configs.dify_config.SEMANTIC_ANSWER_CACHE_MAX_ENTRIES", 2)
+    redis.zcard.return_value = 3
+    redis.zpopmin.return_value = [(b"oldest", 1.0)]
+
+    feature.add(app_id="app", tenant_id="tenant", config_hash="current", query="question", answer="answer")
+
+    document = vector.create.call_args.args[0][0]
+    assert document.page_content == "question"
+    key, _, value = redis.setex.call_args.args
+    assert key == f"semantic_answer_cache:app:{document.metadata['doc_id']}"
+    assert json.loads(value) == {"config_hash": "current", "answer": "answer"}
+    redis.zpopmin.assert_called_once_with("semantic_answer_cache_entries:app", 1)
+    vector.delete_by_ids.assert_called_once_with(["oldest"])
+
+
+def test_config_hash_depends_on_config_and_inputs():
+    config_hash = SemanticAnswerCacheFeature.get_config_hash({"model": {"name": "a"}}, {"city": "Paris"})
+
+    assert config_hash == SemanticAnswerCacheFeature.get_config_hash({"model": {"name": "a"}}, {"city": "Paris"})
+    assert config_hash != SemanticAnswerCacheFeature.get_config_hash({"model": {"name": "b"}}, {"city": "Paris"})
+    assert config_hash != SemanticAnswerCacheFeature.get_config_hash({"model": {"name": "a"}}, {"city": "Rome"})
@@ -0,0 +1,100 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.helper.credentials_cache import CredentialsCache
+from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+
+
+class FakePubSub:
+    def __init__(self, messages: list):
+        self.messages = messages
+
+    def listen(self):
+        yield from self.messages
+
+
+@pytest.fixture
+def redis(mocker):
+    store: dict = {}
+    published: list = []
+    redis = mocker.patch("core.helper.credentials_cache.redis_client", new=MagicMock())
+    redis.get.side_effect = store.get
+    redis.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    redis.delete.side_effect = lambda *keys: [store.pop(key, None) for key in keys]
+    redis.publish.side_effect = lambda channel, key: published.append({"type": "message", "data": key.encode()})
+    redis.store = store
+    redis.published = published
+
+    # no subscriber thread, invalidations are received by the tests
+    mocker.patch.object(CredentialsCache, "_ensure_subscribed")
+    mocker.patch.object(CredentialsCache, "_subscribed", True)
+    CredentialsCache._local_cache.clear()
+    yield redis
+    CredentialsCache._local_cache.clear()
+
+
+def _cache() -> ProviderCredentialsCache:
+    return ProviderCredentialsCache("tenant", "provider", ProviderCredentialsCacheType.PROVIDER)
+
+
+def test_credentials_are_sealed_in_redis(redis):
+    _cache().set({"api_key": "secret"})
+
+    assert list(redis.store) == ["sealed:provider_credentials:tenant_id:tenant:id:provider"]
+    assert b"secret" not in redis.store["sealed:provider_credentials:tenant_id:tenant:id:provider"]
+
+    # another process only has the Redis tier
+    CredentialsCache._local_cache.clear()
+    assert _cache().get() == {"api_key": "secret"}
+
+
+def test_local_tier_serves_without_redis(redis):
+    _cache().set({"api_key": "secret"})
+    redis.get.reset_mock()
+
+    assert _cache().get() == {"api_key": "secret"}
+    redis.get.assert_not_called()
+
+
+def test_local_tier_is_unused_while_not_subscribed(redis, mocker):
+    _cache().set({"api_key": "secret"})
+    mocker.patch.object(CredentialsCache, "_subscribed", False)
+    redis.store.clear()
+
+    assert _cache().get() is None
+
+
+def test_invalidation_is_broadcast(redis):
+    _cache().set({"api_key": "secret"})
+    other_cache = ProviderCredentialsCache("tenant", "other", ProviderCredentialsCacheType.PROVIDER)
+    other_cache.set({"api_key": "other"})
+
+    # delete of another process
+    redis.store.pop("sealed:provider_credentials:tenant_id:tenant:id:provider")
+    CredentialsCache._receive_invalidations(
+        FakePubSub([{"type": "message", "data": b"provider_credentials:tenant_id:tenant:id:provider"}])
+    )
+
+    assert _cache().get() is None
+    redis.get.reset_mock()
+    assert other_cache.get() == {"api_key": "other"}
+    redis.get.assert_not_called()
+
+
+def test_delete_is_published(redis):
+    _cache().set({"api_key": "secret"})
+    _cache().delete()
+
+    assert redis.published == [{"type": "message", "data": b"provider_credentials:tenant_id:tenant:id:provider"}]
+    assert _cache().get() is None
+
+
+def test_legacy_plaintext_entry_is_not_read_and_deleted(redis):
+    redis.store["provider_credentials:tenant_id:tenant:id:provider"] = json.dumps({"api_key": "secret"}).encode()
+
+    assert _cache().get() is None
+
+    _cache().delete()
+    assert redis.store == {}
@@ -0,0 +1,164 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.entities.provider_configuration import ProviderConfigurations
+from core.helper import model_provider_cache
+from core.helper.model_provider_cache import PluginModelCache, ProviderConfigurationsCache
+from core.provider_manager import ProviderManager
+
+
+@pytest.fixture
+def build_configurations(mocker):
+    store: dict = {}
+    redis = mocker.patch("core.helper.model_provider_cache.redis_client", new=MagicMock())
+    redis.get.side_effect = store.get
+    redis.incr.side_effect = lambda key: store.__setitem__(key, store.get(key, 0) + 1)
+
+    ProviderConfigurationsCache._local_cache.clear()
+    yield mocker.patch.object(
+        ProviderManager,
+        "_build_configurations",
+        side_effect=lambda tenant_id: ProviderConfigurations(tenant_id=tenant_id),
+    )
+    ProviderConfigurationsCache._local_cache.clear()
+
+
+def test_configurations_are_cached_per_tenant(build_configurations):
+    configurations = ProviderManager().get_configurations("tenant")
+
+    assert ProviderManager().get_configurations("tenant") is configurations
+    assert ProviderManager().get_configurations("other").tenant_id == "other"
+    assert build_configurations.call_count == 2
+
+
+def test_delete_invalidates_configurations(build_configurations):
+    configurations = ProviderManager().get_configurations("tenant")
+    other_configurations = ProviderManager().get_configurations("other")
+
+    ProviderConfigurationsCache("tenant").delete()
+
+    assert ProviderManager().get_configurations("tenant") is not configurations
+    assert ProviderManager().get_configurations("other") is other_configurations
+
+
+def test_change_of_another_process_invalidates_configurations(build_configurations):
+    configurations = ProviderManager().get_configurations("tenant")
+
+    # only the version in Redis is bumped, the local entry of this process is kept
+    model_provider_cache.redis_client.incr(ProviderConfigurationsCache("tenant").version_key)
+
+    assert ProviderManager().get_configurations("tenant") is not configurations
+
+
+def test_change_while_building_is_not_cached(build_configurations):
+    def build_during_change(tenant_id):
+        ProviderConfigurationsCache(tenant_id).delete()
+        return ProviderConfigurations(tenant_id=tenant_id)
+
+    build_configurations.side_effect = build_during_change
+    configurations = ProviderManager().get_configurations("tenant")
+    build_configurations.side_effect = lambda tenant_id: ProviderConfigurations(tenant_id=tenant_id)
+
+    assert ProviderManager().get_configurations("tenant") is not configurations
+
+
+def test_cache_disabled(build_configurations, mocker):
+    mocker.patch.object(dify_config, "PROVIDER_CONFIGURATIONS_CACHE_TTL", 0)
+
+    assert ProviderManager().get_configurations("tenant") is not ProviderManager().get_configurations("tenant")
+
+
+@pytest.fixture
+def plugin_model_cache(mocker):
+    store: dict = {}
+    redis = mocker.patch("core.helper.model_provider_cache.redis_client", new=MagicMock())
+    redis.get.side_effect = store.get
+    redis.incr.side_effect = lambda key: store.__setitem__(key, store.get(key, 0) + 1)
+
+    PluginModelCache._providers_cache.clear()
+    PluginModelCache._schemas_cache.clear()
+    yield PluginModelCache("tenant")
+    PluginModelCache._providers_cache.clear()
+    PluginModelCache._schemas_cache.clear()
+
+
+def _get_schema(cache: PluginModelCache, fetch, plugin_unique_identifier="langgenius/openai:0.0.1", credentials=None):
+    return cache.get_model_schema(
+        plugin_unique_identifier=plugin_unique_identifier,
+        provider="openai",
+        model_type="llm",
+        model="gpt-4o",
+        credentials=credentials or {"api_key": "key"},
+        fetch=fetch,
+    )
+
+
+def test_plugin_model_providers_are_cached_until_deleted(plugin_model_cache):
+    fetch = MagicMock(side_effect=lambda: ["provider"])
+
+    assert plugin_model_cache.get_providers(fetch) == ["provider"]
+    assert plugin_model_cache.get_providers(fetch) == ["provider"]
+    assert PluginModelCache("other").get_providers(fetch) == ["provider"]
+    assert fetch.call_count == 2
+
+    plugin_model_cache.delete()
+    plugin_model_cache.get_providers(fetch)
+    assert fetch.call_count == 3
+
+
+def test_model_schemas_are_keyed_by_plugin_version_and_credentials(plugin_model_cache):
+    fetch = MagicMock(return_value="schema")
+
+    _get_schema(plugin_model_cache, fetch)
+    _get_schema(plugin_model_cache, fetch)
+    assert fetch.call_count == 1
+
+    _get_schema(plugin_model_cache, fetch, credentials={"api_key": "other"})
+    _get_schema(plugin_model_cache, fetch, plugin_unique_identifier="langgenius/openai:0.0.2")
+    assert fetch.call_count == 3
+
+
+def test_missing_model_schema_is_not_cached(plugin_model_cache):
+    fetch = MagicMock(return_value=None)
+
+    assert _get_schema(plugin_model_cache, fetch) is None
+    assert _get_schema(plugin_model_cache, fetch) is None
+    assert fetch.call_count == 2
+
+
+def test_concurrent_misses_share_a_fetch(plugin_model_cache):
+    fetching = threading.Event()
+    release = threading.Event()
+    fetch_count = 0
+
+    def fetch():
+        nonlocal fetch_count
+        fetch_count += 1
+        fetching.set()
+        release.wait(5)
+        return "schema"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_get_schema, plugin_model_cache, fetch)]
+        fetching.wait(5)
+        futures += [executor.submit(_get_schema, plugin_model_cache, fetch) for _ in range(3)]
+        # let the waiters reach the shared fetch
+        time.sleep(0.1)
+        release.set()
+
+        assert [future.result(timeout=5) for future in futures] == ["schema"] * 4
+    assert fetch_count == 1
+
+
+def test_fetch_error_is_raised_to_waiters_and_not_cached(plugin_model_cache):
+    fetch = MagicMock(side_effect=[ConnectionError("daemon unavailable"), "schema"])
+
+    with pytest.raises(ConnectionError):
+        _get_schema(plugin_model_cache, fetch)
+    assert _get_schema(plugin_model_cache, fetch) == "schema"
+    assert not PluginModelCache._fetching
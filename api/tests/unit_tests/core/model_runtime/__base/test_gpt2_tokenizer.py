@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.model_runtime.model_providers.__base.tokenizers import gpt2_tokenzier
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+
+
+class _WordEncoder:
+    def encode_ordinary(self, text: str) -> list[str]:
+        return text.split()
+
+
+@pytest.fixture
+def load_encoder(mocker):
+    mocker.patch.object(gpt2_tokenzier, "_local", threading.local())
+    return mocker.patch.object(GPT2Tokenizer, "_load_encoder", side_effect=_WordEncoder)
+
+
+def test_get_num_tokens_batch(load_encoder):
+    assert GPT2Tokenizer.get_num_tokens_batch(["one", "two words", "<|endoftext|> three words"]) == [1, 2, 3]
+    assert GPT2Tokenizer.get_num_tokens_batch([]) == []
+    assert load_encoder.call_count == 1
+
+
+def test_every_thread_has_its_own_encoder(load_encoder, mocker):
+    # the shared encoder and its lock are not used
+    mocker.patch.object(gpt2_tokenzier, "_lock", None)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        barrier = threading.Barrier(4)
+
+        def count(text: str) -> tuple[int, int]:
+            barrier.wait(5)
+            return id(GPT2Tokenizer.get_thread_encoder()), GPT2Tokenizer.get_num_tokens_batch([text])[0]
+
+        results = list(executor.map(count, ["a", "a b", "a b c", "a b c d"]))
+
+    assert [num_tokens for _, num_tokens in results] == [1, 2, 3, 4]
+    assert len({encoder_id for encoder_id, _ in results}) == 4
+    assert load_encoder.call_count == 4
+
+
+def test_transformers_encoder_counts_in_one_call(load_encoder):
+    calls = []
+
+    def encode(texts):
+        calls.append(texts)
+        return {"input_ids": [text.split() for text in texts]}
+
+    load_encoder.side_effect = lambda: encode
+
+    assert GPT2Tokenizer.get_num_tokens_batch(["a b", "c"]) == [2, 1]
+    assert calls == [["a b", "c"]]
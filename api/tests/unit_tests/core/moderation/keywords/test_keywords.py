@@ -0,0 +1,38 @@
+from core.moderation.keywords.keywords import KeywordsMatcher, KeywordsModeration
+
+
+def _moderation(keywords: str) -> KeywordsModeration:
+    config = {
+        "keywords": keywords,
+        "inputs_config": {"enabled": True, "preset_response": "inputs blocked"},
+        "outputs_config": {"enabled": True, "preset_response": "outputs blocked"},
+    }
+    return KeywordsModeration(app_id="app", tenant_id="tenant", config=config)
+
+
+def test_keywords_are_matched_ignoring_case():
+    matcher = KeywordsMatcher("Bad\n\nWORSE words\nbad")
+
+    assert matcher.is_matched("it is BAD")
+    assert matcher.is_matched("Worse Words here")
+    assert not matcher.is_matched("worse")
+    assert matcher.is_matched(["list", "with bad"])
+    assert not KeywordsMatcher("\n").is_matched("anything")
+
+
+def test_keywords_containing_other_keywords_are_dropped():
+    matcher = KeywordsMatcher("bad\nvery bad\nbadge")
+
+    assert matcher._keywords == ("bad",)
+
+
+def test_moderation_for_inputs_and_outputs():
+    moderation = _moderation("secret\nforbidden")
+
+    result = moderation.moderation_for_inputs({"name": "ok"}, query="a Forbidden query")
+    assert result.flagged
+    assert result.preset_response == "inputs blocked"
+    assert not moderation.moderation_for_inputs({"name": "ok"}, query="fine").flagged
+
+    assert moderation.moderation_for_outputs("the SECRET is").flagged
+    assert not moderation.moderation_for_outputs("nothing to see").flagged
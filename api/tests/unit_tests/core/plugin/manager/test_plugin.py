@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.plugin.entities.plugin_daemon import PluginInstallTask, PluginInstallTaskStatus
+from core.plugin.manager.plugin import PluginInstallationManager
+
+
+def _task(task_id: str, status: PluginInstallTaskStatus) -> PluginInstallTask:
+    return PluginInstallTask(
+        id=task_id,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        status=status,
+        total_plugins=1,
+        completed_plugins=1 if status == PluginInstallTaskStatus.Success else 0,
+        plugins=[],
+    )
+
+
+@pytest.fixture
+def plugin_model_cache(mocker):
+    seen: set = set()
+    redis = mocker.patch("core.plugin.manager.plugin.redis_client", new=MagicMock())
+    redis.set.side_effect = lambda key, value, ex, nx: key not in seen and not seen.add(key)
+    return mocker.patch("core.plugin.manager.plugin.PluginModelCache")
+
+
+def test_finished_install_task_invalidates_plugin_model_cache_once(plugin_model_cache, mocker):
+    tasks = [_task("running", PluginInstallTaskStatus.Running)]
+    mocker.patch.object(
+        PluginInstallationManager, "_request_with_plugin_daemon_response", side_effect=lambda *args, **kwargs: tasks
+    )
+    manager = PluginInstallationManager()
+
+    manager.fetch_plugin_installation_tasks("tenant", 1, 10)
+    plugin_model_cache.assert_not_called()
+
+    tasks = [_task("running", PluginInstallTaskStatus.Success), _task("failed", PluginInstallTaskStatus.Failed)]
+    manager.fetch_plugin_installation_tasks("tenant", 1, 10)
+    manager.fetch_plugin_installation_tasks("tenant", 1, 10)
+    plugin_model_cache.assert_called_once_with("tenant")
+    plugin_model_cache.return_value.delete.assert_called_once()
+
+
+def test_uninstall_invalidates_plugin_model_cache(plugin_model_cache, mocker):
+    mocker.patch.object(PluginInstallationManager, "_request_with_plugin_daemon_response", return_value=True)
+
+    assert PluginInstallationManager().uninstall("tenant", "installation")
+    plugin_model_cache.return_value.delete.assert_called_once()
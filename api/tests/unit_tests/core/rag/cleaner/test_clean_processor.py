@@ -0,0 +1,33 @@
+from core.rag.cleaner.clean_processor import CleanProcessor
+
+
+def _process_rule(*rule_ids: str, enabled: bool = True) -> dict:
+    return {"rules": {"pre_processing_rules": [{"id": rule_id, "enabled": enabled} for rule_id in rule_ids]}}
+
+
+def test_default_clean():
+    assert CleanProcessor.clean("<|a|>\x00b￾  \n\n\n\nc", {}) == "<a>b  \n\n\n\nc"
+
+
+def test_remove_extra_spaces():
+    text = "a \t　b\n\n\n\nc  d\n\ne"
+
+    assert CleanProcessor.clean(text, _process_rule("remove_extra_spaces")) == "a b\n\nc d\n\ne"
+    assert CleanProcessor.clean(text, _process_rule("remove_extra_spaces", enabled=False)) == text
+
+
+def test_remove_urls_emails_keeps_markdown_image_urls():
+    text = "mail a@b.com, see https://example.com/page ![logo](https://example.com/logo.png)"
+
+    assert (
+        CleanProcessor.clean(text, _process_rule("remove_urls_emails"))
+        == "mail , see  ![image](https://example.com/logo.png)"
+    )
+
+
+def test_cleaners_are_cached_by_enabled_rules():
+    cleaner = CleanProcessor.get_cleaner(_process_rule("remove_extra_spaces", "remove_urls_emails"))
+
+    assert CleanProcessor.get_cleaner(_process_rule("remove_extra_spaces", "remove_urls_emails")) is cleaner
+    assert CleanProcessor.get_cleaner(_process_rule("remove_urls_emails", "remove_extra_spaces")) is not cleaner
+    assert CleanProcessor.get_cleaner(_process_rule("unknown")) is CleanProcessor.get_cleaner({})
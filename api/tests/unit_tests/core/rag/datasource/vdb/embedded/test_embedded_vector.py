@@ -0,0 +1,154 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.datasource.vdb.embedded import embedded_vector
+from core.rag.datasource.vdb.embedded.embedded_vector import EmbeddedVector, EmbeddedVectorConfig
+from core.rag.models.document import Document
+
+
+@pytest.fixture
+def vector(mocker, tmp_path):
+    mocker.patch("core.rag.datasource.vdb.embedded.embedded_vector.redis_client", new=MagicMock())
+    mocker.patch.object(embedded_vector, "_loaded_collections", {})
+    return EmbeddedVector("collection", EmbeddedVectorConfig(path=str(tmp_path)))
+
+
+def _document(doc_id: str, document_id: str = "document") -> Document:
+    return Document(page_content=f"text {doc_id}", metadata={"doc_id": doc_id, "document_id": document_id})
+
+
+def _doc_ids(documents: list[Document]) -> list[str]:
+    return [document.metadata["doc_id"] for document in documents]
+
+
+def _modification_times(directory: Path) -> dict[Path, int]:
+    return {path: path.stat().st_mtime_ns for path in directory.iterdir()}
+
+
+def test_search_returns_the_top_k_by_cosine(vector):
+    vector.create(
+        [_document("x"), _document("y"), _document("xy")],
+        [[2.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+    )
+
+    hits = vector.search_by_vector([1.0, 0.1], top_k=2)
+
+    assert _doc_ids(hits) == ["x", "xy"]
+    assert hits[0].metadata["score"] == pytest.approx(1 / (1.01**0.5))
+    assert hits[0].metadata["score"] > hits[1].metadata["score"]
+
+
+def test_search_applies_the_filter_and_the_threshold(vector):
+    vector.create(
+        [_document("x", "a"), _document("y", "b"), _document("xy", "b")],
+        [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+    )
+
+    assert _doc_ids(vector.search_by_vector([1.0, 0.0], document_ids_filter=["b"])) == ["xy"]
+    assert _doc_ids(vector.search_by_vector([1.0, 0.0], score_threshold=0.9)) == ["x"]
+    assert vector.search_by_full_text("text") == []
+
+
+def test_add_texts_replaces_documents_with_the_same_id(vector):
+    vector.create([_document("x"), _document("y")], [[1.0, 0.0], [0.0, 1.0]])
+    vector.add_texts([Document(page_content="new x", metadata={"doc_id": "x"})], [[0.0, 1.0]])
+
+    hits = vector.search_by_vector([0.0, 1.0], top_k=4)
+
+    assert sorted(hit.page_content for hit in hits) == ["new x", "text y"]
+    assert vector.text_exists("x")
+    with pytest.raises(ValueError, match="Dimension"):
+        vector.add_texts([_document("z")], [[1.0, 0.0, 0.0]])
+
+
+def test_deletes(vector):
+    vector.create(
+        [_document("x", "a"), _document("y", "b"), _document("z", "b")],
+        [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+    )
+
+    vector.delete_by_ids(["x"])
+    assert not vector.text_exists("x")
+    assert vector.get_ids_by_metadata_field("document_id", "b") == ["y", "z"]
+
+    vector.delete_by_metadata_field("document_id", "b")
+    assert vector.search_by_vector([1.0, 1.0]) == []
+
+    vector.add_texts([_document("w")], [[1.0, 0.0]])
+    vector.delete()
+    assert not vector.text_exists("w")
+    assert vector.search_by_vector([1.0, 0.0]) == []
+
+
+def test_instances_see_the_writes_of_each_other(vector, tmp_path):
+    other = EmbeddedVector("collection", EmbeddedVectorConfig(path=str(tmp_path)))
+    vector.create([_document("x")], [[1.0, 0.0]])
+    assert _doc_ids(other.search_by_vector([1.0, 0.0])) == ["x"]
+
+    # another process wrote a new version of the collection
+    embedded_vector._loaded_collections.clear()
+    other.add_texts([_document("y")], [[0.0, 1.0]])
+    assert _doc_ids(vector.search_by_vector([0.0, 1.0])) == ["y"]
+    assert _doc_ids(other.search_by_vector([1.0, 0.0])) == ["x"]
+
+
+def test_writes_append_segments(vector, tmp_path):
+    vector.create([_document("x"), _document("y")], [[1.0, 0.0], [0.0, 1.0]])
+    (first_segment,) = (tmp_path / "collection" / "CURRENT").read_text().split()
+    first_files = _modification_times(tmp_path / "collection" / first_segment)
+
+    vector.add_texts([_document("z")], [[1.0, 1.0]])
+    vector.delete_by_ids(["y", "unknown"])
+
+    segments = (tmp_path / "collection" / "CURRENT").read_text().split()
+    assert len(segments) == 3
+    assert segments[0] == first_segment
+    # the segments written before are left untouched
+    assert _modification_times(tmp_path / "collection" / first_segment) == first_files
+    assert _doc_ids(vector.search_by_vector([1.0, 1.0], top_k=4)) == ["z", "x"]
+
+
+def test_segments_are_compacted(mocker, vector, tmp_path):
+    mocker.patch.object(embedded_vector, "_MAX_SEGMENT_COUNT", 2)
+    vector.create([_document("x", "a"), _document("y", "b")], [[1.0, 0.0], [0.0, 1.0]])
+    vector.add_texts([_document("x", "a")], [[1.0, 1.0]])
+    vector.delete_by_metadata_field("document_id", "b")
+
+    directory = tmp_path / "collection"
+    segments = (directory / "CURRENT").read_text().split()
+    assert len(segments) == 1
+    assert sorted(path.name for path in directory.iterdir()) == sorted(["CURRENT", *segments])
+    hits = vector.search_by_vector([1.0, 1.0], top_k=4)
+    assert _doc_ids(hits) == ["x"]
+    assert hits[0].metadata["score"] == pytest.approx(1.0)
+
+    # another process loading the compacted collection
+    embedded_vector._loaded_collections.clear()
+    assert vector.get_ids_by_metadata_field("document_id", "a") == ["x"]
+    assert not vector.text_exists("y")
+
+
+def test_compaction_keeps_the_segments_added_meanwhile(mocker, vector, tmp_path):
+    mocker.patch.object(embedded_vector, "_MAX_SEGMENT_COUNT", 2)
+    vector.create([_document("x")], [[1.0, 0.0]])
+    vector.add_texts([_document("y")], [[0.0, 1.0]])
+    write = embedded_vector._Segment.write
+
+    def write_then_add(directory, ids, *args, **kwargs):
+        name = write(directory, ids, *args, **kwargs)
+        if ids != ["x", "y", "w"]:
+            return name
+        # another process adds a segment while the merged one is written
+        mocker.patch.object(embedded_vector._Segment, "write", write)
+        mocker.patch.object(embedded_vector, "_MAX_SEGMENT_COUNT", 16)
+        vector.add_texts([_document("z")], [[1.0, 1.0]])
+        return name
+
+    mocker.patch.object(embedded_vector._Segment, "write", write_then_add)
+    vector.add_texts([_document("w")], [[-1.0, 0.0]])
+
+    # the merged segment and the one added meanwhile
+    assert len((tmp_path / "collection" / "CURRENT").read_text().split()) == 2
+    assert sorted(vector.get_ids_by_metadata_field("document_id", "document")) == ["w", "x", "y", "z"]
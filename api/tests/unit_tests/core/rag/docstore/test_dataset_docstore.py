@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.sql.dml import Insert, Update
+
+from core.rag.docstore.dataset_docstore import DatasetDocumentStore
+from core.rag.models.document import ChildDocument, Document
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.patch("core.rag.docstore.dataset_docstore.db").session
+    # max position of the document
+    session.query.return_value.filter.return_value.scalar.return_value = 2
+    # existing segments of the dataset
+    session.execute.return_value.all.return_value = []
+    return session
+
+
+def _store() -> DatasetDocumentStore:
+    dataset = MagicMock(id="dataset", tenant_id="tenant", indexing_technique="economy")
+    return DatasetDocumentStore(dataset=dataset, user_id="user", document_id="document")
+
+
+def _doc(doc_id: str, content: str = "content", children: int = 0, **metadata) -> Document:
+    return Document(
+        page_content=content,
+        metadata={"doc_id": doc_id, "doc_hash": f"{doc_id}-hash", **metadata},
+        children=[
+            ChildDocument(page_content=f"{doc_id}-child-{i}", metadata={"doc_id": f"{doc_id}-child-{i}"})
+            for i in range(children)
+        ]
+        or None,
+    )
+
+
+def _rows(session, statement_type, table_name: str) -> list[list[dict]]:
+    return [
+        call.args[1]
+        for call in session.execute.call_args_list
+        if isinstance(call.args[0], statement_type) and call.args[0].table.name == table_name
+    ]
+
+
+def test_new_segments_are_inserted_in_bulk(session):
+    _store().add_documents([_doc("a", children=2), _doc("b", answer="answer"), _doc("c")], save_child=True)
+
+    [segments] = _rows(session, Insert, "document_segments")
+    assert [(row["index_node_id"], row["position"], row["answer"]) for row in segments] == [
+        ("a", 3, None),
+        ("b", 4, "answer"),
+        ("c", 5, None),
+    ]
+    [child_chunks] = _rows(session, Insert, "child_chunks")
+    assert [(row["segment_id"], row["position"], row["content"]) for row in child_chunks] == [
+        (segments[0]["id"], 1, "a-child-0"),
+        (segments[0]["id"], 2, "a-child-1"),
+    ]
+    assert not _rows(session, Update, "document_segments")
+    session.commit.assert_called_once()
+
+
+def test_existing_segments_are_updated_in_bulk(session):
+    session.execute.return_value.all.return_value = [("a", "segment-a")]
+
+    _store().add_documents([_doc("a", content="updated", children=1), _doc("b")], save_child=True)
+
+    [updated] = _rows(session, Update, "document_segments")
+    assert updated == [
+        {"id": "segment-a", "content": "updated", "index_node_hash": "a-hash", "word_count": 7, "tokens": 0}
+    ]
+    [segments] = _rows(session, Insert, "document_segments")
+    assert [(row["index_node_id"], row["position"]) for row in segments] == [("b", 3)]
+    # the children of the updated segment are replaced
+    session.query.return_value.filter.return_value.delete.assert_called_once_with(synchronize_session=False)
+    [child_chunks] = _rows(session, Insert, "child_chunks")
+    assert [row["segment_id"] for row in child_chunks] == ["segment-a"]
+
+
+def test_existing_segment_without_allow_update(session):
+    session.execute.return_value.all.return_value = [("a", "segment-a")]
+
+    with pytest.raises(ValueError, match="doc_id a already exists"):
+        _store().add_documents([_doc("b"), _doc("a")], allow_update=False)
+
+    assert not _rows(session, Insert, "document_segments")
+    session.commit.assert_not_called()
+
+
+def test_repeated_doc_id_is_inserted_once(session):
+    _store().add_documents([_doc("a"), _doc("a", content="last")])
+
+    [segments] = _rows(session, Insert, "document_segments")
+    assert [(row["index_node_id"], row["position"], row["content"]) for row in segments] == [("a", 3, "last")]
+
+
+def test_documents_are_written_in_batches(session, mocker):
+    mocker.patch.object(DatasetDocumentStore, "_BULK_BATCH_SIZE", 2)
+
+    _store().add_documents([_doc(str(i)) for i in range(5)])
+
+    batches = _rows(session, Insert, "document_segments")
+    assert [[row["position"] for row in rows] for rows in batches] == [[3, 4], [5, 6], [7]]
+    assert session.commit.call_count == 3
@@ -0,0 +1,54 @@
+import datetime
+import zipfile
+
+import openpyxl
+import pytest
+
+from core.rag.extractor.excel_extractor import ExcelExtractor
+
+
+@pytest.fixture
+def xlsx_file(tmp_path):
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(["name", "url", "date"])
+    sheet.append(["a", "site", datetime.datetime(2024, 1, 2)])
+    sheet["B2"].hyperlink = "https://example.com/a"
+    sheet.append([None, None, None])
+    sheet.append(["b", None, None])
+    sheet.append(["c", "d", None])
+    sheet.append(["e", "f", None])
+    sheet["A5"].hyperlink = "https://example.com/range"
+    wb.create_sheet("empty")
+    other = wb.create_sheet("other")
+    other.append(["h"])
+    other.append([1])
+    path = tmp_path / "file.xlsx"
+    wb.save(path)
+
+    # extend the link of A5 over A5:A6
+    with zipfile.ZipFile(path) as archive:
+        files = {name: archive.read(name) for name in archive.namelist()}
+    files["xl/worksheets/sheet1.xml"] = files["xl/worksheets/sheet1.xml"].replace(b'ref="A5"', b'ref="A5:A6"')
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return str(path)
+
+
+def test_extract_xlsx(xlsx_file):
+    documents = ExcelExtractor(xlsx_file).extract()
+
+    assert [document.page_content for document in documents] == [
+        '"name":"a";"url":"[site](https://example.com/a)";"date":"2024-01-02 00:00:00"',
+        '"name":"b"',
+        '"name":"[c](https://example.com/range)";"url":"d"',
+        '"name":"[e](https://example.com/range)";"url":"f"',
+        '"h":"1"',
+    ]
+    assert all(document.metadata == {"source": xlsx_file} for document in documents)
+
+
+def test_unsupported_file_extension():
+    with pytest.raises(ValueError, match="Unsupported file extension"):
+        ExcelExtractor("file.csv").extract()
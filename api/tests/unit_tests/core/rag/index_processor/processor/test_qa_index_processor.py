@@ -0,0 +1,87 @@
+import random
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+from core.rag.index_processor.processor.qa_index_processor import QAIndexProcessor
+from core.rag.models.document import Document
+
+
+def _nodes(count: int) -> list[Document]:
+    return [Document(page_content=f"text {i}", metadata={"document_id": "document"}) for i in range(count)]
+
+
+@pytest.fixture
+def generate_qa_document(mocker):
+    clock = mocker.patch("core.rag.index_processor.processor.qa_index_processor.time")
+    clock.time.return_value = 600.0
+    # waiting moves the clock
+    clock.sleep.side_effect = lambda seconds: setattr(clock.time, "return_value", clock.time.return_value + seconds)
+    return mocker.patch(
+        "core.rag.index_processor.processor.qa_index_processor.LLMGenerator.generate_qa_document",
+        side_effect=lambda tenant_id, query, document_language: f"Q1: {query}?\nA1: answer of {query}",
+    )
+
+
+def test_qa_documents_are_in_the_order_of_the_nodes(generate_qa_document):
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def generate(tenant_id, query, document_language):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        # later nodes may finish first
+        threading.Event().wait(random.uniform(0, 0.01))
+        with lock:
+            running -= 1
+        return f"Q1: {query}?\nA1: answer of {query}"
+
+    generate_qa_document.side_effect = generate
+
+    qa_documents = QAIndexProcessor()._generate_qa_documents("tenant", _nodes(30), "English")
+
+    assert [document.page_content for document in qa_documents] == [f"text {i}?" for i in range(30)]
+    assert [document.metadata["answer"] for document in qa_documents] == [f"answer of text {i}" for i in range(30)]
+    assert 1 < max_running <= dify_config.QA_GENERATION_MAX_WORKERS
+
+
+def test_failed_node_is_skipped(generate_qa_document):
+    generate_qa_document.side_effect = lambda tenant_id, query, document_language: (
+        "no pairs" if query == "text 1" else f"Q1: {query}?\nA1: answer"
+    )
+
+    qa_documents = QAIndexProcessor()._generate_qa_documents("tenant", _nodes(3), "English")
+
+    assert [document.page_content for document in qa_documents] == ["text 0?", "text 2?"]
+
+
+def test_rate_limited_call_is_retried(generate_qa_document, mocker):
+    mocker.patch.object(dify_config, "QA_GENERATION_MAX_RETRIES", 2)
+    generate_qa_document.side_effect = [InvokeRateLimitError("rate limited"), InvokeRateLimitError("rate limited"), "A"]
+
+    assert QAIndexProcessor._generate_qa_document("tenant", "text", "English") == "A"
+    assert generate_qa_document.call_count == 3
+
+    generate_qa_document.side_effect = InvokeRateLimitError("rate limited")
+    with pytest.raises(InvokeRateLimitError):
+        QAIndexProcessor._generate_qa_document("tenant", "text", "English")
+
+
+def test_calls_wait_for_the_rate_limit_of_the_workspace(generate_qa_document, mocker):
+    mocker.patch.object(dify_config, "QA_GENERATION_RATE_LIMIT_PER_MINUTE", 2)
+    counters: dict = {}
+    redis = mocker.patch("core.rag.index_processor.processor.qa_index_processor.redis_client", new=MagicMock())
+    redis.incr.side_effect = lambda key: counters.__setitem__(key, counters.get(key, 0) + 1) or counters[key]
+
+    for _ in range(3):
+        QAIndexProcessor._generate_qa_document("tenant", "text", "English")
+
+    # the third call waits for the next minute
+    assert generate_qa_document.call_count == 3
+    assert list(counters.values()) == [3, 1]
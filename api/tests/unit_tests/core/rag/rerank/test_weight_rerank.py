@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from core.rag.models.document import Document
+from core.rag.rerank import weight_rerank
+from core.rag.rerank.entity.weight import KeywordSetting, VectorSetting, Weights
+from core.rag.rerank.weight_rerank import WeightRerankRunner
+
+KEYWORDS = {
+    "query": {"apple", "banana"},
+    "doc-1": {"apple", "banana"},
+    "doc-2": {"apple", "cherry"},
+    "doc-3": {"durian"},
+}
+
+
+@pytest.fixture
+def runner(mocker):
+    weight_rerank._extract_keywords.cache_clear()
+    mocker.patch.object(weight_rerank, "ModelManager")
+    cache_embedding = mocker.patch.object(weight_rerank, "CacheEmbedding")
+    cache_embedding.return_value.embed_query.return_value = [1.0, 0.0]
+    mocker.patch(
+        "core.rag.rerank.weight_rerank.JiebaKeywordTableHandler.extract_keywords",
+        side_effect=lambda text, max_keywords_per_chunk: set(KEYWORDS[text]),
+    )
+    weights = Weights(
+        vector_setting=VectorSetting(vector_weight=0.5, embedding_provider_name="openai", embedding_model_name="m"),
+        keyword_setting=KeywordSetting(keyword_weight=0.5),
+    )
+    yield WeightRerankRunner("tenant", weights)
+    weight_rerank._extract_keywords.cache_clear()
+
+
+def _documents() -> list[Document]:
+    return [
+        Document(page_content="doc-1", metadata={"doc_id": "1"}, vector=[1.0, 0.0]),
+        Document(page_content="doc-2", metadata={"doc_id": "2", "score": 0.5}, vector=[0.0, 1.0]),
+        Document(page_content="doc-3", metadata={"doc_id": "3"}, vector=[1.0, 1.0]),
+        Document(page_content="doc-1", metadata={"doc_id": "1"}, vector=[1.0, 0.0]),
+    ]
+
+
+def test_keyword_score_is_tfidf_cosine(runner):
+    scores = runner._calculate_keyword_score("query", _documents()[:3])
+
+    # apple is in 2 of 3 documents, banana in 1
+    apple_idf = math.log(4 / 3) + 1
+    banana_idf = math.log(4 / 2) + 1
+    cherry_idf = math.log(4 / 2) + 1
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[1] == pytest.approx(
+        apple_idf**2 / (math.hypot(apple_idf, banana_idf) * math.hypot(apple_idf, cherry_idf))
+    )
+    assert scores[2] == 0.0
+
+
+def test_vector_score_keeps_the_scores_of_the_vector_search(runner):
+    scores = runner._calculate_cosine("tenant", "query", _documents()[:3], runner.weights.vector_setting)
+
+    assert scores == pytest.approx([1.0, 0.5, 1 / math.sqrt(2)])
+
+
+def test_run(runner):
+    documents = runner.run("query", _documents(), score_threshold=0.4)
+
+    # the duplicate is dropped and doc-3 is under the threshold once weighted
+    assert [document.metadata["doc_id"] for document in documents] == ["1", "2"]
+    assert documents[0].metadata["score"] == pytest.approx(1.0)
+    assert documents[0].metadata["keywords"] == {"apple", "banana"}
+
+
+def test_keywords_of_a_text_are_extracted_once(runner):
+    runner.run("query", _documents())
+    runner.run("query", _documents())
+
+    assert weight_rerank.JiebaKeywordTableHandler.extract_keywords.call_count == 4
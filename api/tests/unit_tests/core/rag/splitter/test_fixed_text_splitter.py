@@ -0,0 +1,29 @@
+from configs import dify_config
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+
+TEXT = "ab cd efgh ij kl"
+
+
+def _split_text(text: str) -> list[str]:
+    splitter = FixedRecursiveCharacterTextSplitter.from_encoder(
+        embedding_model_instance=None, chunk_size=4, chunk_overlap=0, fixed_separator="\n\n", separators=[" ", ""]
+    )
+    return splitter.split_text(text)
+
+
+def test_chunk_size_is_measured_in_tokens(mocker):
+    mocker.patch.object(dify_config, "INDEXING_SEGMENTATION_LENGTH_IN_TOKENS", True)
+    num_tokens_batch = mocker.patch(
+        "core.rag.splitter.fixed_text_splitter.GPT2Tokenizer.get_num_tokens_batch",
+        side_effect=lambda texts: [len(text.split()) for text in texts],
+    )
+
+    assert _split_text(TEXT) == ["abcdefghij", "kl"]
+    # all splits of a text are measured in one call
+    assert [call.args[0] for call in num_tokens_batch.call_args_list if len(call.args[0]) > 1] == [TEXT.split()]
+
+
+def test_chunk_size_is_measured_in_characters(mocker):
+    mocker.patch.object(dify_config, "INDEXING_SEGMENTATION_LENGTH_IN_TOKENS", False)
+
+    assert _split_text(TEXT) == ["abcd", "efgh", "ijkl"]
@@ -0,0 +1,21 @@
+from core.rag.splitter.text_splitter import CharacterTextSplitter
+
+
+def test_merge_splits_with_overlap():
+    splitter = CharacterTextSplitter(separator=" ", chunk_size=11, chunk_overlap=5)
+
+    assert splitter.split_text("aa bb cc dd ee ff gg") == ["aa bb cc dd", "cc dd ee ff", "ee ff gg"]
+
+
+def test_merge_splits_measures_every_split_once():
+    measured: list[str] = []
+
+    def length_function(texts: list[str]) -> list[int]:
+        measured.extend(texts)
+        return [len(text) for text in texts]
+
+    splitter = CharacterTextSplitter(separator=" ", chunk_size=11, chunk_overlap=5, length_function=length_function)
+    splitter.split_text("aa bb cc dd ee ff gg")
+    splitter.split_text("hh ii")
+
+    assert measured == ["aa", "bb", "cc", "dd", "ee", "ff", "gg", " ", "hh", "ii"]
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from core.indexing_pipeline import IndexingPipeline, PipelineStage
+
+
+def test_items_flow_through_the_stages(app):
+    results = []
+    finished = []
+
+    def split(item, emit):
+        for part in range(2):
+            emit("load", (item, part), partition=item)
+
+    def load(item, emit):
+        results.append((item, threading.current_thread().name))
+
+    stages = [
+        PipelineStage(name="split", process=split, outputs=("load",), finish=lambda emit: finished.append(True)),
+        PipelineStage(name="load", process=load, workers=3, partitioned=True),
+    ]
+    stats = IndexingPipeline(stages, queue_size=2).run(app, range(6))
+
+    assert sorted(item for item, _ in results) == [(i, part) for i in range(6) for part in range(2)]
+    # the items of a partition are all loaded by the same worker
+    workers = {item: thread_name for (item, _), thread_name in results}
+    assert all(thread_name.endswith(f"-{item % 3}") for item, thread_name in workers.items())
+    assert finished == [True]
+    assert stats["split"].items == 6
+    assert stats["load"].items == 12
+
+
+def test_full_queues_block_the_previous_stages(app):
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def source():
+        nonlocal in_flight, max_in_flight
+        for i in range(20):
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            yield i
+
+    def forward(item, emit):
+        emit("load", item)
+
+    def load(item, emit):
+        nonlocal in_flight
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+
+    stages = [
+        PipelineStage(name="forward", process=forward, outputs=("load",)),
+        PipelineStage(name="load", process=load),
+    ]
+    stats = IndexingPipeline(stages, queue_size=1).run(app, source())
+
+    # one item in each queue and one handled by each stage, plus the one being put
+    assert max_in_flight <= 5
+    assert stats["load"].items == 20
+    assert stats["forward"].blocked_seconds > 0
+
+
+def test_error_of_a_stage_stops_the_pipeline(app):
+    consumed = []
+
+    def source():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    def fail(item, emit):
+        if item == 3:
+            raise ValueError("invalid item")
+
+    stages = [PipelineStage(name="fail", process=fail)]
+
+    with pytest.raises(ValueError, match="invalid item"):
+        IndexingPipeline(stages, queue_size=1).run(app, source())
+    assert len(consumed) < 1000
@@ -0,0 +1,200 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.indexing_runner import IndexingRunner
+from core.rag.index_processor.constant.index_type import IndexType
+from core.rag.models.document import Document
+
+TEXT_DOCS = 3
+CHUNKS_PER_TEXT_DOC = 3
+
+
+@pytest.fixture
+def runner(mocker):
+    mocker.patch.object(dify_config, "INDEXING_PIPELINE_ENABLED", True)
+    mocker.patch.object(dify_config, "INDEXING_PIPELINE_BATCH_SIZE", 2)
+    mocker.patch.object(dify_config, "INDEXING_PIPELINE_INDEX_WORKERS", 2)
+    mocker.patch("core.indexing_runner.db")
+    mocker.patch("core.indexing_runner.DocumentSegment")
+    mocker.patch("core.indexing_runner.redis_client", new=MagicMock()).get.return_value = None
+
+    runner = IndexingRunner()
+    mocker.patch.object(
+        runner,
+        "_extract",
+        side_effect=lambda *args: [Document(page_content=f"text {i}", metadata={"index": i}) for i in range(TEXT_DOCS)],
+    )
+    mocker.patch.object(
+        runner,
+        "_transform",
+        side_effect=lambda index_processor, dataset, text_docs, doc_language, process_rule: [
+            Document(page_content=f"chunk {text_doc.metadata['index']}-{i}", metadata={"doc_id": "id"})
+            for text_doc in text_docs
+            for i in range(CHUNKS_PER_TEXT_DOC)
+        ],
+    )
+    mocker.patch.object(runner, "_get_embedding_model_instance")
+    mocker.patch.object(runner, "_check_document_paused_status")
+    mocker.patch.object(runner, "_set_indexing_checkpoint")
+    mocker.patch.object(runner, "_update_document_index_status")
+    mocker.patch.object(runner, "_process_chunk", side_effect=lambda *args: len(args[2]))
+    mocker.patch.object(runner, "_process_keyword_index")
+    runner.doc_store = mocker.patch("core.indexing_runner.DatasetDocumentStore").return_value
+    return runner
+
+
+def _dataset_document(doc_form=IndexType.PARAGRAPH_INDEX):
+    return MagicMock(id="document", doc_form=doc_form, doc_language="English")
+
+
+def _pipeline_args(doc_form=IndexType.PARAGRAPH_INDEX):
+    dataset = MagicMock(id="dataset", indexing_technique="high_quality")
+    return MagicMock(), dataset, _dataset_document(doc_form), {"mode": "automatic", "rules": {}}
+
+
+def _contents(documents):
+    return [document.page_content for document in documents]
+
+
+def test_run_pipelined(runner):
+    runner._run_pipelined(*_pipeline_args())
+
+    all_chunks = [f"chunk {i}-{j}" for i in range(TEXT_DOCS) for j in range(CHUNKS_PER_TEXT_DOC)]
+    # chunks are persisted in order, with a checkpoint after every text document
+    persisted = [_contents(call.kwargs["docs"]) for call in runner.doc_store.add_documents.call_args_list]
+    assert sum(persisted, []) == all_chunks
+    assert [call.args[1] for call in runner._set_indexing_checkpoint.call_args_list] == [1, 2, 3]
+
+    indexed = [_contents(call.args[2]) for call in runner._process_chunk.call_args_list]
+    assert sorted(sum(indexed, [])) == all_chunks
+    assert all(len(batch) <= 2 for batch in indexed)
+    keywords = [_contents(call.args[3]) for call in runner._process_keyword_index.call_args_list]
+    assert sorted(sum(keywords, [])) == all_chunks
+
+    statuses = [call.kwargs for call in runner._update_document_index_status.call_args_list]
+    assert [status["after_indexing_status"] for status in statuses] == ["indexing", "completed"]
+    assert len(all_chunks) in statuses[1]["extra_update_params"].values()
+
+
+def test_run_pipelined_resumes_from_checkpoint(runner, mocker):
+    mocker.patch("core.indexing_runner.redis_client", new=MagicMock()).get.return_value = json.dumps(
+        {"text_docs": 2, "position": 6}
+    )
+    delete_segments = mocker.patch.object(runner, "_delete_segments_after_position")
+    unindexed_documents = [Document(page_content="chunk 1-2", metadata={"doc_id": "id"})]
+    mocker.patch.object(runner, "_get_unindexed_documents", return_value=unindexed_documents)
+    index_documents = mocker.patch.object(runner, "_index_documents", return_value=1)
+
+    runner._run_pipelined(*_pipeline_args(), resume=True)
+
+    delete_segments.assert_called_once()
+    assert delete_segments.call_args.args[1] == 6
+    assert index_documents.call_args.args[3] == unindexed_documents
+    # only the text document after the checkpoint is split and persisted
+    persisted = [_contents(call.kwargs["docs"]) for call in runner.doc_store.add_documents.call_args_list]
+    assert persisted == [["chunk 2-0", "chunk 2-1", "chunk 2-2"]]
+
+
+def test_run_pipelined_raises_stage_error(runner):
+    runner._process_chunk.side_effect = ValueError("embedding failed")
+
+    with pytest.raises(ValueError, match="embedding failed"):
+        runner._run_pipelined(*_pipeline_args())
+
+    statuses = [call.kwargs["after_indexing_status"] for call in runner._update_document_index_status.call_args_list]
+    assert "completed" not in statuses
+
+
+def test_full_doc_parent_child_is_not_pipelined(runner):
+    process_rule = {"mode": "hierarchical", "rules": {"parent_mode": "full-doc"}}
+
+    assert not runner._can_run_pipelined(_dataset_document(IndexType.PARENT_CHILD_INDEX), process_rule)
+    assert runner._can_run_pipelined(_dataset_document(IndexType.PARENT_CHILD_INDEX), {"rules": {}})
+    assert runner._can_run_pipelined(_dataset_document(), process_rule)
+
+
+def _segment(name: str, status: str = "completed", enabled: bool = True):
+    return SimpleNamespace(
+        id=f"segment-{name}",
+        index_node_id=f"node-{name}",
+        index_node_hash=f"hash-{name}",
+        tokens=10,
+        status=status,
+        enabled=enabled,
+        answer=None,
+    )
+
+
+def test_load_incremental_only_indexes_changed_chunks(mocker):
+    mocker.patch("core.indexing_runner.select")
+    update = mocker.patch("core.indexing_runner.update")
+    mocker.patch("core.indexing_runner.DocumentSegment")
+    session = mocker.patch("core.indexing_runner.db").session
+    doc_store = mocker.patch("core.indexing_runner.DatasetDocumentStore").return_value
+    segments = [_segment("a"), _segment("b"), _segment("c"), _segment("d", enabled=False)]
+    # positions after the new segments were added at the end
+    positions = [("segment-a", "node-a", 1), ("segment-c", "node-c", 3), ("s1", "new-1", 5), ("s3", "new-3", 6)]
+    session.execute.side_effect = [MagicMock(all=MagicMock(return_value=segments)), iter(positions), None]
+
+    runner = IndexingRunner()
+    mocker.patch.object(runner, "_update_document_index_status")
+    mocker.patch.object(runner, "_get_embedding_model_instance")
+    index_documents = mocker.patch.object(runner, "_index_documents", return_value=5)
+    index_processor = MagicMock()
+    documents = [
+        Document(page_content=content, metadata={"doc_id": f"new-{i}", "doc_hash": f"hash-{content}"})
+        for i, content in enumerate(["a", "x", "c", "c"])
+    ]
+
+    runner._load_incremental(index_processor, MagicMock(id="dataset"), _dataset_document(), documents)
+
+    # a and the first c keep their segments, the disabled segment is replaced
+    assert [document.metadata["doc_id"] for document in documents] == ["node-a", "new-1", "node-c", "new-3"]
+    index_processor.clean.assert_called_once_with(mocker.ANY, ["node-b", "node-d"], with_keywords=True)
+    assert _contents(doc_store.add_documents.call_args.kwargs["docs"]) == ["x", "c"]
+    assert session.execute.call_args_list[2].args == (
+        update.return_value,
+        [{"id": "s1", "position": 2}, {"id": "s3", "position": 4}],
+    )
+    assert _contents(index_documents.call_args.args[3]) == ["x", "c"]
+    completed = runner._update_document_index_status.call_args_list[1].kwargs
+    assert completed["after_indexing_status"] == "completed"
+    assert 2 * 10 + 5 in completed["extra_update_params"].values()
+
+
+def test_unchanged_document_is_not_indexed(mocker):
+    mocker.patch("core.indexing_runner.select")
+    mocker.patch("core.indexing_runner.DocumentSegment")
+    session = mocker.patch("core.indexing_runner.db").session
+    doc_store = mocker.patch("core.indexing_runner.DatasetDocumentStore").return_value
+    session.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=[_segment("a"), _segment("b")])),
+        iter([("segment-a", "node-a", 1), ("segment-b", "node-b", 2)]),
+    ]
+
+    runner = IndexingRunner()
+    mocker.patch.object(runner, "_update_document_index_status")
+    index_documents = mocker.patch.object(runner, "_index_documents")
+    index_processor = MagicMock()
+    documents = [Document(page_content=name, metadata={"doc_id": name, "doc_hash": f"hash-{name}"}) for name in "ab"]
+
+    runner._load_incremental(index_processor, MagicMock(id="dataset"), _dataset_document(), documents)
+
+    index_processor.clean.assert_not_called()
+    doc_store.add_documents.assert_not_called()
+    index_documents.assert_not_called()
+
+
+def test_only_paragraph_documents_are_reindexed_incrementally(mocker):
+    mocker.patch.object(dify_config, "INDEXING_INCREMENTAL_REINDEX_ENABLED", True)
+
+    assert IndexingRunner.can_reindex_incrementally(_dataset_document())
+    assert not IndexingRunner.can_reindex_incrementally(_dataset_document(IndexType.QA_INDEX))
+    assert not IndexingRunner.can_reindex_incrementally(_dataset_document(IndexType.PARENT_CHILD_INDEX))
+
+    mocker.patch.object(dify_config, "INDEXING_INCREMENTAL_REINDEX_ENABLED", False)
+    assert not IndexingRunner.can_reindex_incrementally(_dataset_document())
@@ -1,8 +1,10 @@
+import uuid
 from unittest.mock import MagicMock, patch
 
 import pytest
 import redis
 
+from configs import dify_config
 from core.entities.provider_entities import ModelLoadBalancingConfiguration
 from core.model_manager import LBModelManager
 from core.model_runtime.entities.model_entities import ModelType
@@ -70,3 +72,79 @@ def test_lb_model_manager_fetch_next(mocker, lb_model_manager):
 
         config = lb_model_manager.fetch_next()
         assert config == config3
+
+
+@pytest.fixture
+def local_lb_model_manager_factory():
+    redis_client.initialize(redis.Redis())
+
+    def factory(weights: list[int]) -> LBModelManager:
+        load_balancing_configs = [
+            ModelLoadBalancingConfiguration(id=f"id{i}", name=f"config{i}", credentials={}, weight=weight)
+            for i, weight in enumerate(weights)
+        ]
+        with patch.object(dify_config, "MODEL_LB_LOCAL_STATE_ENABLED", True):
+            return LBModelManager(
+                tenant_id=f"tenant_{uuid.uuid4()}",
+                provider="openai",
+                model_type=ModelType.LLM,
+                model="gpt-4",
+                load_balancing_configs=load_balancing_configs,
+            )
+
+    return factory
+
+
+def test_lb_model_manager_local_weighted_round_robin(local_lb_model_manager_factory):
+    lb_model_manager = local_lb_model_manager_factory([3, 1])
+
+    with patch.object(redis_client, "ttl", return_value=-2) as ttl:
+        selected = [lb_model_manager.fetch_next().id for _ in range(8)]
+
+        # the cooldown state is fetched once per config and then served locally
+        assert ttl.call_count == 2
+
+    assert selected.count("id0") == 6
+    assert selected.count("id1") == 2
+    # smooth weighted round robin interleaves the configs
+    assert selected[:4] == ["id0", "id0", "id1", "id0"]
+
+
+def test_lb_model_manager_local_cooldown(local_lb_model_manager_factory):
+    lb_model_manager = local_lb_model_manager_factory([1, 1])
+    config0, config1 = lb_model_manager._load_balancing_configs
+
+    with (
+        patch.object(redis_client, "ttl", return_value=-2),
+        patch.object(redis_client, "setex", return_value=None) as setex,
+    ):
+        lb_model_manager.cooldown(config0, expire=60)
+        setex.assert_called_once()
+
+        assert lb_model_manager.in_cooldown(config0) is True
+        assert [lb_model_manager.fetch_next() for _ in range(3)] == [config1, config1, config1]
+
+        lb_model_manager.cooldown(config1, expire=60)
+        assert lb_model_manager.fetch_next() is None
+
+
+def test_lb_model_manager_local_least_in_flight(local_lb_model_manager_factory):
+    lb_model_manager = local_lb_model_manager_factory([1, 1, 1])
+    config0, config1, config2 = lb_model_manager._load_balancing_configs
+
+    with (
+        patch.object(redis_client, "ttl", return_value=-2),
+        patch.object(dify_config, "MODEL_LB_STRATEGY", "least_in_flight"),
+    ):
+        lb_model_manager.acquire(config0)
+        lb_model_manager.acquire(config1)
+        assert lb_model_manager.fetch_next() == config2
+
+        lb_model_manager.acquire(config2)
+        lb_model_manager.acquire(config2)
+        lb_model_manager.release(config0)
+        assert lb_model_manager.fetch_next() == config0
+
+        stream = lb_model_manager.release_after_stream(config1, iter(["a", "b"]))
+        assert list(stream) == ["a", "b"]
+        assert lb_model_manager._local_state.in_flight == {"id2": 2}
@@ -789,3 +789,63 @@ def test_parallels_graph6():
 
     for node_id in ["code1", "code2"]:
         assert graph.node_parallel_mapping[node_id] == child_parallel.id
+
+
+def test_get_or_init_shares_compiled_graph():
+    graph_config = {
+        "edges": [
+            {"id": "start-source-llm-target", "source": "start", "target": "llm"},
+            {"id": "llm-source-answer-target", "source": "llm", "target": "answer"},
+        ],
+        "nodes": [
+            {"data": {"type": "start"}, "id": "start"},
+            {"data": {"type": "llm"}, "id": "llm"},
+            {"data": {"type": "answer", "title": "answer", "answer": "1"}, "id": "answer"},
+            {"data": {"type": "iteration-start"}, "id": "iteration-start"},
+        ],
+    }
+
+    graph = Graph.get_or_init(graph_config=graph_config)
+    assert Graph.get_or_init(graph_config=graph_config) is graph
+    sub_graph = Graph.get_or_init(graph_config=graph_config, root_node_id="iteration-start")
+    assert sub_graph is not graph
+    assert sub_graph.node_ids == ["iteration-start"]
+
+    changed_graph_config = {**graph_config, "edges": graph_config["edges"][:1]}
+    changed_graph = Graph.get_or_init(graph_config=changed_graph_config)
+    assert changed_graph is not graph
+    assert changed_graph.node_ids == ["start", "llm"]
+    assert graph.node_ids == ["start", "llm", "answer"]
+
+
+def test_sequential_parallels_graph():
+    """start -> (a, b, c) -> join-0 -> (a, b, c) -> join-1 ... -> end"""
+    stages = 20
+    nodes = [{"data": {"type": "start"}, "id": "start"}]
+    edges = []
+    previous = "start"
+    for stage in range(stages):
+        join = f"join-{stage}"
+        for branch in ("a", "b", "c"):
+            node_id = f"{branch}-{stage}"
+            nodes.append({"data": {"type": "llm"}, "id": node_id})
+            edges.append({"id": f"{previous}-{node_id}", "source": previous, "target": node_id})
+            edges.append({"id": f"{node_id}-{join}", "source": node_id, "target": join})
+        nodes.append({"data": {"type": "llm"}, "id": join})
+        previous = join
+    nodes.append({"data": {"type": "answer", "title": "answer", "answer": "1"}, "id": "answer"})
+    edges.append({"id": f"{previous}-answer", "source": previous, "target": "answer"})
+
+    graph = Graph.init(graph_config={"edges": edges, "nodes": nodes})
+
+    assert len(graph.node_ids) == stages * 4 + 2
+    assert len(graph.parallel_mapping) == stages
+    for stage in range(stages):
+        start_node_id = "start" if stage == 0 else f"join-{stage - 1}"
+        parallel = graph.parallel_mapping[graph.node_parallel_mapping[f"a-{stage}"]]
+        assert parallel.start_from_node_id == start_node_id
+        assert parallel.end_to_node_id == f"join-{stage}"
+        assert parallel.parent_parallel_id is None
+        assert graph.node_parallel_mapping[f"b-{stage}"] == parallel.id
+        assert graph.node_parallel_mapping[f"c-{stage}"] == parallel.id
+        assert f"join-{stage}" not in graph.node_parallel_mapping
@@ -0,0 +1,112 @@
+import contextvars
+import threading
+
+import pytest
+
+from core.workflow.graph_engine.worker_pool import GraphEngineWorkerPool
+
+
+def test_runs_take_turns():
+    pool = GraphEngineWorkerPool(max_workers=1, max_workers_per_run=1, max_submit_count=10)
+    started = []
+    release = threading.Event()
+
+    blocker = pool.submit("blocker", release.wait)
+    futures = [pool.submit("run-a", started.append, f"a{i}") for i in range(3)]
+    futures += [pool.submit("run-b", started.append, f"b{i}") for i in range(2)]
+    release.set()
+
+    for future in [blocker, *futures]:
+        future.result(timeout=5)
+    assert started == ["a0", "b0", "a1", "b1", "a2"]
+
+
+def test_per_run_worker_cap():
+    pool = GraphEngineWorkerPool(max_workers=8, max_workers_per_run=2, max_submit_count=10)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    release = threading.Event()
+
+    def task():
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        release.wait()
+        with lock:
+            running -= 1
+
+    futures = [pool.submit("run", task) for _ in range(5)]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert max_running <= 2
+    assert pool.stats()["runs"] == 0
+
+
+def test_submit_over_max_submit_count_is_rejected():
+    pool = GraphEngineWorkerPool(max_workers=1, max_workers_per_run=1, max_submit_count=2)
+    release = threading.Event()
+    futures = [pool.submit("run", release.wait) for _ in range(2)]
+
+    with pytest.raises(ValueError):
+        pool.submit("run", release.wait)
+    # other runs have their own budget
+    futures.append(pool.submit("other", release.wait))
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_nested_tasks_do_not_deadlock():
+    pool = GraphEngineWorkerPool(max_workers=1, max_workers_per_run=1, max_submit_count=10)
+
+    def parent():
+        children = [pool.submit("run", lambda i=i: i) for i in range(3)]
+        with pool.blocking():
+            return [child.result(timeout=5) for child in children]
+
+    assert pool.submit("run", parent).result(timeout=10) == [0, 1, 2]
+
+
+def test_task_exception_is_set_on_future():
+    pool = GraphEngineWorkerPool(max_workers=1, max_workers_per_run=1, max_submit_count=10)
+
+    with pytest.raises(ZeroDivisionError):
+        pool.submit("run", lambda: 1 / 0).result(timeout=5)
+
+
+_tenant_var: contextvars.ContextVar[str] = contextvars.ContextVar("tenant")
+_leaked_var: contextvars.ContextVar[str] = contextvars.ContextVar("leaked")
+_submitter_var: contextvars.ContextVar[str] = contextvars.ContextVar("submitter")
+
+
+def test_runs_on_the_same_thread_do_not_share_context_variables():
+    pool = GraphEngineWorkerPool(max_workers=1, max_workers_per_run=1, max_submit_count=10)
+
+    def run_a():
+        # set by the task itself, not by the submitter
+        _leaked_var.set("a")
+        return _tenant_var.get(), threading.current_thread()
+
+    def run_b():
+        return _tenant_var.get(), _leaked_var.get(None), threading.current_thread()
+
+    def submit_run_a():
+        # only the submitter of run a sets this one
+        _submitter_var.set("a")
+        _tenant_var.set("tenant-a")
+        return pool.submit("run-a", run_a)
+
+    tenant_a, thread_a = contextvars.copy_context().run(submit_run_a).result(timeout=5)
+    _tenant_var.set("tenant-b")
+    tenant_b, leaked, thread_b = pool.submit("run-b", run_b).result(timeout=5)
+    submitter_b = pool.submit("run-b", _submitter_var.get, None).result(timeout=5)
+
+    assert thread_a is thread_b
+    assert (tenant_a, tenant_b) == ("tenant-a", "tenant-b")
+    assert leaked is None
+    assert submitter_b is None
@@ -159,9 +159,9 @@ class ContinueOnErrorTestHelper:
         return node
 
     @staticmethod
-    def create_test_graph_engine(graph_config: dict, user_inputs: dict | None = None):
+    def create_test_graph_engine(graph_config: dict, user_inputs: dict | None = None, graph: Graph | None = None):
         """Helper method to create a graph engine instance for testing"""
-        graph = Graph.init(graph_config=graph_config)
+        graph = graph or Graph.init(graph_config=graph_config)
         variable_pool = {
             "system_variables": {
                 SystemVariableKey.QUERY: "clear",
@@ -553,3 +553,46 @@ def test_stream_output_with_fail_branch_continue_on_error():
         events = list(graph_engine.run())
         assert sum(isinstance(e, NodeRunStreamChunkEvent) for e in events) == 1
         assert all(not isinstance(e, NodeRunFailedEvent | NodeRunExceptionEvent) for e in events)
+
+
+def test_stream_output_of_cached_fail_branch_graph():
+    """Test the shared graph of a config is not modified by the stream output of a run"""
+    graph_config = {
+        "edges": FAIL_BRANCH_EDGES,
+        "nodes": [
+            {"data": {"title": "Start", "type": "start", "variables": []}, "id": "start"},
+            {
+                "data": {"title": "success", "type": "answer", "answer": "{{#node.text#}}"},
+                "id": "success",
+            },
+            {
+                "data": {"title": "error", "type": "answer", "answer": "LLM request failed"},
+                "id": "error",
+            },
+            ContinueOnErrorTestHelper.get_llm_node(),
+        ],
+    }
+    graph = Graph.get_or_init(graph_config=graph_config)
+    answer_dependencies = {"success": ["node"], "error": ["node"]}
+    assert graph.answer_stream_generate_routes.answer_dependencies == answer_dependencies
+
+    def llm_generator(self):
+        yield RunStreamChunkEvent(chunk_content="hi", from_variable_selector=[self.node_id, "text"])
+        yield RunCompletedEvent(
+            run_result=NodeRunResult(
+                status=WorkflowNodeExecutionStatus.SUCCEEDED,
+                inputs={},
+                process_data={},
+                outputs={"text": "hi"},
+            )
+        )
+
+    with patch.object(LLMNode, "_run", new=llm_generator):
+        for _ in range(2):
+            graph_engine = ContinueOnErrorTestHelper.create_test_graph_engine(
+                graph_config, graph=Graph.get_or_init(graph_config=graph_config)
+            )
+            events = list(graph_engine.run())
+
+            assert [e.chunk_content for e in events if isinstance(e, NodeRunStreamChunkEvent)] == ["hi"]
+            assert graph.answer_stream_generate_routes.answer_dependencies == answer_dependencies
@@ -0,0 +1,209 @@
+import json
+import time
+import uuid
+
+import pytest
+
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.file import File, FileTransferMethod, FileType
+from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeRunResult
+from core.workflow.entities.variable_pool import VariablePool
+from core.workflow.enums import SystemVariableKey
+from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
+from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
+from core.workflow.nodes.base.result_cache import NodeResultCache
+from core.workflow.nodes.event import RunCompletedEvent
+from core.workflow.nodes.http_request import HttpRequestNode
+from core.workflow.nodes.knowledge_retrieval.knowledge_retrieval_node import KnowledgeRetrievalNode
+from core.workflow.nodes.template_transform.template_transform_node import TemplateTransformNode
+from models.enums import UserFrom
+from models.workflow import WorkflowNodeExecutionStatus, WorkflowType
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.WORKFLOW_NODE_RESULT_CACHE_BACKEND", "memory")
+    cache = NodeResultCache()
+    monkeypatch.setattr("core.workflow.nodes.base.node.node_result_cache", cache)
+    return cache
+
+
+def _init_node(node_cls, node_data: dict, city: str):
+    graph_config = {
+        "edges": [{"id": "start-source-node-target", "source": "start", "target": "node"}],
+        "nodes": [{"data": {"type": "start"}, "id": "start"}, {"data": node_data, "id": "node"}],
+    }
+    init_params = GraphInitParams(
+        tenant_id="1",
+        app_id="1",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="1",
+        graph_config=graph_config,
+        user_id="1",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        call_depth=0,
+    )
+    variable_pool = VariablePool(
+        system_variables={SystemVariableKey.FILES: [], SystemVariableKey.USER_ID: "aaa"},
+        user_inputs={},
+    )
+    variable_pool.add(["start", "city"], city)
+
+    return node_cls(
+        id=str(uuid.uuid4()),
+        graph_init_params=init_params,
+        graph=Graph.init(graph_config=graph_config),
+        graph_runtime_state=GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter()),
+        config={"id": "node", "data": node_data},
+    )
+
+
+def _template_node(city: str, cache_enabled: bool = True):
+    return _init_node(
+        TemplateTransformNode,
+        {
+            "title": "template",
+            "type": "template-transform",
+            "variables": [{"variable": "city", "value_selector": ["start", "city"]}],
+            "template": "{{ city }}",
+            "cache_config": {"cache_enabled": cache_enabled, "ttl": 60},
+        },
+        city,
+    )
+
+
+def _run(node):
+    events = list(node.run())
+    assert isinstance(events[-1], RunCompletedEvent)
+    return events[-1].run_result
+
+
+def test_node_result_cache_hit_and_miss(memory_cache, mocker):
+    execute = mocker.patch(
+        "core.workflow.nodes.template_transform.template_transform_node.CodeExecutor.execute_workflow_code_template",
+        side_effect=lambda language, code, inputs: {"result": inputs["city"]},
+    )
+
+    first = _run(_template_node("Paris"))
+    second = _run(_template_node("Paris"))
+    other = _run(_template_node("Rome"))
+
+    assert execute.call_count == 2
+    assert first.outputs == second.outputs == {"output": "Paris"}
+    assert NodeRunMetadataKey.CACHE_HIT not in (first.metadata or {})
+    assert second.metadata[NodeRunMetadataKey.CACHE_HIT] is True
+    assert other.outputs == {"output": "Rome"}
+    assert NodeRunMetadataKey.CACHE_HIT not in (other.metadata or {})
+
+
+def test_node_result_cache_disabled(memory_cache, mocker):
+    execute = mocker.patch(
+        "core.workflow.nodes.template_transform.template_transform_node.CodeExecutor.execute_workflow_code_template",
+        return_value={"result": "Paris"},
+    )
+
+    _run(_template_node("Paris", cache_enabled=False))
+    _run(_template_node("Paris", cache_enabled=False))
+
+    assert execute.call_count == 2
+
+
+def test_node_result_cache_skips_failed_runs(memory_cache, mocker):
+    mocker.patch(
+        "core.workflow.nodes.template_transform.template_transform_node.CodeExecutor.execute_workflow_code_template",
+        return_value={"result": None},
+    )
+
+    assert _run(_template_node("Paris")).status == WorkflowNodeExecutionStatus.FAILED
+    assert len(memory_cache._local) == 0
+
+
+def test_node_result_cache_expires(memory_cache, mocker):
+    result = mocker.Mock()
+    memory_cache.set("key", result, ttl=1)
+    assert memory_cache.get("key", "code") is result
+
+    mocker.patch("core.workflow.nodes.base.result_cache.time.monotonic", return_value=time.monotonic() + 2)
+    assert memory_cache.get("key", "code") is None
+
+
+@pytest.mark.parametrize(("method", "cacheable"), [("get", True), ("post", False)])
+def test_http_request_node_only_caches_get(method, cacheable):
+    node = _init_node(
+        HttpRequestNode,
+        {
+            "title": "http",
+            "type": "http-request",
+            "method": method,
+            "url": "http://example.com",
+            "authorization": {"type": "no-auth"},
+            "headers": "",
+            "params": "",
+            "body": None,
+            "cache_config": {"cache_enabled": True},
+        },
+        "Paris",
+    )
+
+    assert node.should_cache_result is cacheable
+
+
+def test_redis_backend_round_trips_files_as_json(mocker, monkeypatch):
+    monkeypatch.setattr("configs.dify_config.WORKFLOW_NODE_RESULT_CACHE_BACKEND", "redis")
+    store: dict = {}
+    redis = mocker.patch("core.workflow.nodes.base.result_cache.redis_client", new=mocker.MagicMock())
+    redis.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    redis.get.side_effect = store.get
+    file = File(
+        tenant_id="1",
+        type=FileType.DOCUMENT,
+        transfer_method=FileTransferMethod.TOOL_FILE,
+        related_id="tool-file",
+        filename="a.pdf",
+        extension=".pdf",
+        storage_key="tools/a.pdf",
+    )
+    result = NodeRunResult(
+        status=WorkflowNodeExecutionStatus.SUCCEEDED,
+        outputs={"files": [file], "status_code": 200},
+        metadata={NodeRunMetadataKey.TOTAL_TOKENS: 3},
+    )
+
+    cache = NodeResultCache()
+    cache.set("key", result, ttl=60)
+    assert json.loads(store["workflow_node_result:key"])["outputs"]["status_code"] == 200
+
+    cached = cache.get("key", "http-request")
+    assert cached == result
+    assert cached.outputs["files"][0]._storage_key == "tools/a.pdf"
+
+    store["workflow_node_result:key"] = b"not json"
+    assert cache.get("key", "http-request") is None
+
+
+def test_knowledge_retrieval_cache_key_covers_metadata_filter_values(mocker):
+    def node(category: str):
+        node = _init_node(
+            KnowledgeRetrievalNode,
+            {
+                "title": "knowledge",
+                "type": "knowledge-retrieval",
+                "query_variable_selector": ["start", "city"],
+                "dataset_ids": ["dataset"],
+                "retrieval_mode": "multiple",
+                "metadata_filtering_mode": "manual",
+                "metadata_filtering_conditions": {
+                    "logical_operator": "and",
+                    "conditions": [{"name": "category", "comparison_operator": "is", "value": "{{#start.category#}}"}],
+                },
+                "cache_config": {"cache_enabled": True},
+            },
+            "Paris",
+        )
+        node.graph_runtime_state.variable_pool.add(["start", "category"], category)
+        return node
+
+    assert node("travel")._get_result_cache_key() == node("travel")._get_result_cache_key()
+    assert node("travel")._get_result_cache_key() != node("food")._get_result_cache_key()
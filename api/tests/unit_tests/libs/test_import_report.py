@@ -0,0 +1,33 @@
+import logging
+import sys
+
+from libs.import_report import ImportReport
+
+
+def test_steps_record_the_modules_they_import(monkeypatch, caplog):
+    # a module which is not imported yet by the tests
+    monkeypatch.delitem(sys.modules, "json.tool", raising=False)
+    report = ImportReport()
+
+    with report.measure("import json.tool"):
+        import json.tool  # noqa: F401
+    with report.measure("nothing"):
+        pass
+
+    with caplog.at_level(logging.INFO, logger="libs.import_report"):
+        report.log()
+
+    assert "import json.tool: " in caplog.text
+    assert "heaviest packages: json (1)" in caplog.text
+    assert "nothing: " in caplog.text
+
+
+def test_disabled_report_measures_nothing(caplog):
+    report = ImportReport(enabled=False)
+
+    with report.measure("step"):
+        pass
+    with caplog.at_level(logging.INFO, logger="libs.import_report"):
+        report.log()
+
+    assert caplog.text == ""
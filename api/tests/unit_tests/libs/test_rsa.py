@@ -1,7 +1,10 @@
+from unittest.mock import MagicMock
+
+import pytest
 import rsa as pyrsa
 from Crypto.PublicKey import RSA
 
-from libs import gmpy2_pkcs10aep_cipher
+from libs import gmpy2_pkcs10aep_cipher, rsa
 
 
 def test_gmpy2_pkcs10aep_cipher() -> None:
@@ -27,3 +30,31 @@ def test_gmpy2_pkcs10aep_cipher() -> None:
     encrypted_by_private_key = private_cipher_rsa.encrypt(message=raw_text_bytes)
     decrypted_by_private_key = private_cipher_rsa.decrypt(encrypted_by_private_key)
     assert decrypted_by_private_key == raw_text_bytes
+
+
+def test_decrypt_caches_parsed_key_and_values(mocker) -> None:
+    private_key = RSA.generate(2048)
+    storage = mocker.patch("libs.rsa.storage")
+    storage.load.return_value = private_key.export_key()
+    redis_client = mocker.patch("libs.rsa.redis_client", new=MagicMock())
+    redis_client.get.return_value = None
+    import_key = mocker.spy(RSA, "import_key")
+
+    rsa.invalidate_decrypt_decoding("tenant")
+    encrypted_text = rsa.encrypt("secret", private_key.publickey().export_key())
+    assert rsa.decrypt(encrypted_text, "tenant") == "secret"
+    assert rsa.decrypt(encrypted_text, "tenant") == "secret"
+    assert rsa.decrypt(rsa.encrypt("other", private_key.publickey().export_key()), "tenant") == "other"
+    assert storage.load.call_count == 1
+
+    # a new key pair of the tenant is loaded after invalidation
+    new_private_key = RSA.generate(2048)
+    storage.load.return_value = new_private_key.export_key()
+    rsa.invalidate_decrypt_decoding("tenant")
+    import_key.reset_mock()
+
+    assert rsa.decrypt(rsa.encrypt("new", new_private_key.publickey().export_key()), "tenant") == "new"
+    assert storage.load.call_count == 2
+    assert import_key.call_count == 2
+    with pytest.raises(ValueError):
+        rsa.decrypt(encrypted_text, "tenant")
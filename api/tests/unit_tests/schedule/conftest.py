@@ -0,0 +1,22 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def import_schedule(monkeypatch):
+    """
+    Import a schedule module with the `app` module, which creates the whole application, replaced by a celery stub
+    whose tasks are the plain functions.
+    """
+    app = types.ModuleType("app")
+    app.celery = types.SimpleNamespace(task=lambda **kwargs: lambda fn: fn)  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "app", app)
+
+    def import_module(name: str) -> types.ModuleType:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+        return importlib.import_module(name)
+
+    return import_module
@@ -0,0 +1,43 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Delete, Select
+
+T1 = datetime.datetime(2024, 1, 1)
+T2 = datetime.datetime(2024, 1, 2)
+
+
+@pytest.fixture
+def module(import_schedule):
+    return import_schedule("schedule.clean_embedding_cache_task")
+
+
+def test_deletes_expired_embeddings_in_keyset_batches(mocker, module):
+    batches = [
+        [SimpleNamespace(id="e3", created_at=T2), SimpleNamespace(id="e2", created_at=T1)],
+        # e1 has the same created_at as the last embedding of the previous batch
+        [SimpleNamespace(id="e1", created_at=T1)],
+        [],
+    ]
+    selects = []
+    deletes = []
+
+    def execute(statement, *args, **kwargs):
+        if isinstance(statement, Select):
+            selects.append(statement.compile().params)
+            return SimpleNamespace(all=lambda: batches[len(selects) - 1])
+        assert isinstance(statement, Delete)
+        assert kwargs["execution_options"] == {"synchronize_session": False}
+        deletes.append(statement.compile().params["id_1"])
+
+    db = mocker.patch.object(module, "db")
+    db.session.execute.side_effect = execute
+
+    module.clean_embedding_cache_task()
+
+    # the first batch has no cursor, the next ones resume after the created_at and id of the last embedding
+    assert "id_1" not in selects[0]
+    assert [(params["created_at_2"], params["id_1"]) for params in selects[1:]] == [(T1, "e2"), (T1, "e1")]
+    assert deletes == [["e3", "e2"], ["e1"]]
+    assert db.session.commit.call_count == 2
@@ -0,0 +1,72 @@
+import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+T1 = datetime.datetime(2024, 1, 1)
+T2 = datetime.datetime(2024, 1, 2)
+
+
+@pytest.fixture
+def module(import_schedule):
+    return import_schedule("schedule.clean_messages")
+
+
+def _message(id: str, app_id: str, created_at: datetime.datetime) -> SimpleNamespace:
+    return SimpleNamespace(id=id, app_id=app_id, created_at=created_at)
+
+
+def _features(plan: str) -> SimpleNamespace:
+    return SimpleNamespace(billing=SimpleNamespace(subscription=SimpleNamespace(plan=plan)))
+
+
+def test_deletes_the_messages_of_sandbox_tenants_in_keyset_batches(mocker, module):
+    batches = [
+        [_message("m4", "sandbox-app", T2), _message("m3", "paid-app", T1)],
+        # m2 has the same created_at as the last message of the previous batch, the app of m1 was deleted
+        [_message("m2", "new-sandbox-app", T1), _message("m1", "deleted-app", T1)],
+        [],
+    ]
+    app_tenant_ids = {
+        "sandbox-app": "sandbox-tenant",
+        "paid-app": "paid-tenant",
+        "new-sandbox-app": "new-sandbox-tenant",
+    }
+    message_queries = []
+
+    def execute(statement):
+        params = statement.compile().params
+        if statement.get_final_froms()[0].name == "messages":
+            message_queries.append(params)
+            return SimpleNamespace(all=lambda: batches[len(message_queries) - 1])
+        return SimpleNamespace(
+            all=lambda: [(app_id, app_tenant_ids[app_id]) for app_id in params["id_1"] if app_id in app_tenant_ids]
+        )
+
+    db = mocker.patch.object(module, "db")
+    db.session.execute.side_effect = execute
+    redis_client = mocker.patch.object(module, "redis_client", new=MagicMock())
+    redis_client.mget.side_effect = lambda keys: [b"sandbox" if "sandbox" in key else None for key in keys]
+    get_features = mocker.patch.object(module.FeatureService, "get_features", return_value=_features("professional"))
+
+    module.clean_messages()
+
+    assert "id_1" not in message_queries[0]
+    assert [(params["created_at_2"], params["id_1"]) for params in message_queries[1:]] == [(T1, "m3"), (T1, "m1")]
+    # one MGET per batch, for the tenants not resolved by the previous batches
+    assert [sorted(call.args[0]) for call in redis_client.mget.call_args_list] == [
+        ["features:paid-tenant", "features:sandbox-tenant"],
+        ["features:new-sandbox-tenant"],
+    ]
+    # only the cache misses are looked up in the billing
+    get_features.assert_called_once_with("paid-tenant")
+    redis_client.setex.assert_called_once_with("features:paid-tenant", 600, "professional")
+    # the related rows and the messages of each batch are deleted by one IN each
+    models = [*module._MESSAGE_RELATED_MODELS, module.Message]
+    assert [call.args[0] for call in db.session.query.call_args_list] == models * 2
+    deleted_ids = [
+        list(call.args[0].compile().params.values()) for call in db.session.query.return_value.filter.call_args_list
+    ]
+    assert deleted_ids == [[["m4"]]] * len(models) + [[["m2"]]] * len(models)
+    assert db.session.commit.call_count == 2
@@ -0,0 +1,106 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytz
+
+from services.app_statistic_service import MESSAGE_MEASURES, AppStatisticService, _is_hour_aligned, _split_range
+
+WATERMARK = datetime(2025, 4, 10, 6)
+
+
+def test_split_range_aligned_inside_watermark():
+    start, end = datetime(2025, 4, 1), datetime(2025, 4, 5)
+    assert _split_range(start, end, WATERMARK) == [(True, start, end)]
+
+
+def test_split_range_unaligned_start_and_tail_after_watermark():
+    start, end = datetime(2025, 4, 1, 0, 30), datetime(2025, 4, 10, 8, 15)
+    assert _split_range(start, end, WATERMARK) == [
+        (False, start, datetime(2025, 4, 1, 1)),
+        (True, datetime(2025, 4, 1, 1), WATERMARK),
+        (False, WATERMARK, end),
+    ]
+
+
+def test_split_range_open_bounds():
+    assert _split_range(None, None, WATERMARK) == [(True, datetime.min, WATERMARK), (False, WATERMARK, None)]
+
+
+def test_split_range_without_full_hour_falls_back_to_raw():
+    start, end = datetime(2025, 4, 1, 0, 10), datetime(2025, 4, 1, 0, 50)
+    assert _split_range(start, end, WATERMARK) == [(False, start, end)]
+
+
+def test_is_hour_aligned():
+    start, end = datetime(2025, 1, 1), datetime(2025, 12, 31)
+    assert _is_hour_aligned("UTC", start, end)
+    assert _is_hour_aligned("America/New_York", start, end)
+    assert not _is_hour_aligned("Asia/Kolkata", start, end)
+
+
+def test_is_hour_aligned_checks_every_offset_in_range():
+    # +11 during daylight saving time, +10:30 otherwise
+    assert _is_hour_aligned("Australia/Lord_Howe", datetime(2025, 1, 1), datetime(2025, 2, 1))
+    assert not _is_hour_aligned("Australia/Lord_Howe", datetime(2025, 1, 1), datetime(2025, 6, 1))
+    assert not _is_hour_aligned("Australia/Lord_Howe", None, None)
+
+
+class FakeConnection:
+    """
+    Evaluates the raw and rollup statistic queries over in-memory messages
+    """
+
+    def __init__(self, messages: list[tuple[datetime, int]], watermark: datetime):
+        self.messages = messages
+        self.watermark = watermark
+        self.rollup_queries = 0
+
+    def execute(self, statement, args):
+        tz = pytz.timezone(args["tz"])
+        start, end = args.get("start") or datetime.min, args.get("end") or datetime.max
+        if "app_statistic_hourly_rollups" in str(statement):
+            self.rollup_queries += 1
+            # the rollup table only holds the hours before the watermark
+            rows = [
+                (created_at.replace(minute=0), tokens)
+                for created_at, tokens in self.messages
+                if created_at < self.watermark and start <= created_at.replace(minute=0) < end
+            ]
+        else:
+            rows = [(created_at, tokens) for created_at, tokens in self.messages if start <= created_at < end]
+
+        days: dict = defaultdict(lambda: dict.fromkeys(MESSAGE_MEASURES, 0))
+        for created_at, tokens in rows:
+            day = days[pytz.utc.localize(created_at).astimezone(tz).date()]
+            day["message_count"] += 1
+            day["message_tokens"] += tokens
+            day["latency_count"] += 1
+        return [SimpleNamespace(date=date, **measures) for date, measures in days.items()]
+
+
+def test_rollup_and_raw_tail_match_raw_scan(mocker, monkeypatch):
+    watermark = datetime(2025, 3, 12, 5)
+    messages = [
+        (datetime(2025, 3, 7) + timedelta(minutes=37 * i), i % 50)
+        for i in range(int((datetime(2025, 3, 12, 9) - datetime(2025, 3, 7)) / timedelta(minutes=37)))
+    ]
+    connection = FakeConnection(messages, watermark)
+    db = mocker.patch("services.app_statistic_service.db")
+    db.engine.begin.return_value.__enter__.return_value = connection
+    mocker.patch.object(AppStatisticService, "_get_watermark", return_value=watermark)
+
+    def get_statistics(start, end):
+        return AppStatisticService.get_daily_message_statistics(
+            app_id="app", timezone="America/New_York", start=start, end=end
+        )
+
+    # the range crosses the start of daylight saving time on 2025-03-09
+    for start, end in [(datetime(2025, 3, 7, 3, 20), datetime(2025, 3, 12, 8, 40)), (None, None)]:
+        monkeypatch.setattr("configs.dify_config.APP_STATISTIC_ROLLUP_ENABLED", False)
+        raw_rows = get_statistics(start, end)
+        monkeypatch.setattr("configs.dify_config.APP_STATISTIC_ROLLUP_ENABLED", True)
+        connection.rollup_queries = 0
+        assert get_statistics(start, end) == raw_rows
+        assert connection.rollup_queries == 1
+        assert len(raw_rows) == 7
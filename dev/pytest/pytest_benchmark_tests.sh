@@ -0,0 +1,4 @@
+#!/bin/bash
+set -x
+
+pytest api/tests/benchmark_tests/ --benchmark-only --no-cov